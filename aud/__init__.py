@@ -3,6 +3,7 @@
 __version__ = "1.0.0"
 
 # Import the Dir class from the aud module
+from aud.aio import AsyncDir
 from aud.aud import Dir
 
-__all__ = ["Dir", "__version__"]
+__all__ = ["AsyncDir", "Dir", "__version__"]
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+from aud.aud import Dir
+from aud.core.adapters.audio import AudioAdapter
+from aud.core.adapters.convert import ConversionAdapter
+from aud.core.adapters.pipeline import AGGREGATE_OPERATIONS, PipelineAdapter, Route
+from aud.core.models import AudioFile, FileEvent
+from aud.core.plan import Plan
+from aud.exceptions import BatchError, PipelineError
+
+
+class AsyncDir(Dir):
+    """
+    Dir for asyncio applications: plans run without blocking the event loop.
+
+    ``arun`` (or an ``apipeline`` block) executes a Plan like ``run``, but
+    files ffmpeg can produce by itself are converted by asyncio
+    subprocesses, and decoding / DSP runs in ``executor`` (the loop's
+    default thread pool, or a pool of ``workers`` processes when
+    ``workers > 1``). At most ``concurrency`` files are in flight, across
+    every run of this instance. ``events`` reports each file as it is done
+    and ``metrics`` records it as ``run`` does. ffmpeg conversions run
+    concurrently instead of in batches of ``batch_size``.
+
+    The inherited synchronous methods still block when called outside a
+    pipeline. Incremental runs (``manifest``) are not supported.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = ".",
+        concurrency: int = 8,
+        executor: Executor | None = None,
+        **options,
+    ):
+        if options.get("manifest"):
+            raise ValueError("AsyncDir does not support manifests")
+        super().__init__(directory, **options)
+        # files processed at the same time
+        self.concurrency = concurrency
+        # where decoding / DSP runs (see _executor)
+        self.executor = executor
+        self._limit: asyncio.Semaphore | None = None
+        self._limit_loop: asyncio.AbstractEventLoop | None = None
+
+    async def arun(self, plan: Plan) -> list[AudioFile]:
+        """
+        Execute ``plan`` and return the outputs in selection order.
+
+        Every file is attempted; failures are raised together afterwards
+        (``PipelineError`` wrapping a ``BatchError``), as by ``run``.
+        """
+        try:
+            results: list[AudioFile | None] = []
+            failures = [
+                (event.source, event.error)
+                async for event in self._stream(plan, results)
+                if event.error is not None
+            ]
+            if failures:
+                raise BatchError(failures, results)
+            return list(self._files)
+        except Exception as e:
+            raise PipelineError("pipeline", e)
+
+    async def events(self, plan: Plan) -> AsyncIterator[FileEvent]:
+        """
+        Execute ``plan``, yielding a ``FileEvent`` for every file as soon as
+        it is done (in completion order). Failures are reported as events
+        instead of raised; a stage with failures ends the run.
+
+            async for event in d.events(plan):
+                print(event.source.name, event.ok, event.elapsed)
+
+        Aggregate operations (zip, join) run in the executor as one step
+        and report no events of their own.
+        """
+        async for event in self._stream(plan, []):
+            yield event
+
+    @asynccontextmanager
+    async def apipeline(self, files: Iterable[AudioFile] | None = None) -> AsyncIterator[Plan]:
+        """
+        ``pipeline`` for coroutines: operations called in the block are
+        collected and the plan is awaited with ``arun`` when it exits.
+
+            async with d.apipeline():
+                d.afx_normalize()
+                d.convert_to_mp3()
+        """
+        subset = None if files is None else list(files)
+        with self._collect(subset) as plan:
+            yield plan
+
+        before = self._selection
+        await self.arun(plan)
+        self._merge(subset, before)
+
+    # ------------------------------------------------------------------
+    # execution
+    # ------------------------------------------------------------------
+
+    async def _stream(
+        self, plan: Plan, results: list[AudioFile | None]
+    ) -> AsyncIterator[FileEvent]:
+        # ``results`` receives the outputs of the last per-file stage, with
+        # None for failed files
+        loop = asyncio.get_running_loop()
+        adapter = self._adapter()
+        # a lazy listing is consumed in a thread: scanning blocks
+        inputs = await loop.run_in_executor(None, list, plan.files)
+        files = inputs
+        try:
+            with self._executor() as executor:
+                for stage in adapter.stages(plan.operations):
+                    if len(stage) == 1 and isinstance(stage[0], AGGREGATE_OPERATIONS):
+                        files = await loop.run_in_executor(
+                            executor, adapter._aggregate, stage[0], files
+                        )
+                        continue
+
+                    routes = [adapter.route(stage, file) for file in files]
+                    outputs: list[AudioFile | None] = [None] * len(routes)
+                    results[:] = outputs
+                    try:
+                        async for index, event in self._run_routes(adapter, routes, executor):
+                            outputs[index] = results[index] = event.output
+                            yield event
+                    finally:
+                        self._invalidate(routes)
+
+                    files = [file for file in outputs if file is not None]
+                    if len(files) < len(routes):
+                        return
+            self._files = files
+        finally:
+            if self._snapshot is not None:
+                self._written([*inputs, *files])
+
+    async def _run_routes(
+        self, adapter: PipelineAdapter, routes: list[Route], executor: Executor | None
+    ) -> AsyncIterator[tuple[int, FileEvent]]:
+        limit = self._semaphore()
+        done: asyncio.Queue[tuple[int, FileEvent]] = asyncio.Queue()
+        tasks: list[asyncio.Task] = []
+
+        async def run(index: int, route: Route) -> None:
+            start = time.perf_counter()
+            try:
+                output = await adapter.run_async(route, executor)
+                event = FileEvent(route.source, output, elapsed=time.perf_counter() - start)
+            except Exception as e:
+                event = FileEvent(route.source, error=e, elapsed=time.perf_counter() - start)
+            done.put_nowait((index, event))
+
+        async def spawn() -> None:
+            for index, route in enumerate(routes):
+                await limit.acquire()
+                task = asyncio.create_task(run(index, route))
+                # released even if the task is cancelled before it starts
+                task.add_done_callback(lambda _: limit.release())
+                tasks.append(task)
+
+        spawner = asyncio.create_task(spawn())
+        try:
+            for _ in routes:
+                yield await done.get()
+        finally:
+            spawner.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(spawner, *tasks, return_exceptions=True)
+
+    def _adapter(self) -> PipelineAdapter:
+        # the cache is not shared with executor threads; it is invalidated instead
+        return PipelineAdapter(
+            audio=AudioAdapter(backend=self.backend, memory_map=self.memory_map),
+            convert=ConversionAdapter(
+                backend=self.backend, native=self.native, batch_size=self.batch_size
+            ),
+            workers=self.workers,
+            metrics=self.metrics,
+        )
+
+    def _invalidate(self, routes: list[Route]) -> None:
+        if self.cache is not None:
+            for route in routes:
+                for file in (route.source, *route.outputs):
+                    self.cache.invalidate(file.path)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # one limit per event loop (asyncio primitives are bound to their loop)
+        loop = asyncio.get_running_loop()
+        if self._limit is None or self._limit_loop is not loop:
+            self._limit = asyncio.Semaphore(self.concurrency)
+            self._limit_loop = loop
+        return self._limit
+
+    @contextmanager
+    def _executor(self) -> Iterator[Executor | None]:
+        if self.executor is not None or self.workers <= 1:
+            yield self.executor
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            yield pool
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator
-from dataclasses import dataclass
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 from aud.core.adapters.audio import AudioAdapter
+from aud.core.adapters.backends import get_backend
 from aud.core.adapters.convert import ConversionAdapter
 from aud.core.adapters.filesystem import FileSystemAdapter
-from aud.core.models import AudioFile
+from aud.core.adapters.pipeline import PipelineAdapter
+from aud.core.cache import AudioCache
+from aud.core.index import INDEX_NAME, MetadataIndex
+from aud.core.manifest import MANIFEST_NAME, Manifest
+from aud.core.metrics import Metrics
+from aud.core.models import AudioFile, AudioInfo
 from aud.core.operations.archive import Zip
 
 # conversion
@@ -47,13 +54,17 @@ from aud.core.operations.names import (
     Uppercase,
 )
 from aud.core.plan import Plan
-from aud.core.selection.composite import CompositePolicy
+from aud.core.selection.compiled import compile_policy
+from aud.core.selection.composite import AnyPolicy, CompositePolicy
 
 # selection
 from aud.core.selection.extensions import ExtensionPolicy
 from aud.core.selection.listing import AllowlistPolicy, DenylistPolicy
+from aud.core.selection.metadata import MetadataPolicy
 from aud.core.selection.policy import SelectionPolicy
 from aud.core.selection.scanner import DirectoryScanner
+from aud.core.selection.snapshot import ADDED, REMOVED, Change, Snapshot
+from aud.core.selection.watch import watcher
 
 # exceptions (kept)
 from aud.exceptions import (
@@ -62,34 +73,11 @@ from aud.exceptions import (
     ExportError,
     FileError,
     FilenameError,
+    MetadataError,
+    PipelineError,
 )
 
 
-class _AlwaysFalsePolicy(SelectionPolicy):
-    def include(self, file: AudioFile) -> bool:
-        return False
-
-
-@dataclass(frozen=True)
-class _AllowlistOverridesPolicy(SelectionPolicy):
-    """
-    Matches legacy v1 behavior:
-
-        (valid_extension AND not_denylisted) OR allowlisted
-
-    Also matches legacy detail:
-    - If extensions is empty: valid_extension is always False, so only allowlist can include.
-    """
-
-    allow: AllowlistPolicy
-    base: SelectionPolicy
-
-    def include(self, file: AudioFile) -> bool:
-        if self.allow.include(file):
-            return True
-        return self.base.include(file)
-
-
 class Dir:
     """
     Public façade for aud.
@@ -106,13 +94,55 @@ class Dir:
         extensions: Iterable[str] | None = None,
         allowlist: Iterable[str] | None = None,
         denylist: Iterable[str] | None = None,
+        workers: int = 1,
+        backend: str = "pydub",
+        cache_bytes: int = 0,
+        manifest: str | Path | bool | None = None,
+        index: str | Path | bool | None = None,
+        recursive: bool = False,
+        max_depth: int | None = None,
+        follow_symlinks: bool = False,
+        policies: Iterable[SelectionPolicy] | None = None,
+        native: bool = False,
+        batch_size: int = 1,
+        memory_map: bool = False,
+        metrics: Metrics | bool | None = None,
     ):
         self.directory = Path(directory).resolve()
 
+        # number of processes used for per-file audio / conversion work
+        self.workers = workers
+        # sample-level implementation used by the audio adapters
+        get_backend(backend)
+        self.backend = backend
+        # pipelines run effects as ffmpeg filter chains where they can (see run)
+        self.native = native
+        # files per ffmpeg process for work ffmpeg does by itself (1 = one each)
+        self.batch_size = batch_size
+        # gain / phase / fades scale PCM WAV / AIFF samples in place (see run)
+        self.memory_map = memory_map
+        # per-file timings, sizes and memory of audio / conversion work (see Metrics)
+        self.metrics: Metrics | None = Metrics() if metrics is True else metrics or None
+        # decoded audio shared between operations (disabled when 0)
+        self.cache: AudioCache | None = AudioCache(cache_bytes) if cache_bytes > 0 else None
+        # record of previous pipeline runs; unchanged files are skipped (see run)
+        if manifest is True:
+            manifest = self.directory / MANIFEST_NAME
+        self.manifest: Manifest | None = Manifest(manifest) if manifest else None
+        # persistent header metadata (see metadata); in memory when not set,
+        # opened on first use
+        if index is True:
+            index = self.directory / INDEX_NAME
+        self._index_path = index or ":memory:"
+        self._index: MetadataIndex | None = None
+
         self._extensions = list(extensions or [])
         self._allowlist = list(allowlist or [])
         self._denylist = list(denylist or [])
 
+        # extra conditions every selected file must meet (e.g. metadata policies)
+        self._policies = self._bind(policies or [])
+
         # optional regex-based selection (supported by your policy classes)
         self._allowlist_regex: str | None = None
         self._denylist_regex: str | None = None
@@ -120,8 +150,18 @@ class Dir:
         # kept for config parity (not used by core right now)
         self._logfile: Path | None = None
 
-        self._files: list[AudioFile] = []
-        self.update()
+        # scan subdirectories too (see DirectoryScanner)
+        self.recursive = recursive
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+
+        # scanned on first use and after configuration changes (see _files)
+        self._selection: list[AudioFile] | None = None
+        # (inode, size, mtime_ns) per selected file, kept once update(incremental=True)
+        # or watch() is used
+        self._snapshot: Snapshot | None = None
+        # operations collected by an active pipeline() block
+        self._pending: Plan | None = None
 
     # ------------------------------------------------------------------
     # basic protocol
@@ -157,31 +197,171 @@ class Dir:
     # ------------------------------------------------------------------
 
     def _build_policy(self) -> SelectionPolicy:
-        # Base policy = valid extension AND not denylisted.
-        # Important legacy parity:
+        # Matches legacy v1 behavior:
+        #
+        #     (valid_extension AND not_denylisted) OR allowlisted
+        #
         # - If extensions is empty, NOTHING matches unless allowlisted.
+        #
+        # The tree is compiled into one flat predicate (see CompiledPolicy).
         base_policies: list[SelectionPolicy] = []
 
         if self._extensions:
             base_policies.append(ExtensionPolicy(self._extensions))
         else:
-            base_policies.append(_AlwaysFalsePolicy())
+            base_policies.append(AnyPolicy())
 
         if self._denylist or self._denylist_regex:
             base_policies.append(DenylistPolicy(self._denylist, regex=self._denylist_regex))
 
-        base = CompositePolicy(*base_policies)
+        base_policies.extend(self._policies)
+
+        policy: SelectionPolicy = CompositePolicy(*base_policies)
 
         # Allowlist overrides base if present (names or regex).
         if self._allowlist or self._allowlist_regex:
             allow = AllowlistPolicy(self._allowlist, regex=self._allowlist_regex)
-            return _AllowlistOverridesPolicy(allow=allow, base=base)
+            policy = AnyPolicy(allow, policy)
+
+        return compile_policy(policy)
+
+    def _bind(self, policies: Iterable[SelectionPolicy]) -> list[SelectionPolicy]:
+        # Metadata policies share the Dir's index unless given their own
+        policies = list(policies)
+        for policy in policies:
+            if isinstance(policy, MetadataPolicy) and policy.index is None:
+                policy.index = self.index
+        return policies
+
+    def _scanner(self) -> DirectoryScanner:
+        return DirectoryScanner(
+            self.directory,
+            self._build_policy(),
+            recursive=self.recursive,
+            max_depth=self.max_depth,
+            follow_symlinks=self.follow_symlinks,
+        )
 
-        return base
+    def update(self, incremental: bool = False) -> list[Change]:
+        """
+        Rescan the directory.
 
-    def update(self) -> None:
-        scanner = DirectoryScanner(self.directory, self._build_policy())
-        self._files = scanner.scan()
+        With ``incremental=True`` a snapshot of every selected file's
+        (inode, size, mtime_ns) is kept; each later update patches the
+        selection with only the added, removed and modified entries and
+        returns them as ``Change`` events. The first incremental update
+        reports every file as added.
+        """
+        files = self._scanner().scan()
+        if not incremental and self._snapshot is None:
+            self._selection = files
+            return []
+
+        if self._snapshot is None:
+            self._snapshot = Snapshot()
+        changes = self._snapshot.diff(files)
+        self._apply(changes)
+        return changes
+
+    def watch(
+        self, interval: float = 1.0, timeout: float | None = None, poll: bool | None = None
+    ) -> Iterator[list[Change]]:
+        """
+        Yield batches of ``Change`` events as selected files change on disk.
+
+        Uses inotify on Linux, so only the reported paths are checked;
+        elsewhere (or with ``poll=True``) the directory is rescanned every
+        ``interval`` seconds. Files already present when watching starts
+        are not reported, except for changes since an earlier incremental
+        ``update``. Stops after ``timeout`` seconds (never when None).
+
+            for changes in d.watch():
+                new = [c.file for c in changes if c.kind != "removed"]
+                with d.pipeline(new):
+                    d.afx_normalize()
+
+        Files written by aud itself are not reported back.
+        """
+        source = watcher(
+            self.directory,
+            recursive=self.recursive,
+            max_depth=self.max_depth,
+            follow_symlinks=self.follow_symlinks,
+            interval=interval,
+            poll=poll,
+        )
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            # Catch up once the watcher is in place, so nothing falls in between
+            baseline = self._snapshot is None
+            changes = self.update(incremental=True)
+            if changes and not baseline:
+                yield changes
+            while True:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                paths = source.wait(remaining)
+                if paths is None:
+                    changes = self.update(incremental=True)
+                else:
+                    # the catch-up update above recorded the snapshot
+                    assert self._snapshot is not None
+                    changes = self._snapshot.check(paths, self._in_scope())
+                    self._apply(changes)
+                if changes:
+                    yield changes
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+        finally:
+            source.close()
+
+    def _apply(self, changes: list[Change]) -> None:
+        # only called after an incremental update, which records the snapshot
+        assert self._snapshot is not None
+        if self._selection is None:
+            self._selection = self._snapshot.files()
+            return
+        removed = {c.file.path for c in changes if c.kind == REMOVED}
+        added = [c.file for c in changes if c.kind == ADDED]
+        if removed or added:
+            kept = {f.path: f for f in self._selection if f.path not in removed}
+            kept.update((f.path, f) for f in added if f.path not in kept)
+            self._selection = sorted(kept.values(), key=lambda f: f.path)
+
+    def _in_scope(self) -> Callable[[AudioFile], bool]:
+        include = self._build_policy().include
+        return lambda file: file.path.is_relative_to(self.directory) and include(file)
+
+    def _written(self, files: Iterable[AudioFile]) -> None:
+        # Files aud wrote itself are recorded silently, so update() / watch()
+        # do not report them as changes
+        if self._snapshot is not None:
+            self._snapshot.refresh(files, self._in_scope())
+
+    @property
+    def _files(self) -> list[AudioFile]:
+        # The directory is only scanned when the selection is first needed
+        if self._selection is None:
+            self.update()
+            assert self._selection is not None
+        return self._selection
+
+    @_files.setter
+    def _files(self, files: Iterable[AudioFile]) -> None:
+        self._selection = list(files)
+
+    def _reset_selection(self) -> None:
+        self._selection = None
+
+    def iter_files(self) -> Iterator[AudioFile]:
+        """
+        Yield the selected files, scanning lazily if no selection is cached.
+
+        The first files are available before the listing finishes; the
+        selection is not cached by a streaming scan.
+        """
+        if self._selection is not None:
+            return iter(list(self._selection))
+        return self._scanner().iter_scan()
 
     # ------------------------------------------------------------------
     # config (compat layer)
@@ -189,7 +369,7 @@ class Dir:
 
     def config_set_extensions(self, extensions: Iterable[str]) -> bool:
         self._extensions = list(extensions or [])
-        self.update()
+        self._reset_selection()
         return True
 
     def config_get_extensions(self) -> list[str]:
@@ -200,7 +380,7 @@ class Dir:
     ) -> bool:
         self._allowlist = list(names or [])
         self._allowlist_regex = regex
-        self.update()
+        self._reset_selection()
         return True
 
     def config_set_denylist(
@@ -208,7 +388,31 @@ class Dir:
     ) -> bool:
         self._denylist = list(names or [])
         self._denylist_regex = regex
-        self.update()
+        self._reset_selection()
+        return True
+
+    def config_set_policies(self, *policies: SelectionPolicy) -> bool:
+        """
+        Only select files that also satisfy every one of ``policies``:
+
+            d.config_set_policies(SampleRatePolicy(48000), ChannelsPolicy(2), DurationPolicy(2))
+
+        Allowlisted files are still always included.
+        """
+        self._policies = self._bind(policies)
+        self._reset_selection()
+        return True
+
+    def config_get_policies(self) -> list[SelectionPolicy]:
+        return list(self._policies)
+
+    def config_set_recursive(
+        self, recursive: bool = True, max_depth: int | None = None, follow_symlinks: bool = False
+    ) -> bool:
+        self.recursive = recursive
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+        self._reset_selection()
         return True
 
     def config_set_log_file(self, filename: str = "main.log") -> bool:
@@ -225,36 +429,221 @@ class Dir:
     # internal helpers
     # ------------------------------------------------------------------
 
+    def _defer(self, plan: Plan) -> bool:
+        # Inside pipeline(), operations are collected instead of executed.
+        if self._pending is None:
+            return False
+        self._pending.operations.extend(plan.operations)
+        return True
+
     def _execute_filesystem(self, plan: Plan) -> None:
+        if self._defer(plan):
+            return
         adapter = FileSystemAdapter()
-        files = plan.files
+        inputs = files = list(plan.files)
 
-        for op in plan.operations:
-            files = adapter.execute(op, files)
+        try:
+            for op in plan.operations:
+                files = adapter.execute(op, files)
+        finally:
+            if self.cache is not None:
+                for file in [*inputs, *files]:
+                    self.cache.invalidate(file.path)
+            self._written([*inputs, *files])
 
         self._files = files
 
     def _execute_audio(self, plan: Plan) -> None:
-        adapter = AudioAdapter()
-        files = plan.files
+        if self._defer(plan):
+            return
+        adapter = AudioAdapter(
+            workers=self.workers,
+            backend=self.backend,
+            cache=self.cache,
+            memory_map=self.memory_map,
+            metrics=self.metrics,
+        )
+        inputs = files = list(plan.files)
 
-        for op in plan.operations:
-            files = adapter.execute(op, files)
+        try:
+            for op in plan.operations:
+                files = adapter.execute(op, files)
+        finally:
+            self._written([*inputs, *files])
 
         self._files = files
 
     def _execute_convert(self, plan: Plan) -> None:
-        adapter = ConversionAdapter()
-        files = plan.files
+        if self._defer(plan):
+            return
+        adapter = ConversionAdapter(
+            workers=self.workers,
+            backend=self.backend,
+            cache=self.cache,
+            batch_size=self.batch_size,
+            metrics=self.metrics,
+        )
+        inputs = files = list(plan.files)
 
-        for op in plan.operations:
-            files = adapter.execute(op, files)
+        try:
+            for op in plan.operations:
+                files = adapter.execute(op, files)
+        finally:
+            self._written([*inputs, *files])
 
         self._files = files
 
     def _plan(self) -> Plan:
+        if self._pending is not None:
+            # inside pipeline() only the operations are collected
+            return Plan([])
         return Plan(list(self._files))
 
+    # ------------------------------------------------------------------
+    # metadata
+    # ------------------------------------------------------------------
+
+    @property
+    def index(self) -> MetadataIndex:
+        """The header metadata index (see ``metadata``), opened on first use."""
+        if self._index is None:
+            self._index = MetadataIndex(self._index_path, workers=max(8, self.workers))
+        return self._index
+
+    def metadata(self, peak: bool = False) -> dict[str, AudioInfo]:
+        """
+        Return the ``AudioInfo`` of every selected file, keyed by relative path.
+
+        Headers are probed in parallel and kept in ``self.index``; only new
+        or changed files are probed again. ``peak=True`` also decodes files
+        whose peak level is not indexed yet. Unreadable files are omitted
+        (see ``self.index.errors()``).
+        """
+        try:
+            self.index.refresh(self._files, peak=peak)
+            found = self.index.lookup(self._files)
+            return {
+                self._relative(file): found[file.path] for file in self._files if file.path in found
+            }
+        except Exception as e:
+            raise MetadataError("metadata", e)
+
+    def _relative(self, file: AudioFile) -> str:
+        try:
+            return file.path.relative_to(self.directory).as_posix()
+        except ValueError:
+            return str(file.path)
+
+    # ------------------------------------------------------------------
+    # pipelines
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def pipeline(self, files: Iterable[AudioFile] | None = None) -> Iterator[Plan]:
+        """
+        Collect operations and run them as one fused Plan on exit.
+
+        Every ``name_*``, file, ``afx_*`` and ``convert_*`` call made inside
+        the block is recorded instead of executed. When the block exits, each
+        file is decoded once, all audio / conversion operations are applied
+        in memory and the result is exported once to its final destination.
+
+            with d.pipeline():
+                d.afx_normalize()
+                d.afx_fade(0.5, 0.5)
+                d.convert_to_mp3()
+
+        The selection is only updated when the block exits. If the block
+        raises, nothing is executed.
+
+        Intermediate in-place states are never written, so the result can
+        differ from making the same calls one by one: ``afx_normalize()``
+        followed by ``copy(out)`` normalizes only the copy and leaves the
+        source untouched, where the separate calls normalize the source too.
+        Every ``copy`` / ``backup`` / ``convert_*`` destination is still
+        written, with the audio operations made before it.
+
+        ``files`` restricts the plan to those files (e.g. the changes
+        reported by ``watch``); the rest of the selection is left as is.
+        """
+        subset = None if files is None else list(files)
+        with self._collect(subset) as plan:
+            yield plan
+
+        before = self._selection
+        self.run(plan)
+        self._merge(subset, before)
+
+    @contextmanager
+    def _collect(self, subset: list[AudioFile] | None) -> Iterator[Plan]:
+        # operations called in the block are recorded in the yielded Plan
+        if self._pending is not None:
+            raise RuntimeError("A pipeline is already active for this Dir")
+
+        self._pending = Plan(self.iter_files() if subset is None else subset)
+        try:
+            yield self._pending
+        finally:
+            self._pending = None
+
+    def _merge(self, subset: list[AudioFile] | None, before: list[AudioFile] | None) -> None:
+        # after a plan on ``subset``, its outputs replace those files in the selection
+        if subset is None:
+            return
+        if before is None:
+            # nothing was scanned yet; the next use scans the result
+            self._selection = None
+            return
+        inputs = {file.path for file in subset}
+        kept = {f.path: f for f in before if f.path not in inputs}
+        kept.update((f.path, f) for f in self._files)
+        self._selection = sorted(kept.values(), key=lambda f: f.path)
+
+    def run(self, plan: Plan) -> bool:
+        """
+        Execute ``plan`` with one decode / export per file (see ``pipeline``).
+
+        With a ``manifest``, files whose contents and plan are unchanged
+        since the last run are skipped; ``self.manifest.skipped`` and
+        ``self.manifest.processed`` describe the last run.
+
+        With ``native=True``, files whose transforms all have an ffmpeg
+        filter equivalent are processed by one ffmpeg call each.
+
+        With ``memory_map=True``, files that only get Gain, InvertPhase and
+        Fade, in place, have their samples scaled in the file itself, with
+        flat memory use however large the file is.
+        """
+        if self._snapshot is not None:
+            # the inputs are needed again below to record what was written
+            plan = Plan(list(plan.files), plan.operations)
+        outputs: list[AudioFile] = []
+        try:
+            adapter = PipelineAdapter(
+                audio=AudioAdapter(
+                    backend=self.backend, cache=self.cache, memory_map=self.memory_map
+                ),
+                convert=ConversionAdapter(
+                    backend=self.backend,
+                    cache=self.cache,
+                    native=self.native,
+                    batch_size=self.batch_size,
+                ),
+                workers=self.workers,
+                metrics=self.metrics,
+            )
+            if self.manifest is not None:
+                outputs = self.manifest.execute(adapter, plan)
+            else:
+                outputs = adapter.execute(plan)
+            self._files = outputs
+            return True
+        except Exception as e:
+            raise PipelineError("pipeline", e)
+        finally:
+            if self._snapshot is not None:
+                self._written([*plan.files, *outputs])
+
     # ------------------------------------------------------------------
     # name operations
     # ------------------------------------------------------------------
@@ -359,10 +748,38 @@ class Dir:
     # audio FX operations
     # ------------------------------------------------------------------
 
-    def afx_normalize(self, target_level: float = 0.1, passes: int = 1) -> bool:
+    def afx_normalize(
+        self,
+        target_level: float | None = None,
+        passes: int = 1,
+        mode: str = "peak",
+        true_peak: float | None = None,
+        album: bool = False,
+    ) -> bool:
+        """
+        Normalize every selected file to ``target_level``.
+
+        ``mode`` is "peak" (headroom in dB, default 0.1), "rms" (dBFS,
+        default -20) or "lufs" (integrated loudness, default -23).
+        ``true_peak`` caps the gain at that many dBTP. With ``album=True``
+        all files are measured together and receive the same gain.
+        """
         try:
-            plan = self._plan().add(Normalize(target_db=target_level, passes=passes))
-            self._execute_audio(plan)
+            op = Normalize(target_db=target_level, passes=passes, mode=mode, true_peak=true_peak)
+            plan = self._plan()
+            if album:
+                if self._pending is not None and self._pending.operations:
+                    raise RuntimeError("Album normalization must come first in a pipeline")
+                # measured over the files the plan runs on, listed once for both
+                scope = self._pending if self._pending is not None else plan
+                scope.files = list(scope.files)
+                adapter = AudioAdapter(workers=self.workers, backend=self.backend, cache=self.cache)
+                gain = adapter.album_gain(op, scope.files)
+                if gain is None:
+                    return True
+                op.gain_db = gain
+
+            self._execute_audio(plan.add(op))
             return True
         except Exception as e:
             raise AudioFXError("normalize", e)
@@ -443,8 +860,35 @@ class Dir:
         except Exception as e:
             raise AudioFXError("strip silence", e)
 
+    def afx_nonsilent_ranges(
+        self, silence_length: int = 1000, silence_threshold: int = -16
+    ) -> dict[str, list[tuple[int, int]]]:
+        """
+        Return the non-silent ``(start, end)`` ranges (ms) of every selected
+        file, keyed by relative path.
+
+        Uses the same detector as ``afx_strip_silence`` without modifying
+        any file, so the ranges can be stored and reused.
+        """
+        try:
+            adapter = AudioAdapter(backend=self.backend, cache=self.cache)
+            op = StripSilence(silence_length=silence_length, silence_threshold=silence_threshold)
+            return {
+                self._relative(file): [
+                    (start, end) for start, end in adapter.nonsilent_ranges(op, adapter.load(file))
+                ]
+                for file in self._files
+            }
+        except Exception as e:
+            raise AudioFXError("detect silence", e)
+
     def afx_watermark(
-        self, watermark_file: str | Path, frequency_min: float, frequency_max: float
+        self,
+        watermark_file: str | Path,
+        frequency_min: float,
+        frequency_max: float,
+        gain_during_overlay: float = -2,
+        seed: int | None = None,
     ) -> bool:
         try:
             plan = self._plan().add(
@@ -452,6 +896,8 @@ class Dir:
                     watermark_file=watermark_file,
                     frequency_min=frequency_min,
                     frequency_max=frequency_max,
+                    gain_during_overlay=gain_during_overlay,
+                    seed=seed,
                 )
             )
             self._execute_audio(plan)
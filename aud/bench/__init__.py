@@ -0,0 +1,18 @@
+"""Benchmark suite for aud: ``python -m aud.bench --help``."""
+
+from aud.bench.cases import CASES, Case, Context
+from aud.bench.corpus import CorpusSpec, generate_corpus
+from aud.bench.runner import Comparison, compare, expand, run_suite, select
+
+__all__ = [
+    "CASES",
+    "Case",
+    "Comparison",
+    "Context",
+    "CorpusSpec",
+    "compare",
+    "expand",
+    "generate_corpus",
+    "run_suite",
+    "select",
+]
@@ -0,0 +1,94 @@
+"""
+Time every Dir operation, the scanner and the selection policies on synthetic corpora.
+
+    python -m aud.bench --files 10,100 --duration 1,30 --output results.json
+    python -m aud.bench --baseline results.json --output current.json --case effects/
+
+Every combination of the scaling axes (--files, --duration, --rate, --channels,
+--format, --bit-depth) is a corpus. Corpora are generated deterministically
+from --seed under --root on the first run and reused afterwards. Results are
+written as JSON; with --baseline the medians are compared to an earlier
+results file and the exit status is 1 if any case regressed by more than
+--threshold, or failed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from aud.bench.runner import compare, expand, run_suite, select
+
+
+def numbers(kind):
+    return lambda text: [kind(value) for value in text.split(",") if value]
+
+
+def report(result: dict) -> None:
+    label = f"{result['case']:<30}{result['corpus']:<40}"
+    if "skipped" in result:
+        print(f"{label}skipped ({result['skipped']})")
+    elif "error" in result:
+        print(f"{label}FAILED {result['error']}")
+    else:
+        print(
+            f"{label}{result['median']:>10.4f}{result['min']:>10.4f}"
+            f"{result['realtime_factor']:>10.1f}x"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=numbers(int), default=[10, 100])
+    parser.add_argument("--duration", type=numbers(float), default=[1.0])
+    parser.add_argument("--rate", type=numbers(int), default=[44100])
+    parser.add_argument("--channels", type=numbers(int), default=[2])
+    parser.add_argument("--format", type=lambda text: text.split(","), default=["wav"])
+    parser.add_argument("--bit-depth", type=numbers(int), default=[16], help="8, 16 or 32")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--case", action="append", default=[], help="substring of case names")
+    parser.add_argument("--root", type=Path, default=Path(tempfile.gettempdir()) / "aud-bench")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args()
+
+    cases = select(args.case)
+    if args.list:
+        for case in cases:
+            needs = f"  (needs {', '.join(case.requires)})" if case.requires else ""
+            print(case.name + needs)
+        return 0
+
+    specs = expand(
+        args.files, args.duration, args.rate, args.channels, args.format, args.bit_depth, args.seed
+    )
+    print(f"{'case':<30}{'corpus':<40}{'median':>10}{'min':>10}{'realtime':>11}")
+    results = run_suite(specs, args.root, cases, args.repeat, progress=report)
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    failed = [r for r in results["results"] if "error" in r]
+    regressed = []
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        comparisons = compare(results, baseline, args.threshold)
+        regressed = [c for c in comparisons if c.regressed]
+        print(f"\n{len(comparisons)} compared with {args.baseline}, {len(regressed)} regressed")
+        if regressed:
+            print(f"{'case':<30}{'corpus':<40}{'baseline':>10}{'current':>10}{'ratio':>10}")
+        for c in sorted(regressed, key=lambda c: -c.ratio):
+            print(
+                f"{c.case:<30}{c.corpus:<40}{c.baseline:>10.4f}{c.current:>10.4f}{c.ratio:>9.2f}x"
+            )
+
+    return 1 if failed or regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+from aud.aio import AsyncDir
+from aud.aud import Dir
+from aud.bench.corpus import CorpusSpec
+from aud.core.operations.audio.convert import ConvertToMono
+from aud.core.operations.audio.effects import Fade, Gain, HighPassFilter, LowPassFilter
+from aud.core.plan import Plan
+from aud.core.selection.compiled import compile_policy
+from aud.core.selection.composite import AnyPolicy, CompositePolicy
+from aud.core.selection.extensions import ExtensionPolicy
+from aud.core.selection.listing import AllowlistPolicy, DenylistPolicy
+from aud.core.selection.metadata import (
+    BitDepthPolicy,
+    ChannelsPolicy,
+    ClippedPolicy,
+    DurationPolicy,
+    SampleRatePolicy,
+)
+from aud.core.selection.policy import SelectionPolicy
+from aud.core.selection.scanner import DirectoryScanner
+
+# Groups whose cases decode audio (names, files, scanning, selection and
+# metadata only list files and read headers)
+DECODING_GROUPS = frozenset({"effects", "convert", "pipeline"})
+
+
+@dataclass(slots=True)
+class Context:
+    """What a case works on: a fresh copy of the corpus and room for outputs."""
+
+    spec: CorpusSpec
+    # a copy of the corpus, which the case may modify
+    directory: Path
+    # an empty directory outside the corpus (copies, archives, joined files)
+    scratch: Path
+    # a short clip with the corpus' rate and channels (prepend / append / watermark)
+    clip: Path
+
+    def dir(self, **options) -> Dir:
+        d = Dir(self.directory, extensions=[self.spec.format], **options)
+        len(d)  # scanned here, not while the case is timed
+        return d
+
+
+@dataclass(frozen=True, slots=True)
+class Case:
+    """
+    One timed operation. ``setup`` prepares everything that should not be
+    timed and returns the call that is; ``requires`` names what it needs
+    beyond the base install ("ffmpeg", "numpy").
+    """
+
+    name: str
+    setup: Callable[[Context], Callable[[], object]]
+    requires: tuple[str, ...] = ()
+
+    @property
+    def group(self) -> str:
+        return self.name.split("/", 1)[0]
+
+    @property
+    def decodes(self) -> bool:
+        return self.group in DECODING_GROUPS
+
+
+def _method(name: str, *args, options: dict | None = None, **kwargs):
+    # a Dir method; callable arguments are resolved against the context
+    def setup(context: Context) -> Callable[[], object]:
+        d = context.dir(**(options or {}))
+        resolved = [arg(context) if callable(arg) else arg for arg in args]
+        return partial(getattr(d, name), *resolved, **kwargs)
+
+    return setup
+
+
+def _scratch(name: str) -> Callable[[Context], Path]:
+    return lambda context: context.scratch / name
+
+
+def _clip(context: Context) -> Path:
+    return context.clip
+
+
+def _pipeline(*operations, options: dict | None = None):
+    def setup(context: Context) -> Callable[[], object]:
+        d = context.dir(**(options or {}))
+        return lambda: d.run(Plan(list(d), [op() for op in operations]))
+
+    return setup
+
+
+def _async_pipeline(context: Context) -> Callable[[], object]:
+    d = AsyncDir(context.directory, extensions=[context.spec.format])
+    len(d)
+    return lambda: asyncio.run(d.arun(Plan(list(d), [Gain(-3), Fade(0.1, 0.1)])))
+
+
+def _scan(**options):
+    def setup(context: Context) -> Callable[[], object]:
+        policy = ExtensionPolicy([context.spec.format])
+        scanner = DirectoryScanner(context.directory, policy, **options)
+        return scanner.scan
+
+    return setup
+
+
+def _incremental_update(context: Context) -> Callable[[], object]:
+    d = context.dir()
+    d.update(incremental=True)  # the first one records every file
+    return partial(d.update, incremental=True)
+
+
+def _policy(build: Callable[[CorpusSpec], SelectionPolicy], compiled: bool = False):
+    # the cost of deciding on every file of an existing listing
+    def setup(context: Context) -> Callable[[], object]:
+        files = DirectoryScanner(context.directory, ExtensionPolicy([context.spec.format])).scan()
+        policy = build(context.spec)
+        if compiled:
+            paths = [str(file.path) for file in files]
+            return lambda: compile_policy(policy).include_many(paths)
+
+        def decide() -> list[bool]:
+            policy.prepare(files)
+            return [policy.include(file) for file in files]
+
+        return decide
+
+    return setup
+
+
+def _names(spec: CorpusSpec) -> SelectionPolicy:
+    return CompositePolicy(
+        ExtensionPolicy([spec.format]),
+        AllowlistPolicy(regex=r"take_\d+"),
+        DenylistPolicy(names=["take_00000." + spec.format]),
+    )
+
+
+CASES: list[Case] = [
+    # names
+    Case("names/upper", _method("name_upper")),
+    Case("names/lower", _method("name_lower")),
+    Case("names/append", _method("name_append", "_final")),
+    Case("names/prepend", _method("name_prepend", "final_")),
+    Case("names/replace", _method("name_replace", "take", "clip")),
+    Case("names/replace_spaces", _method("name_replace_spaces")),
+    Case("names/iterate", _method("name_iterate", 5)),
+    # files
+    Case("files/copy", _method("copy", _scratch("copy"))),
+    Case("files/move", _method("move", _scratch("moved"))),
+    Case("files/backup", _method("backup", _scratch("backup"))),
+    Case("files/archive_zip", _method("archive_zip", _scratch("corpus.zip"))),
+    # effects
+    Case("effects/normalize", _method("afx_normalize")),
+    Case("effects/normalize_rms", _method("afx_normalize", mode="rms")),
+    Case("effects/normalize_lufs", _method("afx_normalize", mode="lufs"), ("numpy",)),
+    Case("effects/normalize_album", _method("afx_normalize", album=True)),
+    Case("effects/fade", _method("afx_fade", 0.5, 0.5)),
+    Case("effects/pad", _method("afx_pad", 0.5, 0.5)),
+    Case("effects/gain", _method("afx_gain", -3)),
+    Case("effects/gain_memory_map", _method("afx_gain", -3, options={"memory_map": True})),
+    Case("effects/low_pass", _method("afx_low_pass", 3000)),
+    Case("effects/high_pass", _method("afx_high_pass", 100)),
+    Case(
+        "effects/low_pass_numpy",
+        _method("afx_low_pass", 3000, options={"backend": "numpy"}),
+        ("numpy",),
+    ),
+    Case(
+        "effects/high_pass_numpy",
+        _method("afx_high_pass", 100, options={"backend": "numpy"}),
+        ("numpy",),
+    ),
+    Case("effects/invert_phase", _method("afx_invert_phase")),
+    Case(
+        "effects/strip_silence",
+        _method("afx_strip_silence", silence_length=200, silence_threshold=-50, padding=50),
+    ),
+    Case(
+        "effects/nonsilent_ranges",
+        _method("afx_nonsilent_ranges", silence_length=200, silence_threshold=-50),
+    ),
+    Case("effects/watermark", _method("afx_watermark", _clip, 1, 2, seed=0)),
+    Case("effects/join", _method("afx_join", _scratch("joined.wav"))),
+    Case("effects/prepend", _method("afx_prepend", _clip)),
+    Case("effects/append", _method("afx_append", _clip)),
+    # conversion
+    Case("convert/mono", _method("convert_mono")),
+    Case("convert/stereo", _method("convert_stereo")),
+    Case("convert/wav_48k_24bit", _method("convert_to_wav", sample_rate=48000, bit_depth=24)),
+    Case("convert/raw", _method("convert_to_raw")),
+    Case("convert/flac", _method("convert_to_flac"), ("ffmpeg",)),
+    Case(
+        "convert/flac_batched",
+        _method("convert_to_flac", options={"batch_size": 16}),
+        ("ffmpeg",),
+    ),
+    Case("convert/mp3", _method("convert_to_mp3"), ("ffmpeg",)),
+    Case("convert/export_for_mp3", _method("export_for", "mp3", _scratch("export")), ("ffmpeg",)),
+    # metadata
+    Case("metadata/headers", _method("metadata")),
+    Case("metadata/peak", _method("metadata", peak=True)),
+    # pipelines
+    Case("pipeline/effects", _pipeline(partial(Gain, -3), partial(Fade, 0.5, 0.5))),
+    Case(
+        "pipeline/effects_mono",
+        _pipeline(partial(Gain, -3), partial(Fade, 0.5, 0.5), ConvertToMono),
+    ),
+    Case(
+        "pipeline/native",
+        _pipeline(partial(Gain, -3), partial(Fade, 0.5, 0.5), options={"native": True}),
+        ("ffmpeg",),
+    ),
+    Case(
+        "pipeline/native_batched",
+        _pipeline(
+            partial(Gain, -3), partial(Fade, 0.5, 0.5), options={"native": True, "batch_size": 16}
+        ),
+        ("ffmpeg",),
+    ),
+    # a chain pays the PCM <-> float conversion once instead of per operation
+    Case(
+        "pipeline/filters",
+        _pipeline(partial(Gain, -3), partial(LowPassFilter, 4000), partial(HighPassFilter, 80)),
+    ),
+    Case(
+        "pipeline/filters_numpy",
+        _pipeline(
+            partial(Gain, -3),
+            partial(LowPassFilter, 4000),
+            partial(HighPassFilter, 80),
+            options={"backend": "numpy"},
+        ),
+        ("numpy",),
+    ),
+    Case("pipeline/async", _async_pipeline),
+    # scanning
+    Case("scan/scanner", _scan()),
+    Case("scan/scanner_recursive", _scan(recursive=True)),
+    Case("scan/threaded_walk", _scan(recursive=True, workers=8)),
+    Case("scan/update", _method("update")),
+    Case("scan/update_incremental", _incremental_update),
+    # selection policies
+    Case("select/extension", _policy(lambda spec: ExtensionPolicy([spec.format]))),
+    Case("select/allowlist_regex", _policy(lambda spec: AllowlistPolicy(regex=r"take_\d*[02468]"))),
+    Case("select/denylist_names", _policy(lambda spec: DenylistPolicy(names=["take_00000.wav"]))),
+    Case("select/composite", _policy(_names)),
+    Case(
+        "select/any",
+        _policy(lambda spec: AnyPolicy(ExtensionPolicy(["flac"]), AllowlistPolicy(regex="take"))),
+    ),
+    Case("select/compiled", _policy(_names, compiled=True)),
+    Case("select/duration", _policy(lambda spec: DurationPolicy(min=spec.duration / 2))),
+    Case("select/sample_rate", _policy(lambda spec: SampleRatePolicy(spec.rate))),
+    Case("select/channels", _policy(lambda spec: ChannelsPolicy(spec.channels))),
+    Case("select/bit_depth", _policy(lambda spec: BitDepthPolicy(spec.bit_depth))),
+    Case("select/clipped", _policy(lambda spec: ClippedPolicy())),
+    Case(
+        "select/compiled_metadata",
+        _policy(
+            lambda spec: CompositePolicy(_names(spec), SampleRatePolicy(spec.rate)), compiled=True
+        ),
+    ),
+]
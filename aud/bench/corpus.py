@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import math
+import random
+import shutil
+from array import array
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from pydub import AudioSegment
+
+from aud.core.pcm import write_audio
+
+# Written last into a corpus directory; a corpus without it is regenerated
+_MARKER = ".complete"
+
+# Sample sizes an AudioSegment holds as they are
+BIT_DEPTHS = (8, 16, 32)
+
+
+@dataclass(frozen=True, slots=True)
+class CorpusSpec:
+    """
+    A synthetic corpus: ``files`` files of ``duration`` seconds each, at
+    ``rate`` Hz with ``channels`` channels and ``bit_depth`` bits, written
+    as ``format``. The same spec (and ``seed``) always gives the same audio.
+    ``bit_depth`` is 8, 16 or 32: pydub keeps 24-bit audio as 32-bit.
+    """
+
+    files: int
+    duration: float
+    rate: int = 44100
+    channels: int = 2
+    format: str = "wav"
+    bit_depth: int = 16
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.bit_depth not in BIT_DEPTHS:
+            raise ValueError(f"Unsupported bit depth: {self.bit_depth}")
+
+    @property
+    def name(self) -> str:
+        return (
+            f"{self.files}x{self.duration:g}s-{self.rate}-{self.channels}ch"
+            f"-{self.bit_depth}bit-{self.format}-{self.seed}"
+        )
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.files * self.duration
+
+
+def synthesize(spec: CorpusSpec, number: int) -> AudioSegment:
+    """
+    File ``number`` of ``spec``: a tone with a little noise (pitch, level
+    and phase per channel drawn from the seed) and a quarter second of
+    silence in the middle, so silence detection has something to find.
+    """
+    rng = random.Random(f"{spec.seed}:{number}")
+    frequency = rng.uniform(110.0, 880.0)
+    amplitude = 32767 * 10 ** (rng.uniform(-18.0, -6.0) / 20)
+    phases = [rng.uniform(0.0, math.tau) for _ in range(spec.channels)]
+
+    # one second is computed and repeated: the corpus is about size, not content
+    second = array("h")
+    step = math.tau * frequency / spec.rate
+    for n in range(spec.rate):
+        noise = rng.uniform(-100.0, 100.0)
+        for offset in phases:
+            second.append(round(amplitude * math.sin(step * n + offset) + noise))
+
+    # other depths keep the 16 significant bits (as audioop.lin2lin converts)
+    width = spec.bit_depth // 8
+    if width == 1:
+        second = array("b", (sample >> 8 for sample in second))
+    elif width == 4:
+        second = array("i", (sample << 16 for sample in second))
+
+    frame_bytes = spec.channels * width
+    frames = round(spec.duration * spec.rate)
+    block = second.tobytes()
+    data = bytearray(block * (frames // spec.rate + 1))
+    del data[frames * frame_bytes :]
+
+    gap = min(spec.rate // 4, frames // 4)
+    start = (frames // 2 - gap // 2) * frame_bytes
+    data[start : start + gap * frame_bytes] = bytes(gap * frame_bytes)
+
+    return AudioSegment(
+        data=bytes(data), sample_width=width, frame_rate=spec.rate, channels=spec.channels
+    )
+
+
+def file_name(spec: CorpusSpec, number: int) -> str:
+    return f"take_{number:05d}.{spec.format}"
+
+
+def generate_corpus(spec: CorpusSpec, root: str | Path) -> Path:
+    """
+    Write the files of ``spec`` to ``root/<spec.name>`` and return that
+    directory. A complete corpus is reused as it is.
+    """
+    directory = Path(root) / spec.name
+    if (directory / _MARKER).exists():
+        return directory
+
+    if directory.exists():
+        shutil.rmtree(directory)
+    directory.mkdir(parents=True)
+    for number in range(spec.files):
+        write_audio(synthesize(spec, number), directory / file_name(spec, number), spec.format)
+    (directory / _MARKER).write_text(json.dumps(asdict(spec)))
+    return directory
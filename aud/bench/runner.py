@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import gc
+import importlib.util
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pydub.utils import get_prober_name
+
+import aud
+from aud.bench.cases import CASES, Case, Context
+from aud.bench.corpus import CorpusSpec, file_name, generate_corpus
+from aud.core.ffmpeg import ffmpeg
+from aud.core.pcm import PCM_FORMATS
+
+# Version of the results document; documents of other versions are not compared
+SCHEMA = 1
+
+
+@dataclass(frozen=True, slots=True)
+class Comparison:
+    """One case on one corpus, timed now and in the baseline (medians, seconds)."""
+
+    case: str
+    corpus: str
+    baseline: float
+    current: float
+    regressed: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline > 0 else float("inf")
+
+
+def missing(case: Case, spec: CorpusSpec) -> list[str]:
+    """What ``case`` needs on ``spec`` that is not available here."""
+    needs = set(case.requires)
+    if case.decodes and spec.format not in PCM_FORMATS:
+        # pydub decodes other formats with ffmpeg, after probing them with ffprobe
+        needs.update(("ffmpeg", "ffprobe"))
+    absent = []
+    if "ffmpeg" in needs and ffmpeg() is None:
+        absent.append("ffmpeg")
+    if "ffprobe" in needs and shutil.which(get_prober_name()) is None:
+        absent.append("ffprobe")
+    if "numpy" in needs and importlib.util.find_spec("numpy") is None:
+        absent.append("numpy")
+    return absent
+
+
+def select(patterns: Iterable[str] = (), cases: Iterable[Case] = CASES) -> list[Case]:
+    """The cases whose name contains any of ``patterns`` (all without patterns)."""
+    patterns = list(patterns)
+    return [case for case in cases if not patterns or any(p in case.name for p in patterns)]
+
+
+def run_suite(
+    specs: Iterable[CorpusSpec],
+    root: str | Path,
+    cases: Iterable[Case] = CASES,
+    repeat: int = 3,
+    progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Time every case on every corpus and return the results document.
+
+    Corpora are generated under ``root/corpora`` (and reused by later runs);
+    each repetition works on a fresh copy. Copying and ``Case.setup`` are
+    not timed. Every result is also passed to ``progress`` as it is done.
+    """
+    root = Path(root)
+    cases = list(cases)
+    results = []
+    for spec in specs:
+        corpus = generate_corpus(spec, root / "corpora")
+        clip_spec = CorpusSpec(1, 0.5, spec.rate, spec.channels, "wav", seed=spec.seed)
+        clip = generate_corpus(clip_spec, root / "corpora") / file_name(clip_spec, 0)
+        for case in cases:
+            result = _run_case(case, spec, corpus, clip, root / "work", repeat)
+            results.append(result)
+            if progress is not None:
+                progress(result)
+
+    return {
+        "schema": SCHEMA,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "aud": aud.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "ffmpeg": ffmpeg(),
+        "numpy": importlib.util.find_spec("numpy") is not None,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def _run_case(
+    case: Case, spec: CorpusSpec, corpus: Path, clip: Path, work: Path, repeat: int
+) -> dict:
+    result: dict = {"case": case.name, "corpus": spec.name, **asdict(spec)}
+    absent = missing(case, spec)
+    if absent:
+        return {**result, "skipped": "needs " + ", ".join(absent)}
+
+    times = []
+    for _ in range(repeat):
+        work.mkdir(parents=True, exist_ok=True)
+        scratch = Path(tempfile.mkdtemp(dir=work))
+        try:
+            directory = scratch / "corpus"
+            shutil.copytree(corpus, directory)
+            (scratch / "out").mkdir()
+            context = Context(spec, directory, scratch / "out", clip)
+            call = case.setup(context)
+            gc.collect()
+            start = time.perf_counter()
+            call()
+            times.append(time.perf_counter() - start)
+        except Exception as e:
+            return {**result, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    median = statistics.median(times)
+    return {
+        **result,
+        "times": times,
+        "min": min(times),
+        "median": median,
+        "realtime_factor": spec.audio_seconds / median if median > 0 else 0.0,
+    }
+
+
+def compare(
+    current: dict, baseline: dict, threshold: float = 0.1, floor: float = 0.005
+) -> list[Comparison]:
+    """
+    Compare the medians of ``current`` with those of ``baseline`` for every
+    case and corpus timed in both. A case has regressed when it got more
+    than ``threshold`` (relative) and ``floor`` seconds (absolute) slower;
+    the floor keeps timer noise on very fast cases from counting.
+    """
+    if baseline.get("schema") != SCHEMA:
+        raise ValueError(f"Unsupported baseline schema: {baseline.get('schema')!r}")
+
+    before = {(r["case"], r["corpus"]): r["median"] for r in baseline["results"] if "median" in r}
+    comparisons = []
+    for r in current["results"]:
+        key = (r["case"], r["corpus"])
+        if "median" not in r or key not in before:
+            continue
+        old, new = before[key], r["median"]
+        regressed = new > old * (1 + threshold) and new - old > floor
+        comparisons.append(Comparison(*key, old, new, regressed))
+    return comparisons
+
+
+def expand(
+    files: Iterable[int],
+    durations: Iterable[float],
+    rates: Iterable[int] = (44100,),
+    channels: Iterable[int] = (2,),
+    formats: Iterable[str] = ("wav",),
+    bit_depths: Iterable[int] = (16,),
+    seed: int = 0,
+) -> list[CorpusSpec]:
+    """Every combination of the scaling axes, as corpus specs."""
+    base = CorpusSpec(1, 1.0, seed=seed)
+    return [
+        replace(base, files=n, duration=d, rate=r, channels=c, format=f, bit_depth=b)
+        for n in files
+        for d in durations
+        for r in rates
+        for c in channels
+        for f in formats
+        for b in bit_depths
+    ]
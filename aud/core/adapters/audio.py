@@ -1,17 +1,25 @@
 from __future__ import annotations
 
-from random import randrange
+from functools import partial
+from pathlib import Path
+from typing import Any
 
 from pydub import AudioSegment
+from pydub import silence as pydub_silence
 from pydub.effects import (
     high_pass_filter,
     invert_phase,
     low_pass_filter,
-    normalize,
-    strip_silence,
 )
 
-from aud.core.models import AudioFile
+from aud.core.adapters.backends import get_backend
+from aud.core.adapters.stream import PcmSink
+from aud.core.cache import ASSETS, AudioCache
+from aud.core.executor import map_files
+from aud.core.headers import header_info
+from aud.core.inplace import apply_in_place
+from aud.core.metrics import Metrics
+from aud.core.models import AudioFile, AudioInfo, Measurement
 from aud.core.operations.audio.effects import (
     AppendAudio,
     AudioJoin,
@@ -26,163 +34,388 @@ from aud.core.operations.audio.effects import (
     StripSilence,
     Watermark,
 )
+from aud.core.pcm import PCM_FORMATS, read_audio, write_audio
+
+silence: Any
+try:
+    from aud.core.dsp import silence
+except ImportError:  # numpy is optional; pydub's detector is equivalent, only slower
+    silence = pydub_silence
+
+loudness: Any
+try:
+    from aud.core.dsp import loudness
+except ImportError:  # loudness (LUFS) and true-peak measurement need numpy
+    loudness = None
+
+
+def _like(audio: AudioSegment, data: bytes) -> AudioSegment:
+    # ``data`` as a segment in the format of ``audio``
+    return AudioSegment(
+        data=data,
+        sample_width=audio.sample_width,
+        frame_rate=audio.frame_rate,
+        channels=audio.channels,
+    )
 
 
 class AudioAdapter:
     """
     Executes audio operations using pydub.
+
+    Per-file effects are implemented as ``AudioSegment -> AudioSegment``
+    transforms (see ``apply``) so they can be chained in memory by the
+    pipeline adapter. ``execute`` wraps a single transform in a
+    load / apply / export round trip for each file.
+
+    With ``workers > 1`` files are processed in a process pool.
+
+    An optional ``AudioCache`` serves decodes made in the calling process;
+    every file the adapter writes is invalidated in it.
+
+    ``backend`` selects the sample-level implementation ("pydub" or
+    "numpy"); operations the backend does not implement fall back to pydub.
+
+    With ``memory_map=True``, Gain, InvertPhase and Fade scale the samples
+    of PCM WAV / AIFF files in place (see ``apply_in_place``) instead of
+    decoding and rewriting the whole file.
+
+    With ``metrics``, every file ``execute`` processes is measured (see
+    ``Metrics``).
     """
 
+    def __init__(
+        self,
+        workers: int = 1,
+        backend: str = "pydub",
+        cache: AudioCache | None = None,
+        memory_map: bool = False,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.workers = workers
+        self.backend = get_backend(backend)
+        self.cache = cache
+        self.memory_map = memory_map
+        self.metrics = metrics
+
+    def __getstate__(self) -> dict:
+        # Cached audio and collected metrics are not shipped to worker processes
+        state = self.__dict__.copy()
+        state["cache"] = None
+        state["metrics"] = None
+        return state
+
     def execute(self, operation, inputs: list[AudioFile]) -> list[AudioFile]:
+        if isinstance(operation, AudioJoin):
+            return self._audio_join(operation, inputs)
+
+        if not self.supports(operation):
+            raise TypeError(f"Unsupported audio operation: {operation}")
+
+        process = partial(self._process, operation)
+        try:
+            if self.metrics is not None:
+                name = type(operation).__name__
+                return self.metrics.map_files(name, process, inputs, self.workers)
+            return map_files(process, inputs, self.workers)
+        finally:
+            # Worker processes have no cache; files written in this process
+            # have updated it already (see _export)
+            if self.workers > 1:
+                self._invalidate(inputs)
+
+    def _process(self, operation, file: AudioFile) -> AudioFile:
+        if self.memory_map and apply_in_place(file.path, [operation]):
+            self._invalidate([file])
+            return file
+        audio = self.load(file)
+        audio = self.apply(operation, audio)
+        self._export(audio, file)
+        return file
+
+    def supports(self, operation) -> bool:
+        """Return True if ``operation`` is a per-file transform handled by ``apply``."""
+        return isinstance(
+            operation,
+            (
+                Normalize,
+                Fade,
+                Pad,
+                Gain,
+                LowPassFilter,
+                HighPassFilter,
+                InvertPhase,
+                StripSilence,
+                Watermark,
+                PrependAudio,
+                AppendAudio,
+            ),
+        )
+
+    def apply(self, operation, audio):
+        if self.backend.supports(operation):
+            return self.backend.apply(operation, audio, self._asset)
+
+        audio = self.backend.to_segment(audio)
         if isinstance(operation, Normalize):
-            return self._normalize(operation, inputs)
+            return self._normalize(operation, audio)
         if isinstance(operation, Fade):
-            return self._fade(operation, inputs)
+            return self._fade(operation, audio)
         if isinstance(operation, Pad):
-            return self._pad(operation, inputs)
+            return self._pad(operation, audio)
         if isinstance(operation, Gain):
-            return self._gain(operation, inputs)
+            return self._gain(operation, audio)
         if isinstance(operation, LowPassFilter):
-            return self._lpf(operation, inputs)
+            return self._lpf(operation, audio)
         if isinstance(operation, HighPassFilter):
-            return self._hpf(operation, inputs)
+            return self._hpf(operation, audio)
         if isinstance(operation, InvertPhase):
-            return self._invert(operation, inputs)
+            return self._invert(operation, audio)
         if isinstance(operation, StripSilence):
-            return self._strip_silence(operation, inputs)
+            return self._strip_silence(operation, audio)
         if isinstance(operation, Watermark):
-            return self._watermark(operation, inputs)
-        if isinstance(operation, AudioJoin):
-            return self._audio_join(operation, inputs)
+            return self._watermark(operation, audio)
         if isinstance(operation, PrependAudio):
-            return self._prepend_audio(operation, inputs)
+            return self._prepend_audio(operation, audio)
         if isinstance(operation, AppendAudio):
-            return self._append_audio(operation, inputs)
+            return self._append_audio(operation, audio)
 
         raise TypeError(f"Unsupported audio operation: {operation}")
 
-    def _load(self, file: AudioFile) -> AudioSegment:
-        return AudioSegment.from_file(file.path, file.extension)
+    def load(self, file: AudioFile) -> AudioSegment:
+        """Decode ``file``, through ``cache`` when there is one."""
+        if self.cache is not None:
+            return self.cache.load(file.path, file.extension)
+        return read_audio(file.path, file.extension)
 
-    def _export(self, audio: AudioSegment, file: AudioFile) -> None:
-        audio.export(file.path, format=file.extension)
+    def _invalidate(self, files: list[AudioFile]) -> None:
+        if self.cache is not None:
+            for file in files:
+                self.cache.invalidate(file.path)
 
-    def _normalize(self, op: Normalize, files):
-        for file in files:
-            audio = self._load(file)
-            for _ in range(op.passes):
-                audio = normalize(audio, headroom=op.target_db)
-            self._export(audio, file)
-        return files
+    def _export(self, audio, file: AudioFile) -> None:
+        segment = self.backend.to_segment(audio)
+        try:
+            write_audio(segment, file.path, file.extension)
+        except BaseException:
+            self._invalidate([file])
+            raise
 
-    def _fade(self, op: Fade, files):
-        for file in files:
-            audio = self._load(file)
-            if op.fade_in > 0:
-                audio = audio.fade_in(int(op.fade_in * 1000))
-            if op.fade_out > 0:
-                audio = audio.fade_out(int(op.fade_out * 1000))
-            self._export(audio, file)
-        return files
-
-    def _pad(self, op: Pad, files):
-        for file in files:
-            audio = self._load(file)
-            if op.pad_in > 0:
-                audio = AudioSegment.silent(duration=int(op.pad_in * 1000)) + audio
-            if op.pad_out > 0:
-                audio = audio + AudioSegment.silent(duration=int(op.pad_out * 1000))
-            self._export(audio, file)
-        return files
-
-    def _gain(self, op: Gain, files):
-        for file in files:
-            audio = self._load(file)
-            audio = audio + op.amount_db
-            self._export(audio, file)
-        return files
+        if self.cache is None:
+            return
+        # WAV / AIFF decode back to the written samples (24-bit is widened on
+        # decode), so the next operation on the file need not decode it again
+        if file.extension in PCM_FORMATS and segment.sample_width != 3:
+            self.cache.store(file.path, segment, file.extension)
+        else:
+            self.cache.invalidate(file.path)
 
-    def _lpf(self, op: LowPassFilter, files):
-        for file in files:
-            audio = self._load(file)
-            audio = low_pass_filter(audio, op.cutoff_hz)
-            self._export(audio, file)
-        return files
+    @staticmethod
+    def _asset(
+        path: Path,
+        frame_rate: int | None = None,
+        channels: int | None = None,
+        sample_width: int | None = None,
+    ) -> AudioSegment:
+        # Shared inputs are decoded and converted once per process (see ASSETS)
+        format = Path(path).suffix.lstrip(".")
+        return ASSETS.conformed(path, format, frame_rate, channels, sample_width)
 
-    def _hpf(self, op: HighPassFilter, files):
-        for file in files:
-            audio = self._load(file)
-            audio = high_pass_filter(audio, op.cutoff_hz)
-            self._export(audio, file)
-        return files
+    def _synced_asset(self, path: Path, audio: AudioSegment) -> AudioSegment:
+        # The parameters pydub would convert both segments to when mixing them
+        asset = self._asset(path)
+        return self._asset(
+            path,
+            frame_rate=max(asset.frame_rate, audio.frame_rate),
+            channels=max(asset.channels, audio.channels),
+            sample_width=max(asset.sample_width, audio.sample_width),
+        )
 
-    def _invert(self, op: InvertPhase, files):
+    def measure(self, op: Normalize, audio) -> Measurement:
+        """Measure the levels ``op`` needs, in a single pass over ``audio``."""
+        oversample = op.true_peak is not None
+        needs_numpy = op.needs_loudness or oversample
+
+        if loudness is not None and not isinstance(audio, AudioSegment):
+            return loudness.measure(audio, loudness=op.needs_loudness, oversample=oversample)
+        if loudness is not None and needs_numpy:
+            return loudness.measure_segment(
+                audio, loudness=op.needs_loudness, oversample=oversample
+            )
+
+        if needs_numpy:
+            raise ImportError("Loudness measurement requires numpy: pip install aud[numpy]")
+
+        amplitude = audio.max_possible_amplitude
+        return Measurement(
+            peak=audio.max / amplitude,
+            mean_square=(audio.rms / amplitude) ** 2,
+            frames=int(audio.frame_count()),
+        )
+
+    def album_gain(self, op: Normalize, inputs: list[AudioFile]) -> float | None:
+        """
+        Gain that brings ``inputs``, taken together, to ``op``'s target.
+
+        Files are measured in parallel (``workers``); loudness blocks are
+        pooled so gating applies across the whole album.
+        """
+        measurements = map_files(partial(self._measure_file, op), inputs, self.workers)
+        return op.gain_for(Measurement.combine(measurements))
+
+    def _measure_file(self, op: Normalize, file: AudioFile) -> Measurement:
+        return self.measure(op, self.load(file))
+
+    def _normalize(self, op: Normalize, audio: AudioSegment) -> AudioSegment:
+        # Measure once, apply once: a second pass would find nothing to correct
+        gain = op.gain_db if op.gain_db is not None else op.gain_for(self.measure(op, audio))
+        return audio if gain is None else audio.apply_gain(gain)
+
+    def _fade(self, op: Fade, audio: AudioSegment) -> AudioSegment:
+        if op.fade_in > 0:
+            audio = audio.fade_in(int(op.fade_in * 1000))
+        if op.fade_out > 0:
+            audio = audio.fade_out(int(op.fade_out * 1000))
+        return audio
+
+    def _pad(self, op: Pad, audio: AudioSegment) -> AudioSegment:
+        if op.pad_in > 0:
+            audio = AudioSegment.silent(duration=int(op.pad_in * 1000)) + audio
+        if op.pad_out > 0:
+            audio = audio + AudioSegment.silent(duration=int(op.pad_out * 1000))
+        return audio
+
+    def _gain(self, op: Gain, audio: AudioSegment) -> AudioSegment:
+        return audio + op.amount_db
+
+    def _lpf(self, op: LowPassFilter, audio: AudioSegment) -> AudioSegment:
+        return low_pass_filter(audio, op.cutoff_hz)
+
+    def _hpf(self, op: HighPassFilter, audio: AudioSegment) -> AudioSegment:
+        return high_pass_filter(audio, op.cutoff_hz)
+
+    def _invert(self, op: InvertPhase, audio: AudioSegment) -> AudioSegment:
         channels = {
             "both": (1, 1),
             "left": (1, 0),
             "right": (0, 1),
         }
+        return invert_phase(audio, channels.get(op.channel, (1, 1)))
 
-        for file in files:
-            audio = self._load(file)
-            audio = invert_phase(audio, channels.get(op.channel, (1, 1)))
-            self._export(audio, file)
-        return files
+    def nonsilent_ranges(self, op: StripSilence, audio) -> list[list[int]]:
+        """Return the ``[start, end]`` (ms) ranges ``op`` would keep, before padding."""
+        audio = self.backend.to_segment(audio)
+        return silence.detect_nonsilent(audio, op.silence_length, op.silence_threshold)
 
-    def _strip_silence(self, op: StripSilence, files):
-        for file in files:
-            audio = self._load(file)
-            audio = strip_silence(audio, op.silence_length, op.silence_threshold, op.padding)
-            self._export(audio, file)
-        return files
+    def _strip_silence(self, op: StripSilence, audio: AudioSegment) -> AudioSegment:
+        # Same result as pydub.effects.strip_silence, with vectorized detection
+        if op.padding > op.silence_length:
+            raise ValueError("padding cannot be longer than silence_length")
 
-    def _watermark(self, op: Watermark, files):
-        # Load watermark file
-        watermark = AudioSegment.from_file(op.watermark_file, op.watermark_file.suffix.lstrip("."))
-        min_ms = int(op.frequency_min * 1000)
-        max_ms = int(op.frequency_max * 1000)
+        ranges = [
+            [start - op.padding, end + op.padding]
+            for start, end in self.nonsilent_ranges(op, audio)
+        ]
+        for current, following in zip(ranges, ranges[1:], strict=False):
+            if following[0] < current[1]:
+                current[1] = (current[1] + following[0]) // 2
+                following[0] = current[1]
 
-        for file in files:
-            audio = self._load(file)
-            if len(audio) > len(watermark) + max_ms:
-                cur = 0
-                while True:
-                    rng = randrange(min_ms, max_ms) + len(watermark)
-                    cur += rng
-                    if (cur + max_ms + len(watermark)) < len(audio):
-                        audio = audio.overlay(watermark, cur, gain_during_overlay=-2)
-                    else:
-                        break
-            self._export(audio, file)
-        return files
+        chunks = [audio[max(start, 0) : min(end, len(audio))] for start, end in ranges]
+        if not chunks:
+            return audio[0:0]
+
+        result = chunks[0]
+        for chunk in chunks[1:]:
+            result = result.append(chunk, crossfade=op.padding / 2)
+        return result
+
+    def _watermark(self, op: Watermark, audio: AudioSegment) -> AudioSegment:
+        """
+        Mix every watermark placement in a single pass.
+
+        The schedule is computed first. The windows under the placements
+        are gathered into one segment and ducked + mixed with the repeated
+        watermark by a single overlay; the output is then assembled from
+        the untouched stretches and the mixed windows. The watermark is
+        conformed to the target's format once per process and format.
+        """
+        watermark = self._asset(
+            op.watermark_file, audio.frame_rate, audio.channels, audio.sample_width
+        )
+
+        positions = op.schedule(len(audio), len(watermark))
+        if not positions:
+            return audio
+
+        # as overlay does, a window and the watermark are mixed over the shorter of the two
+        mark = watermark.raw_data
+        windows = [audio[position : position + len(watermark)].raw_data for position in positions]
+        sizes = [min(len(window), len(mark)) for window in windows]
+        under = _like(audio, b"".join(w[:size] for w, size in zip(windows, sizes, strict=True)))
+        marks = _like(audio, b"".join(mark[:size] for size in sizes))
+        mixed = under.overlay(marks, gain_during_overlay=op.gain_during_overlay).raw_data
+
+        parts: list[bytes] = []
+        previous = offset = 0
+        for position, window, size in zip(positions, windows, sizes, strict=True):
+            parts.append(audio[previous:position].raw_data)
+            parts += [mixed[offset : offset + size], window[size:]]
+            offset += size
+            previous = position + len(watermark)
+        parts.append(audio[previous:].raw_data)
+
+        return _like(audio, b"".join(parts))
 
     def _audio_join(self, op: AudioJoin, files):
-        # Join all files into one
-        combined = AudioSegment.silent(duration=1)
-        for file in files:
-            audio = self._load(file)
-            combined = combined + audio
+        """
+        Stream every file, in order, into a single encoder.
 
-        # Export to target location
-        combined.export(op.target_location, format=op.file_format)
-        return [AudioFile(op.target_location)]
+        The output takes the highest frame rate, channel count and sample
+        width among the inputs, as pydub does when it joins two segments;
+        they are read from the headers up front. Each input is then decoded,
+        conformed and written out before the next one is loaded, so memory
+        stays bounded by the largest single input and the cost is linear in
+        the total length.
+        """
+        files = list(files)
+        sink: PcmSink | None = None
+        try:
+            sink = self._join_sink(op, files)
+            for file in files:
+                audio = self.backend.to_segment(self.load(file))
+                sink.write(sink.conform(audio).raw_data)
+        finally:
+            if sink is not None:
+                sink.close()
+            self._invalidate([AudioFile(op.target_location)])
 
-    def _prepend_audio(self, op: PrependAudio, files):
-        # Load the audio to prepend
-        prepend_audio = AudioSegment.from_file(op.audio_file, op.audio_file.suffix.lstrip("."))
+        return [AudioFile(op.target_location)]
 
+    def _join_sink(self, op: AudioJoin, files: list[AudioFile]) -> PcmSink:
+        empty = AudioSegment.empty()
+        frame_rate, channels, width = empty.frame_rate, empty.channels, empty.sample_width
         for file in files:
-            audio = self._load(file)
-            audio = prepend_audio + audio
-            self._export(audio, file)
-        return files
+            info = header_info(file.path)
+            if info is None:
+                # no header we can parse: decode it once more to find out
+                audio = self.backend.to_segment(self.load(file))
+                info = AudioInfo(0, audio.frame_rate, audio.channels, audio.sample_width * 8)
+            frame_rate = max(frame_rate, info.frame_rate)
+            channels = max(channels, info.channels)
+            # lossy streams decode to 16 bit
+            width = max(width, ((info.bit_depth or 16) + 7) // 8)
 
-    def _append_audio(self, op: AppendAudio, files):
-        # Load the audio to append
-        append_audio = AudioSegment.from_file(op.audio_file, op.audio_file.suffix.lstrip("."))
+        return PcmSink(
+            op.target_location,
+            op.file_format,
+            frame_rate=frame_rate,
+            channels=channels,
+            sample_width=width,
+        )
 
-        for file in files:
-            audio = self._load(file)
-            audio = audio + append_audio
-            self._export(audio, file)
-        return files
+    def _prepend_audio(self, op: PrependAudio, audio: AudioSegment) -> AudioSegment:
+        return self._synced_asset(op.audio_file, audio) + audio
+
+    def _append_audio(self, op: AppendAudio, audio: AudioSegment) -> AudioSegment:
+        return audio + self._synced_asset(op.audio_file, audio)
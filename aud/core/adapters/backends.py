@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pydub import AudioSegment
+
+
+class PydubBackend:
+    """
+    Default backend: operations run through the adapters' own pydub code.
+    """
+
+    name = "pydub"
+
+    def supports(self, operation) -> bool:
+        return False
+
+    def apply(self, operation, audio: AudioSegment, asset=None) -> AudioSegment:
+        raise TypeError(f"Unsupported pydub backend operation: {operation}")
+
+    @staticmethod
+    def to_segment(audio: AudioSegment) -> AudioSegment:
+        return audio
+
+
+def get_backend(name: str = "pydub"):
+    """
+    Return the audio backend called ``name`` ("pydub" or "numpy").
+
+    A backend may implement a subset of the operations (``supports``); the
+    adapters fall back to pydub for the rest, converting the audio back with
+    ``to_segment`` first. ``apply`` receives the adapter's asset loader,
+    ``asset(path, frame_rate, channels, sample_width)``, for operations that
+    mix in another file.
+    """
+    if name == "pydub":
+        return PydubBackend()
+
+    if name == "numpy":
+        try:
+            from aud.core.dsp.backend import NumpyBackend
+        except ImportError as e:
+            raise ImportError("The numpy backend requires numpy: pip install aud[numpy]") from e
+        return NumpyBackend()
+
+    raise ValueError(f"Unknown audio backend: {name}")
@@ -1,77 +1,271 @@
 from __future__ import annotations
 
+from functools import partial
+
 from pydub import AudioSegment
 from pydub.effects import apply_gain_stereo
 
+from aud.core.adapters.backends import get_backend
+from aud.core.cache import AudioCache
+from aud.core.executor import map_batches, map_files
+from aud.core.ffmpeg import can_transcode, transcode, transcode_batch
+from aud.core.filtergraph import Stream, audio_filters
+from aud.core.headers import header_info
+from aud.core.metrics import Metrics
 from aud.core.models import AudioFile
 from aud.core.operations.audio.convert import (
     ConvertFormat,
     ConvertToMono,
     ConvertToStereo,
 )
+from aud.core.pcm import read_audio, write_audio
 
 
 class ConversionAdapter:
     """
-    Executes format / channel conversions using pydub.
+    Executes format / channel conversions.
+
+    Like ``AudioAdapter``, the sample-level part of each conversion is an
+    in-memory transform (``apply``); ``export_options`` describes how a
+    ``ConvertFormat`` changes the encoder settings.
+
+    With ``workers > 1`` files are processed in a process pool; ``backend``
+    and ``cache`` work as in ``AudioAdapter``.
+
+    When ffmpeg is available and ``direct`` is set (the default),
+    conversions that need no sample-level work in Python are run as one
+    ffmpeg process per file (see ``transcode``). Otherwise files are
+    decoded, converted by ``backend`` (pydub or NumPy) and encoded again.
+
+    With ``native`` the same is done for chains that include effects: they
+    are lowered to an ffmpeg filter chain (see ``aud.core.filtergraph``).
+    Chains with an operation that has no exact filter equivalent (Normalize,
+    StripSilence, Watermark, ...) still go through Python. Results match the
+    Python path up to rounding.
+
+    With ``batch_size > 1`` those ffmpeg jobs are grouped, ``batch_size``
+    files per ffmpeg process, which pays off for many short files where
+    starting the process costs more than the conversion itself.
+
+    ``metrics`` works as in ``AudioAdapter``.
     """
 
+    def __init__(
+        self,
+        workers: int = 1,
+        backend: str = "pydub",
+        cache: AudioCache | None = None,
+        direct: bool = True,
+        native: bool = False,
+        batch_size: int = 1,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.workers = workers
+        self.backend = get_backend(backend)
+        self.cache = cache
+        self.direct = direct
+        self.native = native
+        self.batch_size = batch_size
+        self.metrics = metrics
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["cache"] = None
+        state["metrics"] = None
+        return state
+
     def execute(self, operation, inputs: list[AudioFile]) -> list[AudioFile]:
+        if not self.supports(operation):
+            raise TypeError(f"Unsupported conversion operation: {operation}")
+
+        process = partial(self._process, operation)
+        size, workers, metrics = self.batch_size, self.workers, self.metrics
+        name = type(operation).__name__
+        try:
+            if size > 1:
+                batch = partial(self._process_many, operation)
+                if metrics is not None:
+                    return metrics.map_batches(name, batch, process, inputs, size, workers)
+                return map_batches(batch, process, inputs, size, workers)
+            if metrics is not None:
+                return metrics.map_files(name, process, inputs, workers)
+            return map_files(process, inputs, workers)
+        finally:
+            self._invalidate(inputs)
+            if isinstance(operation, ConvertFormat):
+                self._invalidate([operation.apply(file) for file in inputs])
+
+    def _process(self, operation, file: AudioFile) -> AudioFile:
         if isinstance(operation, ConvertFormat):
-            return self._convert_format(operation, inputs)
+            return self._convert_format(operation, file)
+        if self.transcode([operation], file, file):
+            return file
+
+        audio = self.load(file)
+        audio = self.apply(operation, audio)
+        self._export(audio, file)
+        return file
+
+    def _process_many(self, operation, files: list[AudioFile]) -> list[AudioFile | None]:
+        targets = [operation.apply(f) if isinstance(operation, ConvertFormat) else f for f in files]
+        return self.transcode_many(
+            [([operation], f, t) for f, t in zip(files, targets, strict=True)]
+        )
+
+    def supports(self, operation) -> bool:
+        return isinstance(operation, (ConvertFormat, ConvertToMono, ConvertToStereo))
+
+    def apply(self, operation, audio):
+        if self.backend.supports(operation):
+            return self.backend.apply(operation, audio)
+
+        audio = self.backend.to_segment(audio)
+        if isinstance(operation, ConvertFormat):
+            return self._resample(operation, audio)
         if isinstance(operation, ConvertToMono):
-            return self._mono(inputs)
+            return self._mono(audio)
         if isinstance(operation, ConvertToStereo):
-            return self._stereo(inputs)
+            return self._stereo(audio)
 
         raise TypeError(f"Unsupported conversion operation: {operation}")
 
-    def _load(self, file: AudioFile) -> AudioSegment:
-        return AudioSegment.from_file(file.path, file.extension)
+    @staticmethod
+    def export_options(operation: ConvertFormat) -> dict:
+        return {"tags": operation.tags, "cover": operation.cover}
+
+    def load(self, file: AudioFile) -> AudioSegment:
+        """Decode ``file``, through ``cache`` when there is one."""
+        if self.cache is not None:
+            return self.cache.load(file.path, file.extension)
+        return read_audio(file.path, file.extension)
+
+    def _invalidate(self, files: list[AudioFile]) -> None:
+        if self.cache is not None:
+            for file in files:
+                self.cache.invalidate(file.path)
+
+    def _export(self, audio, file: AudioFile, format: str | None = None, **kwargs):
+        audio = self.backend.to_segment(audio)
+        write_audio(audio, file.path, format or file.extension, **kwargs)
+
+    def transcode(self, operations: list, source: AudioFile, target: AudioFile) -> bool:
+        """
+        Run ``operations`` on ``source`` as a single ffmpeg process writing
+        ``target``. Returns False, without doing anything, unless they are
+        all conversions ffmpeg can do by itself (or, with ``native``, all
+        have a filter equivalent).
+        """
+        settings = self.lower(operations, source, target)
+        if settings is None:
+            return False
+
+        transcode(source.path, target.path, **settings)
+        return True
+
+    def transcode_many(
+        self, jobs: list[tuple[list, AudioFile, AudioFile]]
+    ) -> list[AudioFile | None]:
+        """
+        ``transcode`` for several ``(operations, source, target)`` jobs with a
+        single ffmpeg process. Returns the target of every job that was
+        run and None for the others, which are left untouched.
+        """
+        results: list[AudioFile | None] = [None] * len(jobs)
+        batch = []
+        for index, (operations, source, target) in enumerate(jobs):
+            settings = self.lower(operations, source, target)
+            if settings is not None:
+                batch.append((index, source, target, settings))
+
+        if batch:
+            transcode_batch([(s.path, t.path, settings) for _, s, t, settings in batch])
+        for index, _, target, _ in batch:
+            results[index] = target
+        return results
+
+    def lower(self, operations: list, source: AudioFile, target: AudioFile) -> dict | None:
+        """The ``transcode`` settings for ``operations``, or None if ffmpeg cannot do them."""
+        settings = self._lower(operations, target) if self.direct else None
+        if settings is None and self.native:
+            settings = self._lower_filters(operations, source, target)
+        if settings is None:
+            return None
+        if not can_transcode(source.path, settings["format"], settings["cover"]):
+            return None
+        return settings
+
+    def _lower(self, operations: list, target: AudioFile) -> dict | None:
+        settings: dict = {"format": target.extension, "sample_rate": None, "bit_depth": None}
+        settings.update(channels=None, tags=None, cover=None)
 
-    def _export(self, audio: AudioSegment, file: AudioFile, format: str | None = None, **kwargs):
-        audio.export(file.path, format=format or file.extension, **kwargs)
+        for op in operations:
+            if isinstance(op, ConvertFormat):
+                if op.bit_depth:
+                    # same validation as the pydub path
+                    self.bit_depth_to_width(op.bit_depth)
+                settings["format"] = op.target_format
+                settings["sample_rate"] = op.sample_rate or settings["sample_rate"]
+                settings["bit_depth"] = op.bit_depth or settings["bit_depth"]
+                settings.update(self.export_options(op))
+            elif isinstance(op, ConvertToMono):
+                settings["channels"] = 1
+            elif isinstance(op, ConvertToStereo) and settings["channels"] != 1:
+                settings["channels"] = 2
+            else:
+                # other operations, or mono → stereo (which copies the downmix)
+                return None
+        return settings
 
-    def _convert_format(self, op: ConvertFormat, files):
-        outputs: list[AudioFile] = []
+    def _lower_filters(self, operations: list, source: AudioFile, target: AudioFile) -> dict | None:
+        settings: dict = {"format": target.extension, "bit_depth": None, "tags": None}
+        settings.update(cover=None, filters=[])
 
-        for file in files:
-            audio = self._load(file)
+        info = header_info(source.path)
+        stream = Stream()
+        if info is not None:
+            # only PCM / FLAC headers give the exact length (lossy ones estimate it)
+            duration = info.duration if info.bit_depth is not None else None
+            stream = Stream(info.channels, info.frame_rate, duration)
+        for op in operations:
+            filters = audio_filters(op, stream)
+            if filters is None:
+                return None
+            settings["filters"] += filters
+            if isinstance(op, ConvertFormat):
+                if op.bit_depth:
+                    self.bit_depth_to_width(op.bit_depth)
+                settings["format"] = op.target_format
+                settings["bit_depth"] = op.bit_depth or settings["bit_depth"]
+                settings.update(self.export_options(op))
+        return settings
 
-            if op.sample_rate:
-                audio = audio.set_frame_rate(op.sample_rate)
+    def _convert_format(self, op: ConvertFormat, file: AudioFile) -> AudioFile:
+        target = op.apply(file)
+        if self.transcode([op], file, target):
+            return target
 
-            if op.bit_depth:
-                audio = audio.set_sample_width(self._bit_depth_to_width(op.bit_depth))
+        audio = self.apply(op, self.load(file))
+        self._export(audio, target, format=op.target_format, **self.export_options(op))
+        return target
 
-            self._export(
-                audio,
-                file.with_path(file.path.with_suffix(f".{op.target_format}")),
-                format=op.target_format,
-                tags=op.tags,
-                cover=op.cover,
-            )
+    def _resample(self, op: ConvertFormat, audio: AudioSegment) -> AudioSegment:
+        if op.sample_rate:
+            audio = audio.set_frame_rate(op.sample_rate)
 
-            outputs.append(file.with_path(file.path.with_suffix(f".{op.target_format}")))
+        if op.bit_depth:
+            audio = audio.set_sample_width(self.bit_depth_to_width(op.bit_depth))
 
-        return outputs
+        return audio
 
-    def _mono(self, files):
-        for file in files:
-            audio = self._load(file)
-            audio = audio.set_channels(1)
-            self._export(audio, file)
-        return files
+    def _mono(self, audio: AudioSegment) -> AudioSegment:
+        return audio.set_channels(1)
 
-    def _stereo(self, files):
-        for file in files:
-            audio = self._load(file)
-            audio = apply_gain_stereo(audio, 0, 0)
-            self._export(audio, file)
-        return files
+    def _stereo(self, audio: AudioSegment) -> AudioSegment:
+        return apply_gain_stereo(audio, 0, 0)
 
     @staticmethod
-    def _bit_depth_to_width(bit_depth: int) -> int:
+    def bit_depth_to_width(bit_depth: int) -> int:
+        """The pydub sample width (bytes) for ``bit_depth``; ValueError if unsupported."""
         if bit_depth == 8:
             return 1
         if bit_depth == 16:
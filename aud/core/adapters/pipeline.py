@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import shutil
+from collections.abc import Iterable
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from aud.core.adapters.audio import AudioAdapter
+from aud.core.adapters.convert import ConversionAdapter
+from aud.core.adapters.filesystem import FileSystemAdapter
+from aud.core.executor import map_batches, map_files
+from aud.core.ffmpeg import transcode_async
+from aud.core.inplace import apply_in_place
+from aud.core.metrics import Metrics, in_executor
+from aud.core.models import AudioFile
+from aud.core.operations.archive import Zip
+from aud.core.operations.audio.convert import ConvertFormat
+from aud.core.operations.audio.effects import AudioJoin
+from aud.core.operations.base import Operation
+from aud.core.operations.files import Backup, Copy
+from aud.core.pcm import write_audio
+from aud.core.plan import Plan
+
+# Operations that turn many files into one; they split a plan into stages.
+AGGREGATE_OPERATIONS = (Zip, AudioJoin)
+
+# Operations that produce a new file and leave the current one where it is.
+BRANCHING_OPERATIONS = (Copy, Backup, ConvertFormat)
+
+
+@dataclass(slots=True)
+class Route:
+    """
+    Where a single source file ends up after a fused stage.
+
+    ``keep_at`` is the place the untouched source rests afterwards, or None
+    when the output replaces it (only renames / moves were applied).
+    ``branches`` are the files later branching operations leave behind,
+    each with the number of ``transforms`` applied to it.
+    """
+
+    source: AudioFile
+    target: AudioFile
+    keep_at: AudioFile | None
+    transforms: list[Operation] = field(default_factory=list)
+    convert: ConvertFormat | None = None
+    branches: list[tuple[AudioFile, int]] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return self.source.name
+
+    @property
+    def outputs(self) -> list[AudioFile]:
+        """Every file the route writes or moves the source to."""
+        files = [self.target, *(branch for branch, _ in self.branches)]
+        return files if self.keep_at is None else [*files, self.keep_at]
+
+    @property
+    def staged(self) -> bool:
+        """True when a branch gets only part of the transforms (see ``_render``)."""
+        return any(applied for _, applied in self.branches)
+
+
+class PipelineAdapter:
+    """
+    Executes a whole Plan with a single decode and a single export per file.
+
+    Consecutive per-file operations are fused into one stage. For every file
+    the stage resolves the final destination up front (renames, moves,
+    copies and format changes only affect the path), decodes once, applies
+    every audio / conversion transform in memory and exports once.
+
+    Aggregate operations (Zip, AudioJoin) end a stage and run through their
+    regular adapters on the stage outputs.
+
+    Intermediate in-place states are never written: the source keeps its
+    original contents. Every branching operation (copy, backup, format
+    change) still leaves its file behind, with the transforms made before
+    it, as running the operations one by one does.
+
+    Routes are resolved in the calling process, so ``workers > 1`` only fans
+    out the per-file decode / process / export work. Routes ffmpeg can
+    produce by itself are grouped per ``convert.batch_size`` (see
+    ``ConversionAdapter``). With ``metrics`` every route is measured, under
+    the operation name "pipeline".
+    """
+
+    def __init__(
+        self,
+        audio: AudioAdapter | None = None,
+        convert: ConversionAdapter | None = None,
+        filesystem: FileSystemAdapter | None = None,
+        workers: int = 1,
+        metrics: Metrics | None = None,
+    ):
+        self.audio = audio or AudioAdapter()
+        self.convert = convert or ConversionAdapter()
+        self.filesystem = filesystem or FileSystemAdapter()
+        self.workers = workers
+        self.metrics = metrics
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["metrics"] = None
+        return state
+
+    def execute(self, plan: Plan) -> list[AudioFile]:
+        files: Iterable[AudioFile] = plan.files
+
+        for stage in self.stages(plan.operations):
+            if len(stage) == 1 and isinstance(stage[0], AGGREGATE_OPERATIONS):
+                files = self._aggregate(stage[0], list(files))
+            else:
+                # Routes are resolved as files arrive, so a lazily scanned
+                # selection starts processing before the listing finishes
+                routes: list[Route] = []
+                try:
+                    files = self.run_all(self._track(stage, files, routes))
+                finally:
+                    self._invalidate(routes)
+
+        return list(files)
+
+    # ------------------------------------------------------------------
+    # planning
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def stages(operations: list[Operation]) -> list[list[Operation]]:
+        stages: list[list[Operation]] = []
+        current: list[Operation] = []
+
+        for op in operations:
+            if isinstance(op, AGGREGATE_OPERATIONS):
+                if current:
+                    stages.append(current)
+                    current = []
+                stages.append([op])
+            else:
+                current.append(op)
+
+        if current:
+            stages.append(current)
+        return stages
+
+    def routes(self, operations: list[Operation], files: Iterable[AudioFile]) -> Iterable[Route]:
+        # A lazily scanned (recursive) listing can reach a folder this stage
+        # writes into; files it already planned to write are outputs, not inputs
+        planned: set[Path] = set()
+        for file in files:
+            if file.path in planned:
+                continue
+            route = self.route(operations, file)
+            planned.update(output.path for output in route.outputs if output.path != file.path)
+            yield route
+
+    def _track(
+        self, operations: list[Operation], files: Iterable[AudioFile], seen: list[Route]
+    ) -> Iterable[Route]:
+        for route in self.routes(operations, files):
+            seen.append(route)
+            yield route
+
+    def route(self, operations: list[Operation], file: AudioFile) -> Route:
+        route = Route(source=file, target=file, keep_at=None)
+
+        for op in operations:
+            applied = len(route.transforms)
+            if self.audio.supports(op):
+                route.transforms.append(op)
+                continue
+
+            if isinstance(op, ConvertFormat):
+                route.transforms.append(op)
+                route.convert = op
+            elif self.convert.supports(op):
+                route.transforms.append(op)
+                continue
+
+            if isinstance(op, BRANCHING_OPERATIONS):
+                if route.keep_at is None:
+                    route.keep_at = route.target
+                elif route.target.path != file.path:
+                    route.branches.append((route.target, applied))
+
+            result = op.apply(route.target)
+            if not isinstance(result, AudioFile):
+                raise TypeError(f"Operation cannot be fused: {op}")
+            route.target = result
+
+        # a branch a later operation writes over is not left behind
+        later = {route.target.path}
+        for branch in reversed(route.branches[:]):
+            if branch[0].path in later:
+                route.branches.remove(branch)
+            later.add(branch[0].path)
+        return route
+
+    # ------------------------------------------------------------------
+    # execution
+    # ------------------------------------------------------------------
+
+    def run_all(self, routes: Iterable[Route]) -> list[AudioFile]:
+        """``run`` every route, batching ffmpeg work when ``convert.batch_size > 1``."""
+        size, metrics = self.convert.batch_size, self.metrics
+        if size > 1:
+            if metrics is not None:
+                return metrics.map_batches(
+                    "pipeline", self.run_many, self.run, routes, size, self.workers
+                )
+            return map_batches(self.run_many, self.run, routes, size, self.workers)
+        if metrics is not None:
+            return metrics.map_files("pipeline", self.run, routes, self.workers)
+        return map_files(self.run, routes, self.workers)
+
+    def run(self, route: Route) -> AudioFile:
+        source, target = route.source.path, route.target.path
+        self.filesystem.ensure_dir(target.parent)
+
+        if route.transforms:
+            if self._in_place(route):
+                return route.target
+            # Pure conversions go straight through ffmpeg
+            if route.staged or not self.convert.transcode(
+                route.transforms, route.source, route.target
+            ):
+                self._render(route)
+            return self._settle(route)
+
+        if target == source:
+            return route.target
+
+        self._copy_branches(route)
+        if route.keep_at is None:
+            shutil.move(source, target)
+        else:
+            shutil.copy2(source, target)
+            if route.keep_at.path != source:
+                self.filesystem.ensure_dir(route.keep_at.path.parent)
+                shutil.move(source, route.keep_at.path)
+        return route.target
+
+    def run_many(self, routes: list[Route]) -> list[AudioFile | None]:
+        """
+        Produce the routes ffmpeg can handle by itself with one process;
+        None for the others (see ``map_batches``).
+        """
+        jobs = [route for route in routes if route.transforms and not route.staged]
+        for route in jobs:
+            self.filesystem.ensure_dir(route.target.path.parent)
+        done = self.convert.transcode_many([(r.transforms, r.source, r.target) for r in jobs])
+
+        results: dict[int, AudioFile] = {}
+        for route, output in zip(jobs, done, strict=True):
+            if output is None:
+                continue
+            try:
+                results[id(route)] = self._settle(route)
+            except OSError:
+                # only this route is retried with ``run``; the settled ones stay done
+                continue
+        return [results.get(id(route)) for route in routes]
+
+    async def run_async(self, route: Route, executor: Executor | None = None) -> AudioFile:
+        """
+        ``run`` without blocking the event loop: routes ffmpeg can produce by
+        itself run as an asyncio subprocess; everything else (decoding, DSP,
+        in-place effects, moves) runs in ``executor`` (the loop's default
+        executor when None). With ``metrics`` the route is measured as by
+        ``execute``.
+        """
+        if self.metrics is not None:
+            return await self.metrics.measure_async(
+                "pipeline", route, self._run_async(route, executor)
+            )
+        return await self._run_async(route, executor)
+
+    async def _run_async(self, route: Route, executor: Executor | None) -> AudioFile:
+        if route.transforms and not route.staged and not self.audio.memory_map:
+            settings = await in_executor(
+                executor, self.convert.lower, route.transforms, route.source, route.target
+            )
+            if settings is not None:
+                self.filesystem.ensure_dir(route.target.path.parent)
+                await transcode_async(route.source.path, route.target.path, **settings)
+                return await in_executor(executor, self._settle, route)
+        return await in_executor(executor, self.run, route)
+
+    def _in_place(self, route: Route) -> bool:
+        # scale the samples where they are when the output replaces the source
+        if not self.audio.memory_map or route.keep_at is not None:
+            return False
+        if route.target.path != route.source.path:
+            return False
+        return apply_in_place(route.source.path, route.transforms)
+
+    def _settle(self, route: Route) -> AudioFile:
+        # the output is written: remove or set aside the source
+        self._copy_branches(route)
+        source = route.source.path
+        if route.keep_at is None:
+            if route.target.path != source:
+                source.unlink()
+        elif route.keep_at.path != source:
+            self.filesystem.ensure_dir(route.keep_at.path.parent)
+            shutil.move(source, route.keep_at.path)
+        return route.target
+
+    def _copy_branches(self, route: Route) -> None:
+        # branches made before any transform are copies of the source
+        for branch, applied in route.branches:
+            if not applied:
+                self.filesystem.ensure_dir(branch.path.parent)
+                shutil.copy2(route.source.path, branch.path)
+
+    def _render(self, route: Route) -> None:
+        # branches are written as the transforms reach them
+        staged = [(branch, applied) for branch, applied in route.branches if applied]
+        audio = self.audio.load(route.source)
+        for index, op in enumerate(route.transforms):
+            for branch, applied in staged:
+                if applied == index:
+                    self._write(audio, branch, route.transforms[:index])
+            if self.audio.supports(op):
+                audio = self.audio.apply(op, audio)
+            else:
+                audio = self.convert.apply(op, audio)
+
+        for branch, applied in staged:
+            if applied == len(route.transforms):
+                self._write(audio, branch, route.transforms)
+        self._write(audio, route.target, route.transforms)
+
+    def _write(self, audio, file: AudioFile, transforms: list[Operation]) -> None:
+        # exported with the options of the last format change made so far
+        converts = [op for op in transforms if isinstance(op, ConvertFormat)]
+        options = self.convert.export_options(converts[-1]) if converts else {}
+        self.filesystem.ensure_dir(file.path.parent)
+        write_audio(self.audio.backend.to_segment(audio), file.path, file.extension, **options)
+
+    def _invalidate(self, routes: list[Route]) -> None:
+        cache = self.audio.cache
+        if cache is not None:
+            for route in routes:
+                for file in (route.source, *route.outputs):
+                    cache.invalidate(file.path)
+
+    def _aggregate(self, operation: Operation, files: list[AudioFile]) -> list[AudioFile]:
+        if isinstance(operation, AudioJoin):
+            return self.audio.execute(operation, files)
+        return self.filesystem.execute(operation, files)
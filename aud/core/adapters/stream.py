@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import subprocess
+import wave
+from pathlib import Path
+
+from pydub import AudioSegment
+
+# pydub keeps 8-bit audio signed; WAV stores it unsigned
+_BIAS_8BIT = bytes((i + 128) & 0xFF for i in range(256))
+
+# ffmpeg raw input formats for pydub's signed little-endian sample widths
+_RAW_FORMATS = {1: "s8", 2: "s16le", 3: "s24le", 4: "s32le"}
+
+# same encoder defaults as pydub's export()
+_DEFAULT_CODECS = {"ogg": "libvorbis"}
+
+
+class PcmSink:
+    """
+    A single encoder that raw PCM is streamed into.
+
+    WAV and raw outputs are written in-process; every other format is piped
+    into one ffmpeg process. Only the chunk being written is held in memory.
+
+        with PcmSink(path, "mp3", 44100, 2, 2) as sink:
+            for segment in segments:
+                sink.write(segment.raw_data)
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        format: str,
+        frame_rate: int,
+        channels: int,
+        sample_width: int,
+    ):
+        self.path = Path(path)
+        self.format = format
+        self.frame_rate = frame_rate
+        self.channels = channels
+        self.sample_width = sample_width
+
+        self._wave: wave.Wave_write | None = None
+        self._raw = None
+        self._process: subprocess.Popen | None = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if format == "wav":
+            self._wave = wave.open(str(self.path), "wb")
+            self._wave.setnchannels(channels)
+            self._wave.setsampwidth(sample_width)
+            self._wave.setframerate(frame_rate)
+        elif format == "raw":
+            self._raw = open(self.path, "wb")
+        else:
+            command = [
+                AudioSegment.converter,
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                _RAW_FORMATS[sample_width],
+                "-ar",
+                str(frame_rate),
+                "-ac",
+                str(channels),
+                "-i",
+                "pipe:0",
+            ]
+            if format in _DEFAULT_CODECS:
+                command.extend(["-acodec", _DEFAULT_CODECS[format]])
+            command.extend(["-f", format, str(self.path)])
+
+            self._process = subprocess.Popen(
+                command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+            )
+
+    def conform(self, segment: AudioSegment) -> AudioSegment:
+        """Return ``segment`` converted to this sink's rate, channels and width."""
+        segment = segment.set_frame_rate(self.frame_rate)
+        segment = segment.set_channels(self.channels)
+        return segment.set_sample_width(self.sample_width)
+
+    def write(self, data: bytes) -> None:
+        if self._wave is not None:
+            if self.sample_width == 1:
+                data = data.translate(_BIAS_8BIT)
+            self._wave.writeframesraw(data)
+        elif self._raw is not None:
+            self._raw.write(data)
+        else:
+            assert self._process is not None and self._process.stdin is not None
+            try:
+                self._process.stdin.write(data)
+            except BrokenPipeError:
+                # ffmpeg exited early; close() reports its error output
+                self.close()
+
+    def close(self) -> None:
+        if self._wave is not None:
+            self._wave.close()
+            self._wave = None
+        elif self._raw is not None:
+            self._raw.close()
+            self._raw = None
+        elif self._process is not None:
+            process, self._process = self._process, None
+            assert process.stdin is not None and process.stderr is not None
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            output = process.stderr.read().decode(errors="ignore")
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed to encode {self.path}: {output}")
+
+    def __enter__(self) -> PcmSink:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydub import AudioSegment
+
+from aud.core.pcm import read_audio
+
+# (resolved path, size, mtime_ns, decode / conversion parameters)
+CacheKey = tuple[str, int, int, str]
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+class AudioCache:
+    """
+    LRU cache of decoded audio with a byte budget.
+
+    Entries are keyed by file identity (path, size, mtime_ns) and the decode
+    parameters, so a file changed behind aud's back is simply a miss. Files
+    written by aud are dropped explicitly with ``invalidate``, or replaced
+    with the written audio with ``store``. Decoded segments are immutable
+    and shared between callers.
+
+    Segments larger than ``max_bytes`` are decoded but never stored.
+
+    The cache serves the process that owns it; adapters do not ship it to
+    worker processes.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[CacheKey, AudioSegment] = OrderedDict()
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        self.max_bytes = state["max_bytes"]
+        self._entries = OrderedDict()
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                invalidations=self._stats.invalidations,
+                entries=len(self._entries),
+                bytes=self._stats.bytes,
+            )
+
+    @staticmethod
+    def key(path: str | Path, format: str | None = None) -> CacheKey:
+        path = Path(path).resolve()
+        stat = path.stat()
+        return (str(path), stat.st_size, stat.st_mtime_ns, format or "")
+
+    def load(self, path: str | Path, format: str | None = None) -> AudioSegment:
+        """Return the decoded audio of ``path``, decoding only on a miss."""
+        key = self.key(path, format)
+
+        with self._lock:
+            segment = self._entries.get(key)
+            if segment is not None:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return segment
+            self._stats.misses += 1
+
+        segment = read_audio(path, format)
+        self._store(key, segment)
+        return segment
+
+    def conformed(
+        self,
+        path: str | Path,
+        format: str | None = None,
+        frame_rate: int | None = None,
+        channels: int | None = None,
+        sample_width: int | None = None,
+    ) -> AudioSegment:
+        """
+        Return ``path`` converted to the given parameters (None keeps them).
+
+        Each variant is converted once and cached alongside the decoded
+        original. Conversions run in the order pydub uses when it syncs two
+        segments, so mixing a variant gives the same samples as letting
+        pydub convert the original.
+        """
+        segment = self.load(path, format)
+        frame_rate = frame_rate or segment.frame_rate
+        channels = channels or segment.channels
+        sample_width = sample_width or segment.sample_width
+        if (frame_rate, channels, sample_width) == (
+            segment.frame_rate,
+            segment.channels,
+            segment.sample_width,
+        ):
+            return segment
+
+        key = self.key(path, f"{format or ''}:{frame_rate}:{channels}:{sample_width}")
+        with self._lock:
+            variant = self._entries.get(key)
+            if variant is not None:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return variant
+            self._stats.misses += 1
+
+        variant = segment.set_channels(channels)
+        variant = variant.set_frame_rate(frame_rate).set_sample_width(sample_width)
+        self._store(key, variant)
+        return variant
+
+    def invalidate(self, path: str | Path) -> None:
+        """Drop every entry for ``path`` (called whenever aud writes or moves it)."""
+        resolved = str(Path(path).resolve())
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == resolved]:
+                self._stats.bytes -= len(self._entries.pop(key).raw_data)
+                self._stats.invalidations += 1
+
+    def store(self, path: str | Path, segment: AudioSegment, format: str | None = None) -> None:
+        """
+        Replace the entries for ``path`` with ``segment``, just written to it
+        by aud. Only for writes that decode back to exactly ``segment``.
+        """
+        self.invalidate(path)
+        self._store(self.key(path, format), segment)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.bytes = 0
+
+    def _store(self, key: CacheKey, segment: AudioSegment) -> None:
+        size = len(segment.raw_data)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                return
+            # Older decodes of the same path can never be hit again
+            for stale in [k for k in self._entries if k[0] == key[0] and k[1:3] != key[1:3]]:
+                self._stats.bytes -= len(self._entries.pop(stale).raw_data)
+
+            self._entries[key] = segment
+            self._stats.bytes += size
+
+            while self._stats.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._stats.bytes -= len(evicted.raw_data)
+                self._stats.evictions += 1
+
+
+# Shared inputs (watermarks, intros, outros) decoded once per process and
+# reused across files, operations and adapters
+ASSETS = AudioCache(max_bytes=128 * 1024 * 1024)
@@ -0,0 +1,6 @@
+"""
+NumPy DSP kernels.
+
+Everything in this package requires the optional ``numpy`` dependency
+(``pip install aud[numpy]``); import it only after checking availability.
+"""
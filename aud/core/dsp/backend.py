@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from pydub import AudioSegment
+
+from aud.core.adapters.convert import ConversionAdapter
+from aud.core.dsp import effects, loudness
+from aud.core.dsp.frames import Frames
+from aud.core.operations.audio.convert import ConvertFormat, ConvertToMono, ConvertToStereo
+from aud.core.operations.audio.effects import (
+    Fade,
+    Gain,
+    HighPassFilter,
+    InvertPhase,
+    LowPassFilter,
+    Normalize,
+    Pad,
+    Watermark,
+)
+
+
+class NumpyBackend:
+    """
+    Runs sample-wise operations on ``Frames`` (float64 NumPy arrays).
+
+    Audio stays in float between operations and is quantized once, when it
+    is handed back to pydub for export or for an unsupported operation.
+    """
+
+    name = "numpy"
+
+    def supports(self, operation) -> bool:
+        if isinstance(operation, ConvertFormat):
+            # Resampling is left to pydub; bit depth only changes quantization
+            return operation.sample_rate is None
+        return isinstance(
+            operation,
+            (
+                Gain,
+                Fade,
+                Pad,
+                InvertPhase,
+                LowPassFilter,
+                HighPassFilter,
+                Normalize,
+                Watermark,
+                ConvertToMono,
+                ConvertToStereo,
+            ),
+        )
+
+    def apply(self, operation, audio: AudioSegment | Frames, asset=None) -> Frames:
+        frames = self.to_frames(audio)
+
+        if isinstance(operation, Gain):
+            return effects.gain(frames, operation.amount_db)
+        if isinstance(operation, Fade):
+            return effects.fade(frames, operation.fade_in * 1000, operation.fade_out * 1000)
+        if isinstance(operation, Pad):
+            return effects.pad(frames, operation.pad_in * 1000, operation.pad_out * 1000)
+        if isinstance(operation, InvertPhase):
+            return effects.invert(frames, operation.channel)
+        if isinstance(operation, LowPassFilter):
+            return effects.low_pass(frames, operation.cutoff_hz)
+        if isinstance(operation, HighPassFilter):
+            return effects.high_pass(frames, operation.cutoff_hz)
+        if isinstance(operation, Normalize):
+            return self._normalize(operation, frames)
+        if isinstance(operation, Watermark):
+            return self._watermark(operation, frames, asset)
+        if isinstance(operation, ConvertToMono):
+            return effects.to_mono(frames)
+        if isinstance(operation, ConvertToStereo):
+            return effects.to_stereo(frames)
+        if isinstance(operation, ConvertFormat):
+            if operation.bit_depth:
+                width = ConversionAdapter.bit_depth_to_width(operation.bit_depth)
+                return Frames(frames.samples, frames.frame_rate, width)
+            return frames
+
+        raise TypeError(f"Unsupported numpy operation: {operation}")
+
+    @staticmethod
+    def _normalize(operation: Normalize, frames: Frames) -> Frames:
+        gain = operation.gain_db
+        if gain is None:
+            oversample = operation.true_peak is not None
+            measurement = loudness.measure(
+                frames, loudness=operation.needs_loudness, oversample=oversample
+            )
+            gain = operation.gain_for(measurement)
+        return frames if gain is None else effects.gain(frames, gain)
+
+    @staticmethod
+    def _watermark(operation: Watermark, frames: Frames, asset) -> Frames:
+        mark = asset(operation.watermark_file, frames.frame_rate, frames.channels)
+        positions = operation.schedule(round(frames.duration_ms), len(mark))
+        return effects.watermark(
+            frames, Frames.from_segment(mark), positions, operation.gain_during_overlay
+        )
+
+    @staticmethod
+    def to_frames(audio: AudioSegment | Frames) -> Frames:
+        if isinstance(audio, Frames):
+            return audio
+        return Frames.from_segment(audio)
+
+    @staticmethod
+    def to_segment(audio: AudioSegment | Frames) -> AudioSegment:
+        if isinstance(audio, Frames):
+            return audio.to_segment()
+        return audio
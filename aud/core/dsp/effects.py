@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import numpy as np
+
+from aud.core.dsp import filters
+from aud.core.dsp.frames import Frames
+
+# pydub fades from / to -120 dB rather than true silence
+_FADE_FLOOR = 10 ** (-120 / 20)
+
+
+def db_to_ratio(db: float) -> float:
+    return 10 ** (db / 20)
+
+
+def gain(frames: Frames, amount_db: float) -> Frames:
+    return frames.with_samples(frames.samples * db_to_ratio(amount_db))
+
+
+def fade(frames: Frames, fade_in_ms: float = 0, fade_out_ms: float = 0) -> Frames:
+    samples = frames.samples.copy()
+
+    if fade_in_ms > 0:
+        count = min(frames.frames_for(fade_in_ms), frames.frame_count)
+        samples[:count] *= np.linspace(_FADE_FLOOR, 1.0, count, endpoint=False)[:, None]
+
+    if fade_out_ms > 0:
+        count = min(frames.frames_for(fade_out_ms), frames.frame_count)
+        if count:
+            samples[-count:] *= np.linspace(1.0, _FADE_FLOOR, count, endpoint=False)[:, None]
+
+    return frames.with_samples(samples)
+
+
+def pad(frames: Frames, pad_in_ms: float = 0, pad_out_ms: float = 0) -> Frames:
+    before = np.zeros((frames.frames_for(pad_in_ms), frames.channels))
+    after = np.zeros((frames.frames_for(pad_out_ms), frames.channels))
+    return frames.with_samples(np.concatenate([before, frames.samples, after]))
+
+
+def invert(frames: Frames, channel: str = "both") -> Frames:
+    if channel in ("left", "right") and frames.channels != 2:
+        raise ValueError(f"Can't invert the {channel} channel of {frames.channels}-channel audio")
+
+    samples = frames.samples.copy()
+    if channel == "left":
+        samples[:, 0] *= -1
+    elif channel == "right":
+        samples[:, 1] *= -1
+    else:
+        samples *= -1
+    return frames.with_samples(samples)
+
+
+def watermark(
+    frames: Frames, mark: Frames, positions_ms: list[int], gain_during_overlay: float = 0
+) -> Frames:
+    """
+    Mix ``mark`` into ``frames`` at every position in one vectorized step.
+
+    ``mark`` must already match the frame rate and channel count. The
+    target is ducked by ``gain_during_overlay`` dB under each placement.
+    """
+    length = mark.frame_count
+    starts = np.array([frames.frames_for(ms) for ms in positions_ms], dtype=np.int64)
+    starts = starts[starts + length <= frames.frame_count]
+    if not len(starts) or not length:
+        return frames
+
+    samples = frames.samples.copy()
+    # Placements never overlap, so every window can be updated at once
+    windows = starts[:, None] + np.arange(length)[None, :]
+    samples[windows] = samples[windows] * db_to_ratio(gain_during_overlay) + mark.samples[None]
+    return frames.with_samples(samples)
+
+
+def low_pass(frames: Frames, cutoff_hz: float) -> Frames:
+    return frames.with_samples(filters.low_pass(frames.samples, cutoff_hz, frames.frame_rate))
+
+
+def high_pass(frames: Frames, cutoff_hz: float) -> Frames:
+    return frames.with_samples(filters.high_pass(frames.samples, cutoff_hz, frames.frame_rate))
+
+
+def to_mono(frames: Frames) -> Frames:
+    if frames.channels == 1:
+        return frames
+    return frames.with_samples(frames.samples.mean(axis=1, keepdims=True))
+
+
+def to_stereo(frames: Frames) -> Frames:
+    if frames.channels == 2:
+        return frames
+    if frames.channels != 1:
+        raise ValueError(f"Can't convert {frames.channels}-channel audio to stereo")
+    return frames.with_samples(np.repeat(frames.samples, 2, axis=1))
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+# Block length used when solving recurrences; the work per sample grows
+# linearly with it, the Python-level iteration count shrinks with it.
+_BLOCK = 64
+
+# Frames filtered at a time by ``lfilter``; bounds its working memory
+_CHUNK = 1 << 15
+
+
+def lfilter(
+    b: list[float],
+    a: list[float],
+    x: np.ndarray,
+    x_prev: np.ndarray | None = None,
+    y_prev: np.ndarray | None = None,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Filter ``x`` (shape ``(frames, channels)``) along the time axis.
+
+    Computes ``a[0] y[n] = sum(b[k] x[n-k]) - sum(a[k] y[n-k], k >= 1)``
+    like ``scipy.signal.lfilter``, without a per-sample Python loop.
+
+    ``x_prev`` / ``y_prev`` hold the inputs / outputs preceding ``x``, most
+    recent first, with shapes ``(len(b) - 1, channels)`` and
+    ``(len(a) - 1, channels)``. They default to zeros.
+
+    The signal is filtered ``_CHUNK`` frames at a time, carrying the filter
+    state across chunks, so the working memory does not grow with its
+    length. The result is written to ``out`` when given.
+    """
+    forward = np.asarray(b, dtype=np.float64) / a[0]
+    feedback = np.asarray(a, dtype=np.float64) / a[0]
+    n, channels = x.shape
+    q, p = len(forward) - 1, len(feedback) - 1
+
+    inputs = np.zeros((q, channels)) if x_prev is None else np.asarray(x_prev, np.float64)
+    outputs = np.zeros((p, channels)) if y_prev is None else np.asarray(y_prev, np.float64)
+    if out is None:
+        out = np.empty((n, channels))
+
+    # Feedback part as a state-space recurrence over s[n] = (y[n], ..., y[n-p+1])
+    companion = np.zeros((p, p))
+    if p:
+        companion[0, :] = -feedback[1:]
+        companion[1:, :-1] = np.eye(p - 1)
+
+    for start in range(0, n, _CHUNK):
+        chunk = np.asarray(x[start : start + _CHUNK], dtype=np.float64)
+        m = len(chunk)
+
+        # Feed-forward part: v[n] = sum b[k] x[n-k]
+        padded = np.concatenate([inputs[::-1], chunk]) if q else chunk
+        v = forward[0] * padded[q:]
+        for k in range(1, q + 1):
+            v += forward[k] * padded[q - k : q - k + m]
+        if q:
+            inputs = padded[::-1][:q].copy()
+
+        if p == 0:
+            out[start : start + m] = v
+            continue
+
+        steps = np.zeros((m, p, channels))
+        steps[:, 0, :] = v
+        states = linear_recurrence(companion, steps, outputs)
+        out[start : start + m] = states[:, 0, :]
+        outputs = states[-1].copy()
+
+    return out
+
+
+def linear_recurrence(matrix: np.ndarray, inputs: np.ndarray, initial: np.ndarray) -> np.ndarray:
+    """
+    Solve ``s[k] = matrix @ s[k-1] + inputs[k]`` for every k.
+
+    ``inputs`` has shape ``(steps, order, channels)`` and ``initial`` (the
+    state before the first step) ``(order, channels)``.
+
+    The sequence is split into blocks of ``_BLOCK`` steps. Within a block
+    the zero-state response is a single tensor contraction against the
+    powers of ``matrix``; the states carried across block boundaries form a
+    recurrence of the same shape (with ``matrix ** _BLOCK``) that is solved
+    recursively, so the Python-level work is logarithmic in ``steps``.
+    """
+    steps, order, channels = inputs.shape
+
+    if steps <= _BLOCK:
+        out = np.empty_like(inputs)
+        state = initial
+        for k in range(steps):
+            state = matrix @ state + inputs[k]
+            out[k] = state
+        return out
+
+    blocks = -(-steps // _BLOCK)
+    padded = np.zeros((blocks * _BLOCK, order, channels))
+    padded[:steps] = inputs
+    padded = padded.reshape(blocks, _BLOCK, order, channels)
+
+    powers = np.empty((_BLOCK + 1, order, order))
+    powers[0] = np.eye(order)
+    for t in range(1, _BLOCK + 1):
+        powers[t] = matrix @ powers[t - 1]
+
+    # kernel[i, j] = matrix ** (i - j) for j <= i
+    idx = np.arange(_BLOCK)
+    lag = idx[:, None] - idx[None, :]
+    kernel = np.where((lag >= 0)[:, :, None, None], powers[np.clip(lag, 0, None)], 0.0)
+
+    zero_state = np.einsum("ijpq,bjqc->bipc", kernel, padded, optimize=True)
+
+    block_ends = linear_recurrence(powers[_BLOCK], zero_state[:, -1], initial)
+    carried = np.concatenate([initial[None], block_ends[:-1]])
+
+    states = zero_state + np.einsum("ipq,bqc->bipc", powers[1:], carried, optimize=True)
+    return states.reshape(blocks * _BLOCK, order, channels)[:steps]
+
+
+def one_pole_coefficient(cutoff_hz: float, frame_rate: int, high_pass: bool) -> float:
+    """RC filter coefficient used by pydub's ``low_pass_filter`` / ``high_pass_filter``."""
+    rc = 1.0 / (cutoff_hz * 2 * math.pi)
+    dt = 1.0 / frame_rate
+    return rc / (rc + dt) if high_pass else dt / (rc + dt)
+
+
+def low_pass(samples: np.ndarray, cutoff_hz: float, frame_rate: int) -> np.ndarray:
+    """First-order low-pass filter, seeded with the first frame like pydub."""
+    if len(samples) < 2:
+        return samples.copy()
+
+    alpha = one_pole_coefficient(cutoff_hz, frame_rate, high_pass=False)
+    out = np.empty(samples.shape)
+    out[0] = samples[0]
+    lfilter([alpha], [1.0, alpha - 1.0], samples[1:], y_prev=samples[:1], out=out[1:])
+    return out
+
+
+def high_pass(samples: np.ndarray, cutoff_hz: float, frame_rate: int) -> np.ndarray:
+    """First-order high-pass filter, seeded with the first frame like pydub."""
+    if len(samples) < 2:
+        return samples.copy()
+
+    alpha = one_pole_coefficient(cutoff_hz, frame_rate, high_pass=True)
+    out = np.empty(samples.shape)
+    out[0] = samples[0]
+    lfilter(
+        [alpha, -alpha],
+        [1.0, -alpha],
+        samples[1:],
+        x_prev=samples[:1],
+        y_prev=samples[:1],
+        out=out[1:],
+    )
+    return out
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from pydub import AudioSegment
+
+_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+@dataclass(slots=True)
+class Frames:
+    """
+    Decoded audio held as a float64 array of shape ``(frames, channels)``.
+
+    Samples are scaled to [-1.0, 1.0). ``sample_width`` is the width (in
+    bytes) used when the frames are quantized back to PCM.
+    """
+
+    samples: np.ndarray
+    frame_rate: int
+    sample_width: int
+
+    @property
+    def channels(self) -> int:
+        return self.samples.shape[1]
+
+    @property
+    def frame_count(self) -> int:
+        return self.samples.shape[0]
+
+    @property
+    def duration_ms(self) -> float:
+        return 1000.0 * self.frame_count / self.frame_rate
+
+    def frames_for(self, ms: float) -> int:
+        return int(ms * self.frame_rate / 1000.0)
+
+    def with_samples(self, samples: np.ndarray) -> Frames:
+        return Frames(samples, self.frame_rate, self.sample_width)
+
+    @classmethod
+    def from_segment(cls, segment: AudioSegment) -> Frames:
+        return cls(
+            samples=pcm_to_float(segment.raw_data, segment.sample_width, segment.channels),
+            frame_rate=segment.frame_rate,
+            sample_width=segment.sample_width,
+        )
+
+    def to_segment(self) -> AudioSegment:
+        return AudioSegment(
+            data=float_to_pcm(self.samples, self.sample_width),
+            sample_width=self.sample_width,
+            frame_rate=self.frame_rate,
+            channels=self.channels,
+        )
+
+
+def pcm_to_float(data: bytes | memoryview, sample_width: int, channels: int) -> np.ndarray:
+    """Convert signed little-endian PCM to float64 frames."""
+    if sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = (raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)) << 8 >> 8
+    else:
+        ints = np.frombuffer(data, dtype=_DTYPES[sample_width])
+
+    samples = ints.astype(np.float64)
+    samples *= 1.0 / (1 << (8 * sample_width - 1))
+    return samples.reshape(-1, channels)
+
+
+def float_to_pcm(samples: np.ndarray, sample_width: int) -> bytes:
+    """
+    Quantize float frames to signed little-endian PCM.
+
+    Like ``audioop.mul``, values are clipped to the integer range and
+    rounded down.
+    """
+    scale = float(1 << (8 * sample_width - 1))
+    ints = samples * scale
+    np.floor(ints, out=ints)
+    np.clip(ints, -scale, scale - 1, out=ints)
+
+    if sample_width == 3:
+        packed = ints.astype(np.int32).reshape(-1)
+        out = np.empty((packed.size, 3), dtype=np.uint8)
+        out[:, 0] = packed & 0xFF
+        out[:, 1] = (packed >> 8) & 0xFF
+        out[:, 2] = (packed >> 16) & 0xFF
+        return out.tobytes()
+
+    return ints.astype(_DTYPES[sample_width]).tobytes()
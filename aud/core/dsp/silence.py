@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import numpy as np
+from pydub import AudioSegment
+
+from aud.core.dsp.frames import pcm_to_float
+
+
+def window_rms(segment: AudioSegment, starts_ms: np.ndarray, length_ms: int) -> np.ndarray:
+    """
+    RMS of ``segment[start:start + length_ms]`` for every start, at once.
+
+    Matches ``segment[a:b].rms`` (``audioop.rms``): windows use the same
+    millisecond-to-frame rounding, missing trailing frames count as
+    silence, and the result is truncated to an integer. For 8- and 16-bit
+    audio the sums are exact, so the result is identical; 32-bit (and
+    widened 24-bit) audio is summed in float64, as audioop does but in a
+    different order, so a window whose RMS is within rounding error of an
+    integer may come out one lower or higher.
+    """
+    channels = segment.channels
+    scale = float(1 << (8 * segment.sample_width - 1))
+    samples = pcm_to_float(segment.raw_data, segment.sample_width, channels) * scale
+
+    # prefix sums of per-frame energy; int64 is exact for integer samples
+    energy = np.square(samples).sum(axis=1)
+    if segment.sample_width <= 2:
+        energy = energy.astype(np.int64)
+    prefix = np.concatenate([[0], np.cumsum(energy)])
+
+    frames = len(samples)
+    seg_len = len(segment)
+    per_ms = segment.frame_rate / 1000.0
+
+    ends_ms = np.minimum(starts_ms + length_ms, seg_len)
+    start_frames = (np.minimum(starts_ms, seg_len) * per_ms).astype(np.int64)
+    end_frames = (ends_ms * per_ms).astype(np.int64)
+
+    total = prefix[np.minimum(end_frames, frames)] - prefix[np.minimum(start_frames, frames)]
+    count = (end_frames - start_frames) * channels
+
+    rms = np.zeros(len(starts_ms))
+    valid = count > 0
+    rms[valid] = np.floor(np.sqrt(total[valid] / count[valid]))
+    return rms
+
+
+def detect_silence(
+    segment: AudioSegment,
+    min_silence_len: int = 1000,
+    silence_thresh: float = -16,
+    seek_step: int = 1,
+) -> list[list[int]]:
+    """
+    Vectorized equivalent of ``pydub.silence.detect_silence``.
+
+    Returns the silent ``[start, end]`` ranges in milliseconds.
+    """
+    seg_len = len(segment)
+    if seg_len < min_silence_len:
+        return []
+
+    threshold = 10 ** (silence_thresh / 20) * segment.max_possible_amplitude
+
+    last_start = seg_len - min_silence_len
+    starts = np.arange(0, last_start + 1, seek_step, dtype=np.int64)
+    if last_start % seek_step:
+        starts = np.append(starts, last_start)
+
+    silent = starts[window_rms(segment, starts, min_silence_len) <= threshold]
+    if not len(silent):
+        return []
+
+    # A new range starts where a silent window neither follows the previous
+    # one directly nor overlaps it
+    gaps = np.diff(silent)
+    breaks = np.flatnonzero((gaps != seek_step) & (gaps > min_silence_len)) + 1
+    first = np.concatenate([[0], breaks])
+    last = np.concatenate([breaks - 1, [len(silent) - 1]])
+
+    return [
+        [int(silent[a]), int(silent[b]) + min_silence_len] for a, b in zip(first, last, strict=True)
+    ]
+
+
+def detect_nonsilent(
+    segment: AudioSegment,
+    min_silence_len: int = 1000,
+    silence_thresh: float = -16,
+    seek_step: int = 1,
+) -> list[list[int]]:
+    """
+    Vectorized equivalent of ``pydub.silence.detect_nonsilent``.
+
+    Returns the non-silent ``[start, end]`` ranges in milliseconds.
+    """
+    silent_ranges = detect_silence(segment, min_silence_len, silence_thresh, seek_step)
+    seg_len = len(segment)
+
+    if not silent_ranges:
+        return [[0, seg_len]]
+
+    if silent_ranges[0][0] == 0 and silent_ranges[0][1] == seg_len:
+        return []
+
+    ranges = []
+    previous_end = 0
+    for start, end in silent_ranges:
+        ranges.append([previous_end, start])
+        previous_end = end
+
+    if silent_ranges[-1][1] != seg_len:
+        ranges.append([previous_end, seg_len])
+
+    if ranges[0] == [0, 0]:
+        ranges.pop(0)
+
+    return ranges
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import TypeVar
+
+from aud.exceptions import BatchError
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def map_files(fn: Callable[[T], R], items: Iterable[T], workers: int = 1) -> list[R]:
+    """
+    Apply ``fn`` to every item and return the results in input order.
+
+    With ``workers > 1`` items are fanned out to a process pool. At most
+    ``2 * workers`` items are in flight at once, so large or lazily produced
+    inputs are never submitted all at once. ``fn`` and the items must be
+    picklable in that case.
+
+    A failing item does not stop the batch: every item is attempted and a
+    ``BatchError`` describing each failure is raised at the end.
+    """
+    results: list = []
+    failures: list[tuple[T, BaseException]] = []
+
+    def collect(item: T, future: Future) -> None:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(None)
+            failures.append((item, e))
+
+    if workers <= 1:
+        for item in items:
+            try:
+                results.append(fn(item))
+            except Exception as e:
+                results.append(None)
+                failures.append((item, e))
+    else:
+        in_flight: deque[tuple[T, Future]] = deque()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for item in items:
+                in_flight.append((item, pool.submit(fn, item)))
+                if len(in_flight) >= 2 * workers:
+                    collect(*in_flight.popleft())
+
+            while in_flight:
+                collect(*in_flight.popleft())
+
+    if failures:
+        raise BatchError(failures, results)
+    return results
+
+
+def _chunks(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _run_batch(
+    batch_fn: Callable[[list[T]], list[R | None]], fn: Callable[[T], R], batch: list[T]
+) -> tuple[list, list]:
+    try:
+        results = list(batch_fn(batch))
+    except Exception:
+        # retried one by one, so every item reports its own failure
+        results = [None] * len(batch)
+
+    failures = []
+    for index, item in enumerate(batch):
+        if results[index] is None:
+            try:
+                results[index] = fn(item)
+            except Exception as e:
+                failures.append((item, e))
+    return results, failures
+
+
+def map_batches(
+    batch_fn: Callable[[list[T]], list[R | None]],
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    size: int,
+    workers: int = 1,
+) -> list[R]:
+    """
+    Like ``map_files``, but items are handed to ``batch_fn`` ``size`` at a
+    time, which pays per-call overhead (e.g. a process launch) once per batch.
+
+    ``batch_fn`` returns one result per item, or None for items it does not
+    handle; those, and every item of a batch where ``batch_fn`` raised, are
+    processed with ``fn`` one by one. With ``workers > 1`` whole batches are
+    fanned out to the process pool.
+    """
+    results: list = []
+    failures: list[tuple[T, BaseException]] = []
+    for batch_results, batch_failures in map_files(
+        partial(_run_batch, batch_fn, fn), _chunks(items, size), workers
+    ):
+        results += batch_results
+        failures += batch_failures
+
+    if failures:
+        raise BatchError(failures, results)
+    return results
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import subprocess
+from functools import cache
+from pathlib import Path
+
+from pydub.exceptions import CouldntEncodeError
+from pydub.utils import get_encoder_name
+
+from aud.core.headers import header_info
+from aud.core.metrics import phase
+
+# Formats whose samples are written as is; the codec follows the bit depth
+_PCM_CODECS = {
+    "wav": {8: "pcm_u8", 16: "pcm_s16le", 24: "pcm_s24le", 32: "pcm_s32le"},
+    "aiff": {8: "pcm_s8", 16: "pcm_s16be", 24: "pcm_s24be", 32: "pcm_s32be"},
+    "raw": {8: "pcm_u8", 16: "pcm_s16le", 24: "pcm_s24le", 32: "pcm_s32le"},
+}
+_PCM_CODECS["aif"] = _PCM_CODECS["aiff"]
+
+# FLAC stores 24-bit samples in 32-bit containers
+_FLAC_SAMPLE_FORMATS = {16: ("s16", 16), 24: ("s32", 24), 32: ("s32", 32)}
+
+# muxer names where they differ from the extension, as pydub passes ``-f``
+_MUXERS = {"aif": "aiff", "m4a": "ipod"}
+
+# same defaults as pydub's AudioSegment.export
+_DEFAULT_CODECS = {"ogg": "libvorbis"}
+_COVER_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+# formats ffmpeg cannot read without being told the sample layout
+_HEADERLESS = {"raw", "pcm"}
+
+
+@cache
+def ffmpeg() -> str | None:
+    """Path of the ffmpeg binary pydub uses, or None if it is not installed."""
+    return shutil.which(get_encoder_name())
+
+
+def can_transcode(source: Path, format: str, cover: str | None = None) -> bool:
+    """Whether ``transcode`` can handle this source / target combination."""
+    if ffmpeg() is None or source.suffix.lstrip(".").lower() in _HEADERLESS:
+        return False
+    # pydub only embeds covers in MP3s (and raises otherwise); leave those to it
+    return cover is None or (format == "mp3" and cover.lower().endswith(_COVER_SUFFIXES))
+
+
+def transcode_command(
+    source: Path,
+    target: Path,
+    format: str,
+    sample_rate: int | None = None,
+    bit_depth: int | None = None,
+    channels: int | None = None,
+    tags: dict | None = None,
+    cover: str | None = None,
+    filters: list[str] | None = None,
+) -> list[str]:
+    """The ffmpeg command line that decodes ``source`` and writes ``target`` in one go."""
+    settings = {
+        "format": format,
+        "sample_rate": sample_rate,
+        "bit_depth": bit_depth,
+        "channels": channels,
+        "tags": tags,
+        "cover": cover,
+        "filters": filters,
+    }
+    return batch_command([(source, target, settings)])
+
+
+def batch_command(jobs: list[tuple[Path, Path, dict]]) -> list[str]:
+    """
+    One ffmpeg command line converting every ``(source, target, settings)``
+    job; ``settings`` are the keyword arguments of ``transcode``. Each source
+    (and cover) is a separate input mapped to its own output.
+    """
+    command = [ffmpeg() or get_encoder_name(), "-y", "-nostdin", "-v", "error"]
+    outputs: list[str] = []
+    inputs = 0
+    for source, target, settings in jobs:
+        command += ["-i", str(source)]
+        audio, inputs = inputs, inputs + 1
+        cover = settings.get("cover")
+        if cover is not None:
+            command += ["-i", cover]
+            outputs += ["-map", f"{audio}:a:0", "-map", str(inputs), "-c:v", "mjpeg"]
+            inputs += 1
+        else:
+            outputs += ["-map", f"{audio}:a:0"]
+        outputs += _output_options(source, **settings)
+        outputs.append(str(target))
+    return command + outputs
+
+
+def _output_options(
+    source: Path,
+    format: str,
+    sample_rate: int | None = None,
+    bit_depth: int | None = None,
+    channels: int | None = None,
+    tags: dict | None = None,
+    cover: str | None = None,
+    filters: list[str] | None = None,
+) -> list[str]:
+    # Decoding through pydub dropped the source tags; keep it that way
+    options = ["-map_metadata", "-1"]
+
+    if filters:
+        options += ["-af", ",".join(filters)]
+    if channels:
+        options += ["-ac", str(channels)]
+    if sample_rate:
+        options += ["-ar", str(sample_rate)]
+
+    codec = None
+    if format in _PCM_CODECS:
+        # without an explicit depth, keep the source's (ffmpeg would pick 16 bits)
+        if bit_depth is None:
+            info = header_info(source)
+            bit_depth = info.bit_depth if info is not None and info.bit_depth else 16
+        codec = _PCM_CODECS[format][min(_PCM_CODECS[format], key=lambda b: abs(b - bit_depth))]
+        options += ["-c:a", codec]
+    elif format == "flac" and bit_depth:
+        sample_format, bits = _FLAC_SAMPLE_FORMATS.get(bit_depth, ("s16", 16))
+        options += ["-c:a", "flac", "-sample_fmt", sample_format, "-bits_per_raw_sample", str(bits)]
+    elif format in _DEFAULT_CODECS:
+        options += ["-c:a", _DEFAULT_CODECS[format]]
+
+    for key, value in (tags or {}).items():
+        options += ["-metadata", f"{key}={value}"]
+    if tags and format == "mp3":
+        options += ["-id3v2_version", "4"]
+
+    if format == "raw":
+        # headerless samples: the muxer is named after the codec
+        assert codec is not None
+        options += ["-f", codec.removeprefix("pcm_")]
+    else:
+        options += ["-f", _MUXERS.get(format, format)]
+    return options
+
+
+def _partial(target: Path) -> Path:
+    return target.with_name(f".{target.stem}.aud-partial{target.suffix}")
+
+
+def _run(command: list[str], partials: list[Path]) -> None:
+    with phase("ffmpeg"):
+        result = subprocess.run(command, capture_output=True, check=False)
+    if result.returncode != 0:
+        raise _failure(command, result.returncode, result.stderr, partials)
+
+
+def _failure(
+    command: list[str], returncode: int, stderr: bytes, partials: list[Path]
+) -> CouldntEncodeError:
+    for partial in partials:
+        partial.unlink(missing_ok=True)
+    return CouldntEncodeError(
+        f"Encoding failed. ffmpeg returned error code: {returncode}\n\n"
+        f"Command:{command}\n\nOutput from ffmpeg/avlib:\n\n"
+        f"{stderr.decode(errors='replace')}"
+    )
+
+
+def transcode(
+    source: Path,
+    target: Path,
+    format: str,
+    sample_rate: int | None = None,
+    bit_depth: int | None = None,
+    channels: int | None = None,
+    tags: dict | None = None,
+    cover: str | None = None,
+    filters: list[str] | None = None,
+) -> Path:
+    """
+    Convert ``source`` into ``target`` with a single ffmpeg process.
+
+    Resampling, bit depth, channel count, tags and cover art are all handled
+    by ffmpeg, so no samples pass through Python. ``target`` may be
+    ``source``: the output is written next to it and moved into place.
+    """
+    partial = _partial(target)
+    command = transcode_command(
+        source, partial, format, sample_rate, bit_depth, channels, tags, cover, filters
+    )
+    _run(command, [partial])
+    os.replace(partial, target)
+    return target
+
+
+def transcode_batch(jobs: list[tuple[Path, Path, dict]]) -> list[Path]:
+    """
+    Run several ``transcode`` jobs in one ffmpeg process, which saves the
+    process startup per file. Outputs only replace their targets once every
+    job succeeded; if one fails, nothing is replaced and the error is raised.
+    """
+    partials = [_partial(target) for _, target, _ in jobs]
+    command = batch_command(
+        [
+            (source, partial, settings)
+            for (source, _, settings), partial in zip(jobs, partials, strict=True)
+        ]
+    )
+    _run(command, partials)
+    for partial, (_, target, _) in zip(partials, jobs, strict=True):
+        os.replace(partial, target)
+    return [target for _, target, _ in jobs]
+
+
+async def transcode_async(source: Path, target: Path, **settings) -> Path:
+    """
+    ``transcode`` as an asyncio subprocess, so the event loop keeps running
+    while ffmpeg works. If the awaiting task is cancelled, ffmpeg is killed
+    and ``target`` is left as it was.
+    """
+    partial = _partial(target)
+    command = transcode_command(source, partial, **settings)
+    with phase("ffmpeg"):
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            partial.unlink(missing_ok=True)
+            raise
+
+    if process.returncode:
+        raise _failure(command, process.returncode, stderr, [partial])
+    os.replace(partial, target)
+    return target
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+from aud.core.operations.audio.convert import ConvertFormat, ConvertToMono, ConvertToStereo
+from aud.core.operations.audio.effects import (
+    Fade,
+    Gain,
+    HighPassFilter,
+    InvertPhase,
+    LowPassFilter,
+    Pad,
+)
+
+
+@dataclass(slots=True)
+class Stream:
+    """
+    What is known about the audio at a point of a filter chain (from the
+    source header); None when it is not known.
+    """
+
+    channels: int | None = None
+    sample_rate: int | None = None
+    duration: float | None = None
+
+
+def _seconds(ms: int) -> str:
+    return f"{ms / 1000:.3f}"
+
+
+def audio_filters(op, stream: Stream) -> list[str] | None:
+    """
+    The ffmpeg filters doing what ``op`` does in the Python adapters, or None
+    if it cannot be expressed for this stream. ``stream`` is updated to
+    describe the output of the returned filters.
+
+    Durations are truncated to whole milliseconds and fades / filters use the
+    same curves and coefficients as pydub, so results match
+    the Python path up to rounding. StripSilence is not lowered: ffmpeg's
+    ``silenceremove`` keeps different amounts of each gap and does not
+    crossfade the cuts.
+    """
+    if isinstance(op, Gain):
+        return [f"volume={op.amount_db:.6f}dB"]
+    if isinstance(op, (LowPassFilter, HighPassFilter)):
+        return _one_pole(op, stream)
+    if isinstance(op, Fade):
+        return _fade(op, stream)
+    if isinstance(op, Pad):
+        return _pad(op, stream)
+    if isinstance(op, InvertPhase):
+        return _invert(op, stream)
+    if isinstance(op, ConvertToMono):
+        return _mono(stream)
+    if isinstance(op, ConvertToStereo):
+        return _stereo(stream)
+    if isinstance(op, ConvertFormat):
+        # bit depth, tags and cover belong to the encoder, not the chain
+        if not op.sample_rate:
+            return []
+        stream.sample_rate = op.sample_rate
+        return [f"aresample={op.sample_rate}"]
+    return None
+
+
+def _one_pole(op: LowPassFilter | HighPassFilter, stream: Stream) -> list[str] | None:
+    # pydub's RC filters as biquads:
+    #   low pass:  y[n] = a·x[n] + (1 - a)·y[n-1]
+    #   high pass: y[n] = a·(y[n-1] + x[n] - x[n-1])
+    if not stream.sample_rate:
+        return None
+    rc = 1.0 / (op.cutoff_hz * 2 * math.pi)
+    dt = 1.0 / stream.sample_rate
+    if isinstance(op, LowPassFilter):
+        alpha = dt / (rc + dt)
+        b0, b1, a1 = alpha, 0.0, alpha - 1
+    else:
+        alpha = rc / (rc + dt)
+        b0, b1, a1 = alpha, -alpha, -alpha
+    return [f"biquad=b0={b0:.12f}:b1={b1:.12f}:b2=0:a0=1:a1={a1:.12f}:a2=0"]
+
+
+def _fade(op: Fade, stream: Stream) -> list[str]:
+    filters = []
+    fade_in, fade_out = int(op.fade_in * 1000), int(op.fade_out * 1000)
+    if fade_in > 0:
+        filters.append(f"afade=t=in:d={_seconds(fade_in)}")
+    if fade_out > 0:
+        if stream.duration is not None:
+            start = max(stream.duration - fade_out / 1000, 0)
+            filters.append(f"afade=t=out:st={start:.6f}:d={_seconds(fade_out)}")
+        else:
+            # the end is not known up front: fade in the reversed audio
+            filters += ["areverse", f"afade=t=in:d={_seconds(fade_out)}", "areverse"]
+    return filters
+
+
+def _pad(op: Pad, stream: Stream) -> list[str]:
+    filters = []
+    pad_in, pad_out = int(op.pad_in * 1000), int(op.pad_out * 1000)
+    if pad_in > 0:
+        filters.append(f"adelay=delays={pad_in}:all=1")
+    if pad_out > 0:
+        filters.append(f"apad=pad_dur={_seconds(pad_out)}")
+    if stream.duration is not None:
+        stream.duration += (max(pad_in, 0) + max(pad_out, 0)) / 1000
+    return filters
+
+
+def _invert(op: InvertPhase, stream: Stream) -> list[str] | None:
+    if op.channel not in ("left", "right"):
+        return ["aeval=-val(ch):c=same"]
+    # pydub only inverts one side of stereo audio
+    if stream.channels != 2:
+        return None
+    left, right = ("-val(0)", "val(1)") if op.channel == "left" else ("val(0)", "-val(1)")
+    return [f"aeval={left}|{right}:c=same"]
+
+
+def _mono(stream: Stream) -> list[str] | None:
+    if stream.channels == 1:
+        return []
+    if stream.channels != 2:
+        return None
+    stream.channels = 1
+    # same mix as pydub (audioop.tomono with 0.5 / 0.5)
+    return ["pan=mono|c0=0.5*c0+0.5*c1"]
+
+
+def _stereo(stream: Stream) -> list[str] | None:
+    if stream.channels == 2:
+        return []
+    if stream.channels != 1:
+        return None
+    stream.channels = 2
+    return ["pan=stereo|c0=c0|c1=c0"]
@@ -0,0 +1,471 @@
+from __future__ import annotations
+
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from aud.core.models import AudioInfo
+
+# Container header parsers: stream properties are read from the first (and
+# for Ogg, the last) few kilobytes of a file, without decoding any audio or
+# starting a subprocess. Each parser returns None when it cannot answer, so
+# the caller can fall back to ffprobe.
+
+_HEAD = 64 * 1024
+
+# WAVE format tags that are plain samples
+_WAVE_PCM = 0x0001
+_WAVE_FLOAT = 0x0003
+_WAVE_ALAW = 0x0006
+_WAVE_MULAW = 0x0007
+_WAVE_EXTENSIBLE = 0xFFFE
+
+# AIFF-C compression types with one fixed-size sample per channel and frame
+_AIFC_SAMPLES = {b"NONE": None, b"twos": None, b"sowt": None, b"fl32": 32, b"fl64": 64}
+
+# MPEG audio: bitrates (kbit/s) by (version is MPEG-1, layer) and index
+_MP3_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# sample rates by version bits (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5)
+_MP3_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_MP3_SUFFIXES = {".mp3", ".mp2", ".mp1", ".mpga"}
+# Xing header flag bits and the size of the field each one adds
+_XING_FIELDS = ((0x1, 4), (0x2, 4), (0x4, 100), (0x8, 4))
+
+
+def header_info(path: str | Path) -> AudioInfo | None:
+    """
+    Read duration, sample rate, channels and bit depth from the container
+    header of ``path``; None if the format is not recognised.
+
+    Supports WAV (incl. RF64 / extensible / float), AIFF / AIFF-C, FLAC,
+    MP3 (Xing / Info / VBRI or constant bitrate) and Ogg Vorbis / Opus.
+    The format is detected from the file contents, not its extension.
+    """
+    try:
+        with open(path, "rb") as file:
+            head = file.read(12)
+            if head[:4] in (b"RIFF", b"RF64", b"BW64") and head[8:12] == b"WAVE":
+                return wav_header(file)
+            if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+                return aiff_header(file)
+            if head[:4] == b"OggS":
+                return ogg_header(file)
+
+            # FLAC and MP3 may start with an ID3v2 tag
+            start = _skip_id3(file)
+            file.seek(start)
+            if file.read(4) == b"fLaC":
+                return flac_header(file)
+            # Other files are only searched for MPEG frames when named so
+            search = Path(path).suffix.lower() in _MP3_SUFFIXES
+            return mp3_header(file, start, search=search)
+    except (OSError, struct.error, ValueError, ZeroDivisionError):
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class PcmLayout:
+    """Where and how the samples of an uncompressed WAV / AIFF file are stored."""
+
+    frame_rate: int
+    channels: int
+    sample_width: int  # bytes per sample
+    block_align: int  # bytes per frame
+    offset: int  # of the first sample in the file
+    frames: int
+    float: bool = False
+    big_endian: bool = False
+    unsigned: bool = False
+
+
+def pcm_layout(file: BinaryIO) -> PcmLayout | None:
+    """
+    The sample layout of a WAV (incl. RF64 / extensible / float) or AIFF /
+    AIFF-C file opened in binary mode; None for other (or compressed)
+    formats.
+    """
+    try:
+        file.seek(0)
+        head = file.read(12)
+        if head[:4] in (b"RIFF", b"RF64", b"BW64") and head[8:12] == b"WAVE":
+            return _wav_layout(file)
+        if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+            return _aiff_layout(file)
+    except (OSError, struct.error, ValueError):
+        pass
+    return None
+
+
+def _skip_id3(file: BinaryIO) -> int:
+    offset = 0
+    while True:
+        file.seek(offset)
+        tag = file.read(10)
+        if len(tag) < 10 or tag[:3] != b"ID3":
+            return offset
+        size = (tag[6] << 21) | (tag[7] << 14) | (tag[8] << 7) | tag[9]
+        offset += 10 + size + (10 if tag[5] & 0x10 else 0)
+
+
+def _file_size(file: BinaryIO) -> int:
+    return os.fstat(file.fileno()).st_size
+
+
+# ----------------------------------------------------------------------
+# WAV / RF64
+# ----------------------------------------------------------------------
+
+
+def wav_header(file: BinaryIO) -> AudioInfo | None:
+    found = _wav_data(file)
+    if found is None:
+        return None
+    fmt, _, size = found
+    return _wav_info(fmt, size)
+
+
+def _wav_data(file: BinaryIO) -> tuple[bytes, int, int] | None:
+    """The ``fmt `` chunk, and the offset and size of the ``data`` chunk."""
+    size = _file_size(file)
+    fmt = None
+    ds64_data = None
+    offset = 12
+
+    while offset + 8 <= size:
+        file.seek(offset)
+        chunk_id, chunk_size = struct.unpack("<4sI", file.read(8))
+        body = offset + 8
+
+        if chunk_id == b"ds64":
+            # RF64: the real sizes, as 64-bit values
+            _, ds64_data = struct.unpack("<QQ", file.read(16))
+        elif chunk_id == b"fmt ":
+            fmt = file.read(min(chunk_size, 40))
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            if chunk_size == 0xFFFFFFFF and ds64_data is not None:
+                chunk_size = ds64_data
+            # writers that never finalised the header leave 0 / -1 here
+            if chunk_size in (0, 0xFFFFFFFF) or body + chunk_size > size:
+                chunk_size = size - body
+            return fmt, body, chunk_size
+
+        offset = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _wav_info(fmt: bytes, data_size: int) -> AudioInfo | None:
+    tag, channels, rate, _, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if tag == _WAVE_EXTENSIBLE and len(fmt) >= 26:
+        # valid bits (may be fewer than the container size) and subformat
+        valid_bits = struct.unpack("<H", fmt[18:20])[0]
+        tag = struct.unpack("<H", fmt[24:26])[0]
+        bits = valid_bits or bits
+
+    if tag not in (_WAVE_PCM, _WAVE_FLOAT, _WAVE_ALAW, _WAVE_MULAW):
+        return None
+    if not channels or not rate or not block_align:
+        return None
+
+    frames = data_size // block_align
+    return AudioInfo(duration=frames / rate, frame_rate=rate, channels=channels, bit_depth=bits)
+
+
+def _wav_layout(file: BinaryIO) -> PcmLayout | None:
+    found = _wav_data(file)
+    if found is None:
+        return None
+    fmt, offset, size = found
+
+    tag, channels, rate, _, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if tag == _WAVE_EXTENSIBLE and len(fmt) >= 26:
+        tag = struct.unpack("<H", fmt[24:26])[0]
+    width = (bits + 7) // 8
+    if tag not in (_WAVE_PCM, _WAVE_FLOAT) or not channels or not rate or not block_align:
+        return None
+    if tag == _WAVE_FLOAT and width not in (4, 8):
+        return None
+    return PcmLayout(
+        frame_rate=rate,
+        channels=channels,
+        sample_width=width,
+        block_align=block_align,
+        offset=offset,
+        frames=size // block_align,
+        float=tag == _WAVE_FLOAT,
+        unsigned=width == 1,
+    )
+
+
+# ----------------------------------------------------------------------
+# AIFF / AIFF-C
+# ----------------------------------------------------------------------
+
+
+def _extended(data: bytes) -> float:
+    # IEEE 754 80-bit extended precision (the AIFF sample rate)
+    exponent, mantissa = struct.unpack(">HQ", data)
+    sign = -1 if exponent & 0x8000 else 1
+    exponent &= 0x7FFF
+    if exponent == 0 and mantissa == 0:
+        return 0.0
+    return sign * mantissa * 2.0 ** (exponent - 16383 - 63)
+
+
+def aiff_header(file: BinaryIO) -> AudioInfo | None:
+    found = _aiff_comm(file)
+    if found is None:
+        return None
+    channels, frames, bits, rate, kind = found
+
+    if kind is not None:
+        if kind not in _AIFC_SAMPLES:
+            return None
+        bits = _AIFC_SAMPLES[kind] or bits
+    if not channels or rate <= 0:
+        return None
+    return AudioInfo(
+        duration=frames / rate,
+        frame_rate=round(rate),
+        channels=channels,
+        bit_depth=bits,
+    )
+
+
+def _aiff_comm(file: BinaryIO, ssnd: bool = False) -> tuple | None:
+    """
+    ``(channels, frames, bits, rate, compression)`` from the COMM chunk
+    (compression is None for plain AIFF); with ``ssnd``, the offset of the
+    first sample is appended (None if there is no SSND chunk).
+    """
+    size = _file_size(file)
+    file.seek(8)
+    compressed = file.read(4) == b"AIFC"
+    offset = 12
+    comm = None
+    samples = None
+
+    while offset + 8 <= size:
+        file.seek(offset)
+        chunk_id, chunk_size = struct.unpack(">4sI", file.read(8))
+        if chunk_id == b"COMM":
+            comm = file.read(min(chunk_size, 22))
+        elif chunk_id == b"SSND" and ssnd:
+            # the first field is the offset of the samples in the chunk
+            samples = offset + 16 + struct.unpack(">I", file.read(4))[0]
+        if comm is not None and (samples is not None or not ssnd):
+            break
+        offset += 8 + chunk_size + (chunk_size & 1)
+
+    if comm is None:
+        return None
+    channels, frames, bits = struct.unpack(">HIH", comm[:8])
+    found = (channels, frames, bits, _extended(comm[8:18]), comm[18:22] if compressed else None)
+    return (*found, samples) if ssnd else found
+
+
+def _aiff_layout(file: BinaryIO) -> PcmLayout | None:
+    found = _aiff_comm(file, ssnd=True)
+    if found is None:
+        return None
+    channels, frames, bits, rate, kind, offset = found
+    if kind not in (None, b"NONE", b"twos", b"sowt", b"fl32", b"fl64"):
+        return None
+    if offset is None or not channels or rate <= 0:
+        return None
+
+    floating = kind in (b"fl32", b"fl64")
+    width = ((_AIFC_SAMPLES.get(kind) or bits) + 7) // 8
+    available = (_file_size(file) - offset) // (width * channels)
+    return PcmLayout(
+        frame_rate=round(rate),
+        channels=channels,
+        sample_width=width,
+        block_align=width * channels,
+        offset=offset,
+        frames=min(frames, available),
+        float=floating,
+        big_endian=kind != b"sowt",
+    )
+
+
+# ----------------------------------------------------------------------
+# FLAC
+# ----------------------------------------------------------------------
+
+
+def flac_header(file: BinaryIO) -> AudioInfo | None:
+    # The first metadata block is always STREAMINFO
+    block = file.read(4)
+    if len(block) < 4 or block[0] & 0x7F != 0:
+        return None
+    info = file.read(34)
+    if len(info) < 18:
+        return None
+
+    # 20 bits rate, 3 bits channels - 1, 5 bits bits per sample - 1, 36 bits frames
+    packed = int.from_bytes(info[10:18], "big")
+    rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits = ((packed >> 36) & 0x1F) + 1
+    frames = packed & 0xFFFFFFFFF
+    if not rate or not frames:
+        # an unknown length (streamed encodes) is left to ffprobe
+        return None
+    return AudioInfo(duration=frames / rate, frame_rate=rate, channels=channels, bit_depth=bits)
+
+
+# ----------------------------------------------------------------------
+# MP3
+# ----------------------------------------------------------------------
+
+
+def _mp3_frame(header: bytes) -> tuple | None:
+    """(mpeg1, layer, bitrate, rate, channels, frame length, samples) of a frame header."""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x3
+    layer = 4 - ((header[1] >> 1) & 0x3)
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    rate = _MP3_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x1
+    channels = 1 if header[3] >> 6 == 3 else 2
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // rate + padding) * 4
+    else:
+        samples = 1152 if layer == 2 or mpeg1 else 576
+        length = samples // 8 * bitrate // rate + padding
+    return mpeg1, layer, bitrate, rate, channels, length, samples
+
+
+def mp3_header(file: BinaryIO, start: int, search: bool = True) -> AudioInfo | None:
+    """
+    Parse the MPEG audio stream at ``start``; with ``search`` leading junk
+    before the first frame is skipped.
+    """
+    file.seek(start)
+    data = file.read(_HEAD)
+
+    # The first frame header that is followed by another one
+    position = data.find(b"\xff") if search else 0
+    frame = None
+    while 0 <= position < len(data) - 4:
+        frame = _mp3_frame(data[position : position + 4])
+        if frame is not None:
+            following = _mp3_frame(data[position + frame[5] : position + frame[5] + 4])
+            if following is not None or position + frame[5] >= len(data) - 4:
+                break
+        frame = None
+        position = data.find(b"\xff", position + 1) if search else -1
+    if frame is None:
+        return None
+
+    mpeg1, layer, bitrate, rate, channels, length, samples = frame
+
+    # VBR headers live in the first frame, after the side information
+    side = (32 if channels == 2 else 17) if mpeg1 else (17 if channels == 2 else 9)
+    xing = position + 4 + side
+    frames = None
+    trim = 0
+    if data[xing : xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", data[xing + 4 : xing + 8])[0]
+        if flags & 0x1:
+            frames = struct.unpack(">I", data[xing + 8 : xing + 12])[0]
+        # optional fields: frames, bytes, TOC, quality; then the LAME tag
+        # ("LAME3.100", "Lavc61.3", ...) with the encoder delay / padding
+        # (12 bits each) for the gapless length
+        lame = xing + 8 + sum(size for bit, size in _XING_FIELDS if flags & bit)
+        if data[lame : lame + 4].isalnum():
+            packed = int.from_bytes(data[lame + 21 : lame + 24], "big")
+            trim = (packed >> 12) + (packed & 0xFFF)
+    elif data[position + 36 : position + 40] == b"VBRI":
+        frames = struct.unpack(">I", data[position + 50 : position + 54])[0]
+
+    if frames is not None:
+        duration = max(0, frames * samples - trim) / rate
+    else:
+        # Constant bitrate: the audio bytes divided by the byte rate
+        end = _file_size(file)
+        file.seek(max(0, end - 128))
+        if file.read(3) == b"TAG":
+            end -= 128
+        duration = (end - start - position) * 8 / bitrate
+
+    return AudioInfo(duration=duration, frame_rate=rate, channels=channels, bit_depth=None)
+
+
+# ----------------------------------------------------------------------
+# Ogg (Vorbis, Opus)
+# ----------------------------------------------------------------------
+
+
+def _ogg_page(data: bytes, offset: int) -> tuple[int, int, bytes] | None:
+    """(granule position, serial, first packet bytes) of the page at ``offset``."""
+    if data[offset : offset + 4] != b"OggS" or len(data) < offset + 27:
+        return None
+    granule, serial = struct.unpack("<qI", data[offset + 6 : offset + 18])
+    segments = data[offset + 26]
+    table = data[offset + 27 : offset + 27 + segments]
+    body = offset + 27 + segments
+    return granule, serial, data[body : body + sum(table)]
+
+
+def ogg_header(file: BinaryIO) -> AudioInfo | None:
+    file.seek(0)
+    page = _ogg_page(file.read(_HEAD), 0)
+    if page is None:
+        return None
+    _, serial, packet = page
+
+    if packet[:7] == b"\x01vorbis":
+        channels, rate = struct.unpack("<BI", packet[11:16])
+        skip = 0
+    elif packet[:8] == b"OpusHead":
+        # Opus always decodes at 48 kHz; the first samples are encoder delay
+        channels, skip = struct.unpack("<BH", packet[9:12])
+        rate = 48000
+    else:
+        return None
+    if not channels or not rate:
+        return None
+
+    # The stream length is the granule position of its last page
+    size = _file_size(file)
+    tail_start = max(0, size - _HEAD)
+    file.seek(tail_start)
+    tail = file.read()
+    granule = -1
+    position = tail.rfind(b"OggS")
+    while position >= 0:
+        last = _ogg_page(tail, position)
+        if last is not None and last[1] == serial and last[0] >= 0:
+            granule = last[0]
+            break
+        position = tail.rfind(b"OggS", 0, position)
+    if granule < 0:
+        return None
+
+    return AudioInfo(
+        duration=max(0, granule - skip) / rate,
+        frame_rate=rate,
+        channels=channels,
+        bit_depth=None,
+    )
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from aud.core.models import AudioFile, AudioInfo
+from aud.core.probe import probe
+
+INDEX_NAME = ".aud-index.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    duration REAL,
+    frame_rate INTEGER,
+    channels INTEGER,
+    bit_depth INTEGER,
+    peak_dbfs REAL,
+    error TEXT
+)
+"""
+
+_COLUMNS = "duration, frame_rate, channels, bit_depth, peak_dbfs"
+
+# keys per "path IN (...)" query, below SQLite's bound parameter limit
+_CHUNK = 500
+
+
+class MetadataIndex:
+    """
+    Persistent SQLite index of ``AudioInfo`` per file.
+
+    ``refresh`` probes only files that are new or whose size / mtime_ns
+    changed, reading headers in a thread pool; everything else is answered
+    from the index. Files that fail to probe are recorded with their error
+    and retried once they change.
+
+    ``path`` may be ":memory:" for an index that lives as long as the object.
+    """
+
+    def __init__(self, path: str | Path = ":memory:", workers: int = 8):
+        self.path = path
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> MetadataIndex:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def refresh(self, files: Iterable[AudioFile], peak: bool = False) -> int:
+        """
+        Bring the entries for ``files`` up to date; return how many were probed.
+
+        With ``peak=True`` files whose peak level is unknown are decoded to
+        measure it.
+        """
+        keys = [str(file.path) for file in files]
+        known = {
+            path: (size, mtime_ns, has_peak)
+            for path, size, mtime_ns, has_peak in self._select(
+                "path, size, mtime_ns, peak_dbfs IS NOT NULL OR error IS NOT NULL", keys
+            )
+        }
+
+        stale: list[tuple[str, os.stat_result]] = []
+        for key in keys:
+            try:
+                stat = os.stat(key)
+            except FileNotFoundError:
+                continue
+            entry = known.get(key)
+            if entry is None or entry[:2] != (stat.st_size, stat.st_mtime_ns):
+                stale.append((key, stat))
+            elif peak and not entry[2]:
+                stale.append((key, stat))
+
+        if not stale:
+            return 0
+
+        def read(item: tuple[str, os.stat_result]) -> tuple:
+            key, stat = item
+            try:
+                info = probe(key, peak=peak)
+            except Exception as e:
+                return (key, stat.st_size, stat.st_mtime_ns, None, None, None, None, None, str(e))
+            if info is None:
+                error = "unreadable stream headers"
+                return (key, stat.st_size, stat.st_mtime_ns, None, None, None, None, None, error)
+            return (
+                key,
+                stat.st_size,
+                stat.st_mtime_ns,
+                info.duration,
+                info.frame_rate,
+                info.channels,
+                info.bit_depth,
+                info.peak_dbfs,
+                None,
+            )
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            rows = list(pool.map(read, stale))
+
+        with self._lock:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO files (path, size, mtime_ns, {_COLUMNS}, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+        return len(rows)
+
+    def _select(self, columns: str, keys: list[str], where: str = "1") -> list[tuple]:
+        # Only the rows for ``keys``, so small refreshes stay cheap on a big index
+        rows: list[tuple] = []
+        with self._lock:
+            for start in range(0, len(keys), _CHUNK):
+                chunk = keys[start : start + _CHUNK]
+                rows += self._db.execute(
+                    f"SELECT {columns} FROM files "
+                    f"WHERE path IN ({', '.join('?' * len(chunk))}) AND ({where})",
+                    chunk,
+                ).fetchall()
+        return rows
+
+    def prune(self, keep: Iterable[AudioFile]) -> int:
+        """Remove entries for files not in ``keep``; return how many were removed."""
+        paths = {str(file.path) for file in keep}
+        with self._lock:
+            gone = [(p,) for (p,) in self._db.execute("SELECT path FROM files") if p not in paths]
+            self._db.executemany("DELETE FROM files WHERE path = ?", gone)
+            self._db.commit()
+        return len(gone)
+
+    def get(self, file: AudioFile) -> AudioInfo | None:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {_COLUMNS} FROM files WHERE path = ? AND error IS NULL",
+                (str(file.path),),
+            ).fetchone()
+        return AudioInfo(*row) if row else None
+
+    def lookup(self, files: Iterable[AudioFile]) -> dict[Path, AudioInfo]:
+        """Return the indexed ``AudioInfo`` of each of ``files`` (see ``query``)."""
+        rows = self._select(
+            f"path, {_COLUMNS}", [str(file.path) for file in files], where="error IS NULL"
+        )
+        return {Path(path): AudioInfo(*info) for path, *info in rows}
+
+    def query(self, where: str = "1", params: Iterable = ()) -> dict[Path, AudioInfo]:
+        """
+        Return ``{path: AudioInfo}`` for every indexed file matching ``where``.
+
+            index.query("duration > ? AND channels = 2", (60,))
+        """
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT path, {_COLUMNS} FROM files WHERE error IS NULL AND ({where})",
+                tuple(params),
+            ).fetchall()
+        return {Path(path): AudioInfo(*info) for path, *info in rows}
+
+    def errors(self) -> dict[Path, str]:
+        with self._lock:
+            rows = self._db.execute("SELECT path, error FROM files WHERE error IS NOT NULL")
+            return {Path(path): error for path, error in rows}
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import mmap
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any
+
+from pydub.utils import db_to_float
+
+from aud.core.headers import PcmLayout, pcm_layout
+from aud.core.operations.audio.effects import Fade, Gain, InvertPhase
+
+np: Any
+try:
+    import numpy as np
+except ImportError:  # without numpy, files are left to the decode / export path
+    np = None
+
+# Effects that scale samples where they are, so the file never changes size
+IN_PLACE_OPERATIONS = (Gain, InvertPhase, Fade)
+
+# processed this many frames at a time, to bound the extra memory
+_CHUNK_FRAMES = 1 << 16
+
+# pydub's fade_in / fade_out go from / to -120 dB
+_SILENT = db_to_float(-120)
+
+# (first frame, end frame, factor, channel or None for every channel)
+Step = tuple[int, int, float, int | None]
+
+
+class MappedPcm:
+    """
+    The samples of an integer PCM WAV / AIFF file, memory-mapped for writing.
+
+    ``data`` is a writable view of the sample bytes, exactly as stored in
+    the file; changes are written back when the file is closed. Raises
+    ValueError for other (compressed or float) files.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._file = open(path, "r+b")
+        try:
+            layout = pcm_layout(self._file)
+            if layout is None or layout.float:
+                raise ValueError(f"Not an integer PCM WAV / AIFF file: {path}")
+            if layout.block_align != layout.sample_width * layout.channels:
+                raise ValueError(f"Padded sample frames are not supported: {path}")
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        except BaseException:
+            self._file.close()
+            raise
+
+        # a truncated file holds fewer frames than its header announces
+        available = max(len(self._map) - layout.offset, 0) // layout.block_align
+        self.layout: PcmLayout = layout
+        self.frames = min(layout.frames, available)
+        end = layout.offset + self.frames * layout.block_align
+        self.data = memoryview(self._map)[layout.offset : end]
+
+    def samples(self):
+        """
+        ``data`` as a writable numpy array of shape (frames, channels), in
+        the file's own sample format. Delete the array before the file is
+        closed. 24-bit samples have no numpy type.
+        """
+        if np is None:
+            raise ImportError("Sample arrays require numpy: pip install aud[numpy]")
+        layout = self.layout
+        if layout.sample_width not in (1, 2, 4):
+            raise ValueError(f"No array type for {layout.sample_width * 8}-bit samples")
+        return np.frombuffer(self.data, dtype=_dtype(layout)).reshape(-1, layout.channels)
+
+    def flush(self) -> None:
+        self._map.flush()
+
+    def release(self, start: int, end: int) -> None:
+        """
+        Drop frames ``start`` to ``end`` from this process's memory; they
+        stay in the file (and the page cache), and are mapped again when
+        touched.
+        """
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        # whole pages only: a partly released page is kept in memory
+        begin = self.layout.offset + start * self.layout.block_align
+        begin -= begin % mmap.PAGESIZE
+        stop = self.layout.offset + end * self.layout.block_align
+        stop -= stop % mmap.PAGESIZE
+        if stop > begin:
+            self._map.madvise(mmap.MADV_DONTNEED, begin, stop - begin)
+
+    def close(self) -> None:
+        self.data.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> MappedPcm:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def apply_in_place(path: str | Path, operations) -> bool:
+    """
+    Apply ``operations`` (Gain, InvertPhase and Fade) to a PCM WAV / AIFF
+    file in place; False, with the file untouched, when the file or one of
+    the operations cannot be handled this way.
+
+    The sample data is memory-mapped and processed in chunks, each dropped
+    from memory once written, so memory use does not depend on the file
+    size, and only the frames an operation changes are read and written (a
+    fade touches its own few seconds). The samples are scaled as pydub
+    scales them; the file keeps its format (24-bit stays 24-bit). A file
+    that fails half-way is left half-done. Needs numpy.
+    """
+    operations = list(operations)
+    if np is None:
+        return False
+    if not operations or not all(isinstance(op, IN_PLACE_OPERATIONS) for op in operations):
+        return False
+    try:
+        pcm = MappedPcm(path)
+    except (OSError, ValueError):
+        return False
+
+    with pcm:
+        passes: list[list[Step]] = []
+        for op in operations:
+            steps = _passes(op, pcm.frames, pcm.layout)
+            if steps is None:
+                return False
+            passes.extend(steps)
+
+        frame_bytes = pcm.layout.block_align
+        for start, end in _touched(passes):
+            for first in range(start, end, _CHUNK_FRAMES):
+                last = min(first + _CHUNK_FRAMES, end)
+                view = pcm.data[first * frame_bytes : last * frame_bytes]
+                view[:] = _process(bytes(view), first, last, passes, pcm.layout)
+                view.release()
+                # written pages are kept by the file, not by this process
+                pcm.release(first, last)
+        pcm.flush()
+    return True
+
+
+def _passes(op, frames: int, layout: PcmLayout) -> list[list[Step]] | None:
+    # the scaling ``op`` does, as consecutive passes of sorted steps
+    if isinstance(op, Gain):
+        return [[(0, frames, db_to_float(float(op.amount_db)), None)]]
+
+    if isinstance(op, InvertPhase):
+        if op.channel not in ("left", "right"):
+            return [[(0, frames, -1.0, None)]]
+        if layout.channels != 2:
+            return None  # left to pydub, which refuses it
+        return [[(0, frames, -1.0, 0 if op.channel == "left" else 1)]]
+
+    length = round(1000 * (frames / layout.frame_rate))  # len() of the AudioSegment
+    passes = []
+    for duration, fade_in in ((int(op.fade_in * 1000), True), (int(op.fade_out * 1000), False)):
+        if duration <= 0:
+            continue
+        if duration > length:
+            return None
+        start = 0 if fade_in else length - duration
+        passes.append(_fade_steps(frames, layout.frame_rate, start, duration, fade_in))
+    return passes
+
+
+def _fade_steps(frames: int, rate: int, start: int, duration: int, fade_in: bool) -> list[Step]:
+    # AudioSegment.fade: one gain step per millisecond, or per frame when short
+    def position(ms: float) -> int:
+        return min(int(ms * (rate / 1000.0)), frames)
+
+    from_power, to_power = (_SILENT, 1.0) if fade_in else (1.0, _SILENT)
+    delta = to_power - from_power
+    end = start + duration
+
+    steps: list[Step] = []
+    if duration > 100:
+        step = delta / duration
+        for i in range(duration):
+            factor = from_power + step * i
+            steps.append((position(start + i), position(start + i + 1), factor, None))
+    else:
+        start_frame = start * (rate / 1000.0)
+        fade_frames = end * (rate / 1000.0) - start_frame
+        step = delta / fade_frames
+        for i in range(int(fade_frames)):
+            frame = int(start_frame + i)
+            if frame < frames:
+                steps.append((frame, frame + 1, from_power + step * i, None))
+    if not fade_in:
+        # frames past the last whole millisecond end silent
+        steps.append((position(end), frames, to_power, None))
+    return [step for step in steps if step[0] < step[1]]
+
+
+def _touched(passes: list[list[Step]]) -> list[tuple[int, int]]:
+    # the merged frame ranges any pass changes
+    ranges = sorted((steps[0][0], steps[-1][1]) for steps in passes if steps)
+    merged: list[tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _process(data: bytes, first: int, last: int, passes: list[list[Step]], layout) -> bytes:
+    samples = _decode(data, layout).reshape(-1, layout.channels)
+    # audioop.mul (used by pydub): scaled, rounded down and clipped
+    bits = 8 * layout.sample_width
+    low, high = -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+
+    for steps in passes:
+        # the steps of a pass do not overlap: each one scales the samples as they were
+        index = bisect_right([end for _, end, _, _ in steps], first)
+        for start, end, factor, channel in steps[index:]:
+            if start >= last:
+                break
+            a, b = max(start, first) - first, min(end, last) - first
+            view = samples[a:b] if channel is None else samples[a:b, channel]
+            view[...] = np.clip(np.floor(view * factor), low, high)
+
+    return _encode(samples, layout)
+
+
+def _dtype(layout: PcmLayout) -> Any:
+    # the numpy type of 8-, 16- and 32-bit samples as stored in the file
+    if layout.sample_width == 1:
+        return np.uint8 if layout.unsigned else np.int8
+    return np.dtype(f"{'>' if layout.big_endian else '<'}i{layout.sample_width}")
+
+
+def _decode(data: bytes, layout: PcmLayout) -> Any:
+    # the stored samples as signed integers (int64)
+    if layout.sample_width != 3:
+        samples = np.frombuffer(data, dtype=_dtype(layout)).astype(np.int64)
+        return samples - 128 if layout.unsigned else samples
+
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int64)
+    if layout.big_endian:
+        raw = raw[:, ::-1]
+    samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+    return samples - ((samples & 0x800000) << 1)
+
+
+def _encode(samples: Any, layout: PcmLayout) -> bytes:
+    # back to the stored format
+    samples = samples.astype(np.int64).ravel()
+    if layout.sample_width != 3:
+        if layout.unsigned:
+            samples = samples + 128
+        return samples.astype(_dtype(layout)).tobytes()
+
+    raw = np.stack([samples & 0xFF, (samples >> 8) & 0xFF, (samples >> 16) & 0xFF], axis=1)
+    if layout.big_endian:
+        raw = raw[:, ::-1]
+    return raw.astype(np.uint8).tobytes()
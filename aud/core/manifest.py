@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Sequence
+from pathlib import Path
+
+from aud.core.adapters.pipeline import AGGREGATE_OPERATIONS, PipelineAdapter
+from aud.core.models import AudioFile
+from aud.core.operations.base import Operation
+from aud.core.plan import Plan
+from aud.exceptions import BatchError
+
+MANIFEST_NAME = ".aud-manifest.json"
+MANIFEST_VERSION = 1
+
+# Entries for plans that aggregate files (Zip, AudioJoin) cover the whole plan
+_PLAN_KEY = "plan:"
+
+_CHUNK = 1024 * 1024
+
+
+def file_hash(path: str | Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while chunk := file.read(_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _canonical(value):
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+class Manifest:
+    """
+    Sidecar JSON record of what a Plan produced, for incremental runs.
+
+    For every processed source the manifest stores a content hash of the
+    input, the fingerprint of the plan that processed it and a hash of each
+    output. Running the same plan again skips a file when either
+
+    - it is an unchanged input whose recorded outputs are all intact, or
+    - it is itself an intact output of that plan (in-place edits, renames).
+
+    Hashes are reused while a file's size and mtime_ns are unchanged, so
+    an unchanged library is checked with ``stat`` calls only.
+
+    Plans containing aggregate operations are recorded as one unit and
+    skipped only when none of their inputs changed.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.root = self.path.parent.resolve()
+        self.skipped: list[AudioFile] = []
+        self.processed: list[AudioFile] = []
+
+        self._entries: dict[str, dict] = {}
+        self._hashes: dict[str, list] = {}
+        # output key -> key of the entry that produced it
+        self._outputs: dict[str, str] = {}
+        self.load()
+
+    # ------------------------------------------------------------------
+    # persistence
+    # ------------------------------------------------------------------
+
+    def load(self) -> None:
+        data = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+        if data.get("version") != MANIFEST_VERSION:
+            data = {}
+
+        self._entries = data.get("entries", {})
+        self._hashes = data.get("hashes", {})
+        self._index()
+
+    def save(self) -> None:
+        data = {"version": MANIFEST_VERSION, "entries": self._entries, "hashes": self._hashes}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=1, sort_keys=True))
+        os.replace(tmp, self.path)
+
+    def _index(self) -> None:
+        self._outputs = {
+            output: key for key, entry in self._entries.items() for output in entry["outputs"]
+        }
+
+    # ------------------------------------------------------------------
+    # identities
+    # ------------------------------------------------------------------
+
+    def key(self, path: str | Path) -> str:
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return str(path)
+
+    def resolve(self, key: str) -> Path:
+        return self.root / key
+
+    def hash(self, path: str | Path) -> str | None:
+        """Content hash of ``path`` (None if missing), reused while size / mtime match."""
+        key = self.key(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._hashes.pop(key, None)
+            return None
+
+        cached = self._hashes.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = file_hash(path)
+        self._hashes[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def fingerprint(self, operations: list[Operation]) -> str:
+        """
+        Canonical hash of the operations, their public parameters and the
+        contents of the extra files they read (watermarks, intros, ...).
+        """
+        canonical = [
+            {
+                "op": f"{type(op).__module__}.{type(op).__qualname__}",
+                "params": {
+                    k: _canonical(v) for k, v in sorted(vars(op).items()) if not k.startswith("_")
+                },
+                "inputs": [self.hash(path) for path in op.inputs()],
+            }
+            for op in operations
+        ]
+        encoded = json.dumps(canonical, sort_keys=True).encode()
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    def _intact(self, entry: dict) -> bool:
+        return all(
+            self.hash(self.resolve(key)) == digest for key, digest in entry["outputs"].items()
+        )
+
+    # ------------------------------------------------------------------
+    # lookup / record
+    # ------------------------------------------------------------------
+
+    def lookup(self, file: AudioFile, fingerprint: str) -> AudioFile | None:
+        """Return where ``file`` already ended up under this plan, or None."""
+        key = self.key(file.path)
+        digest = self.hash(file.path)
+
+        entry = self._entries.get(self._outputs.get(key, ""))
+        if entry and entry["plan"] == fingerprint and entry["outputs"][key] == digest:
+            if self._intact(entry):
+                return file
+
+        entry = self._entries.get(key)
+        if entry and entry["plan"] == fingerprint and entry["input"] == digest:
+            if self._intact(entry):
+                return AudioFile(self.resolve(entry["target"]))
+        return None
+
+    def record(
+        self,
+        source: AudioFile,
+        input_hash: str | None,
+        fingerprint: str,
+        target: AudioFile,
+        outputs: list[AudioFile],
+    ) -> None:
+        key = self.key(source.path)
+        keys = {self.key(file.path) for file in outputs}
+
+        # An output can only belong to one entry
+        for stale in {key, *(self._outputs[k] for k in keys if k in self._outputs)}:
+            self._forget(stale)
+
+        self._add(
+            key,
+            {
+                "plan": fingerprint,
+                "input": input_hash,
+                "target": self.key(target.path),
+                "outputs": {self.key(f.path): self.hash(f.path) for f in outputs},
+            },
+        )
+
+    def _add(self, key: str, entry: dict) -> None:
+        self._entries[key] = entry
+        for output in entry["outputs"]:
+            self._outputs[output] = key
+
+    def _forget(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        for output in entry["outputs"] if entry else ():
+            if self._outputs.get(output) == key:
+                del self._outputs[output]
+
+    # ------------------------------------------------------------------
+    # execution
+    # ------------------------------------------------------------------
+
+    def execute(self, adapter: PipelineAdapter, plan: Plan) -> list[AudioFile]:
+        """Run ``plan`` on the files that are new or changed since the last run."""
+        self.skipped, self.processed = [], []
+        fingerprint = self.fingerprint(plan.operations)
+        try:
+            if any(isinstance(op, AGGREGATE_OPERATIONS) for op in plan.operations):
+                return self._execute_unit(adapter, plan, fingerprint)
+            return self._execute_files(adapter, plan, fingerprint)
+        finally:
+            self.save()
+
+    def _execute_files(
+        self, adapter: PipelineAdapter, plan: Plan, fingerprint: str
+    ) -> list[AudioFile]:
+        # Routes are resolved for every file, in order, so position dependent
+        # operations (Iterate) number new files the same way a full run would
+        routes = [adapter.route(plan.operations, file) for file in plan.files]
+
+        results: list[AudioFile | None] = []
+        pending = []
+        for route in routes:
+            done = self.lookup(route.source, fingerprint)
+            results.append(done)
+            if done is None:
+                pending.append((len(results) - 1, self.hash(route.source.path), route))
+            else:
+                self.skipped.append(route.source)
+
+        outputs: Sequence[AudioFile | None] = []
+        try:
+            outputs = adapter.run_all([route for _, _, route in pending])
+        except BatchError as e:
+            outputs = e.results
+            raise
+        finally:
+            # no outputs at all when run_all failed before any route ran
+            for (index, input_hash, route), output in zip(pending, outputs, strict=False):
+                if output is None:
+                    continue
+                written = [output]
+                written += [file for file in route.outputs[1:] if file.path != route.source.path]
+                self.record(route.source, input_hash, fingerprint, output, written)
+                self.processed.append(route.source)
+                results[index] = output
+
+        return [file for file in results if file is not None]
+
+    def _execute_unit(
+        self, adapter: PipelineAdapter, plan: Plan, fingerprint: str
+    ) -> list[AudioFile]:
+        key = _PLAN_KEY + fingerprint
+        plan = Plan(list(plan.files), plan.operations)
+        inputs = {self.key(file.path): self.hash(file.path) for file in plan.files}
+
+        entry = self._entries.get(key)
+        if entry and entry["inputs"] == inputs and self._intact(entry):
+            self.skipped = list(plan.files)
+            return [AudioFile(self.resolve(k)) for k in entry["targets"]]
+
+        outputs = adapter.execute(plan)
+        self.processed = list(plan.files)
+        self._forget(key)
+        self._add(
+            key,
+            {
+                "plan": fingerprint,
+                "inputs": inputs,
+                "targets": [self.key(f.path) for f in outputs],
+                "outputs": {self.key(f.path): self.hash(f.path) for f in outputs},
+            },
+        )
+        return outputs
@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import IO, Any, TypeVar
+
+from aud.core.executor import map_batches, map_files
+from aud.core.headers import header_info
+from aud.core.models import AudioFile
+from aud.exceptions import BatchError
+
+resource: Any
+try:
+    import resource
+except ImportError:  # Windows: peak memory is reported as 0
+    resource = None
+
+T = TypeVar("T")
+
+# Where the wall time of a file goes (see FileMetrics)
+PHASES = ("decode", "process", "encode", "ffmpeg")
+
+# The file being measured in this thread / process, if any
+_current: ContextVar[FileMetrics | None] = ContextVar("aud_metrics", default=None)
+
+
+@dataclass(slots=True)
+class FileMetrics:
+    """
+    The cost of processing one file with one operation (or a fused pipeline).
+
+    ``decode`` / ``encode`` is time spent reading / writing audio in Python,
+    ``ffmpeg`` time in ffmpeg processes that convert the file by themselves
+    (decode and encode together) and ``process`` the rest of ``wall``.
+    ``peak_rss`` is the peak resident memory (bytes) so far of the process
+    that did the work. Files of an ffmpeg batch share the batch equally.
+    """
+
+    operation: str
+    path: str
+    wall: float = 0.0
+    decode: float = 0.0
+    process: float = 0.0
+    encode: float = 0.0
+    ffmpeg: float = 0.0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    audio_seconds: float = 0.0
+    peak_rss: int = 0
+
+    @property
+    def realtime_factor(self) -> float:
+        """Seconds of audio processed per second of wall time."""
+        return self.audio_seconds / self.wall if self.wall > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "realtime_factor": self.realtime_factor}
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Add the time spent in the block to ``name`` of the file being measured."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, name, getattr(metrics, name) + time.perf_counter() - start)
+
+
+async def in_executor(executor: Executor | None, fn: Callable[..., T], *args) -> T:
+    """
+    ``loop.run_in_executor``, adding the phases measured in the executor
+    (thread or process) to the file being measured by the awaiting task.
+    """
+    loop = asyncio.get_running_loop()
+    metrics = _current.get()
+    if metrics is None:
+        return await loop.run_in_executor(executor, fn, *args)
+
+    result, measured = await loop.run_in_executor(executor, _phases, fn, *args)
+    for name in ("decode", "encode", "ffmpeg"):
+        setattr(metrics, name, getattr(metrics, name) + getattr(measured, name))
+    metrics.peak_rss = max(metrics.peak_rss, measured.peak_rss)
+    return result
+
+
+class Metrics:
+    """
+    Collects a ``FileMetrics`` for every file processed, and passes each one
+    to the registered hooks (``hook(metrics)``) as it arrives.
+
+    Totals per operation are kept for ``summary`` / ``prometheus``; the last
+    ``keep`` records (all when None) for ``write_jsonl``. Work done in worker
+    processes is measured there and reported back with the results.
+    """
+
+    def __init__(
+        self,
+        hooks: Iterable[Callable[[FileMetrics], None]] = (),
+        keep: int | None = 10_000,
+    ) -> None:
+        self.hooks = list(hooks)
+        self.records: deque[FileMetrics] = deque(maxlen=keep)
+        self.totals: dict[str, dict[str, float]] = {}
+        self.peak_rss = 0
+
+    def add_hook(self, hook: Callable[[FileMetrics], None]) -> None:
+        self.hooks.append(hook)
+
+    def record(self, metrics: FileMetrics) -> None:
+        self.records.append(metrics)
+        totals = self._totals(metrics.operation)
+        totals["files"] += 1
+        for name in ("wall", *PHASES, "bytes_read", "bytes_written", "audio_seconds"):
+            totals[name] += getattr(metrics, name)
+        self.peak_rss = max(self.peak_rss, metrics.peak_rss)
+        for hook in self.hooks:
+            hook(metrics)
+
+    def _totals(self, operation: str) -> dict[str, float]:
+        if operation not in self.totals:
+            names = ("files", "failures", "wall", *PHASES)
+            self.totals[operation] = dict.fromkeys(
+                (*names, "bytes_read", "bytes_written", "audio_seconds"), 0
+            )
+        return self.totals[operation]
+
+    # ------------------------------------------------------------------
+    # measured execution
+    # ------------------------------------------------------------------
+
+    def map_files(self, operation: str, fn: Callable, items: Iterable, workers: int = 1) -> list:
+        """``map_files``, recording a ``FileMetrics`` for every item."""
+        return self._collect(
+            operation, map_files, partial(_measured, operation, fn), items, workers
+        )
+
+    def map_batches(
+        self,
+        operation: str,
+        batch_fn: Callable,
+        fn: Callable,
+        items: Iterable,
+        size: int,
+        workers: int = 1,
+    ) -> list:
+        """``map_batches``, recording a ``FileMetrics`` for every item."""
+        return self._collect(
+            operation,
+            map_batches,
+            partial(_measured_batch, operation, batch_fn),
+            partial(_measured, operation, fn),
+            items,
+            size,
+            workers,
+        )
+
+    async def measure_async(self, operation: str, item, work: Awaitable[T]) -> T:
+        """
+        Await ``work`` on ``item`` and record its ``FileMetrics``. Phases run
+        in executors count when they are awaited with ``in_executor``.
+        """
+        metrics = _start(operation, item)
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            result = await work
+        except Exception:
+            self._totals(operation)["failures"] += 1
+            raise
+        finally:
+            metrics.wall = time.perf_counter() - start
+            _current.reset(token)
+        _finish(metrics, result)
+        self.record(metrics)
+        return result
+
+    def _collect(self, operation: str, mapper: Callable, *args) -> list:
+        try:
+            return self._unwrap(mapper(*args))
+        except BatchError as e:
+            self._totals(operation)["failures"] += len(e.failures)
+            raise BatchError(e.failures, self._unwrap(e.results)) from e
+
+    def _unwrap(self, results: list) -> list:
+        unwrapped: list = []
+        for pair in results:
+            if pair is None:
+                unwrapped.append(None)
+                continue
+            result, metrics = pair
+            self.record(metrics)
+            unwrapped.append(result)
+        return unwrapped
+
+    # ------------------------------------------------------------------
+    # export
+    # ------------------------------------------------------------------
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Totals per operation, with the overall realtime factor of each."""
+        return {
+            operation: {
+                **totals,
+                "realtime_factor": (
+                    totals["audio_seconds"] / totals["wall"] if totals["wall"] > 0 else 0.0
+                ),
+            }
+            for operation, totals in self.totals.items()
+        }
+
+    def write_jsonl(self, file: str | Path | IO[str]) -> None:
+        """Write the kept records as JSON lines (one object per file and operation)."""
+        if isinstance(file, (str, Path)):
+            with open(file, "a", encoding="utf-8") as handle:
+                self.write_jsonl(handle)
+            return
+        for metrics in self.records:
+            file.write(json.dumps(metrics.to_dict()) + "\n")
+
+    def prometheus(self) -> str:
+        """The totals in the Prometheus text exposition format."""
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help: str, samples: list[tuple[str, float]]) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{labels} {_number(value)}" for labels, value in samples)
+
+        def per_operation(key: str) -> list[tuple[str, float]]:
+            return [(_labels(operation=op), t[key]) for op, t in self.totals.items()]
+
+        family("aud_files_total", "counter", "Files processed.", per_operation("files"))
+        family("aud_failures_total", "counter", "Files that failed.", per_operation("failures"))
+        family(
+            "aud_wall_seconds_total", "counter", "Wall time spent on files.", per_operation("wall")
+        )
+        family(
+            "aud_phase_seconds_total",
+            "counter",
+            "Wall time by phase (decode, process, encode, ffmpeg).",
+            [
+                (_labels(operation=op, phase=name), t[name])
+                for op, t in self.totals.items()
+                for name in PHASES
+            ],
+        )
+        family("aud_read_bytes_total", "counter", "Bytes of input.", per_operation("bytes_read"))
+        family(
+            "aud_written_bytes_total", "counter", "Bytes of output.", per_operation("bytes_written")
+        )
+        family(
+            "aud_audio_seconds_total",
+            "counter",
+            "Seconds of audio processed.",
+            per_operation("audio_seconds"),
+        )
+        family(
+            "aud_peak_rss_bytes",
+            "gauge",
+            "Peak resident memory of the processes that did the work.",
+            [("", self.peak_rss)],
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _source(item) -> Path:
+    # items are AudioFiles, or pipeline routes
+    return getattr(item, "source", item).path
+
+
+def _size(path: Path) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def _peak_rss() -> int:
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB elsewhere
+
+
+def _start(operation: str, item) -> FileMetrics:
+    source = _source(item)
+    info = header_info(source)
+    return FileMetrics(
+        operation,
+        str(source),
+        bytes_read=_size(source),
+        audio_seconds=info.duration if info is not None else 0.0,
+    )
+
+
+def _finish(metrics: FileMetrics, result) -> None:
+    if isinstance(result, AudioFile):
+        metrics.bytes_written = _size(result.path)
+    measured = metrics.decode + metrics.encode + metrics.ffmpeg
+    metrics.process = max(metrics.wall - measured, 0.0)
+    metrics.peak_rss = max(metrics.peak_rss, _peak_rss())
+
+
+def _measured(operation: str, fn: Callable, item) -> tuple:
+    metrics = _start(operation, item)
+    token = _current.set(metrics)
+    start = time.perf_counter()
+    try:
+        result = fn(item)
+    finally:
+        metrics.wall = time.perf_counter() - start
+        _current.reset(token)
+    _finish(metrics, result)
+    return result, metrics
+
+
+def _phases(fn: Callable, *args) -> tuple:
+    # the phases of one call, wherever it runs
+    metrics = FileMetrics("", "")
+    token = _current.set(metrics)
+    try:
+        result = fn(*args)
+    finally:
+        _current.reset(token)
+    metrics.peak_rss = _peak_rss()
+    return result, metrics
+
+
+def _measured_batch(operation: str, batch_fn: Callable, items: list) -> list:
+    files = [_start(operation, item) for item in items]
+    shared = FileMetrics(operation, "")
+    token = _current.set(shared)
+    start = time.perf_counter()
+    try:
+        results = batch_fn(items)
+    finally:
+        shared.wall = time.perf_counter() - start
+        _current.reset(token)
+
+    done = sum(result is not None for result in results) or 1
+    pairs: list = []
+    for metrics, result in zip(files, results, strict=True):
+        if result is None:
+            pairs.append(None)
+            continue
+        for name in ("wall", "decode", "encode", "ffmpeg"):
+            setattr(metrics, name, getattr(shared, name) / done)
+        _finish(metrics, result)
+        pairs.append((result, metrics))
+    return pairs
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -33,3 +34,114 @@ class AudioFile:
 
     def with_path(self, new_path: Path) -> AudioFile:
         return AudioFile(new_path)
+
+
+@dataclass(frozen=True, slots=True)
+class AudioInfo:
+    """
+    Stream properties of an audio file, as read from its header.
+
+    ``bit_depth`` is None for lossy codecs and ``peak_dbfs`` is only known
+    once the audio has been decoded.
+    """
+
+    duration: float
+    frame_rate: int
+    channels: int
+    bit_depth: int | None = None
+    peak_dbfs: float | None = None
+
+    @property
+    def frames(self) -> int:
+        return round(self.duration * self.frame_rate)
+
+
+@dataclass(frozen=True, slots=True)
+class Measurement:
+    """
+    Levels measured on a piece of audio, relative to full scale.
+
+    ``peak`` / ``true_peak`` are linear amplitudes (1.0 = 0 dBFS) and
+    ``mean_square`` is the mean squared sample over all channels.
+    ``block_powers`` holds the channel-weighted, K-weighted mean square of
+    every 400 ms gating block (ITU-R BS.1770); it is only measured when
+    integrated loudness is needed.
+    """
+
+    peak: float
+    mean_square: float
+    frames: int
+    true_peak: float | None = None
+    block_powers: tuple[float, ...] | None = None
+
+    @classmethod
+    def combine(cls, measurements: list[Measurement]) -> Measurement:
+        """Measurement of all ``measurements`` played back to back (album levels)."""
+        frames = sum(m.frames for m in measurements)
+        # only known for the album when measured on every part
+        true_peaks = [m.true_peak for m in measurements if m.true_peak is not None]
+        true_peak = max(true_peaks, default=0.0) if len(true_peaks) == len(measurements) else None
+        blocks = [m.block_powers for m in measurements if m.block_powers is not None]
+        block_powers = (
+            tuple(p for b in blocks for p in b) if len(blocks) == len(measurements) else None
+        )
+
+        return cls(
+            peak=max((m.peak for m in measurements), default=0.0),
+            mean_square=(
+                sum(m.mean_square * m.frames for m in measurements) / frames if frames else 0.0
+            ),
+            frames=frames,
+            true_peak=true_peak,
+            block_powers=block_powers,
+        )
+
+    def level(self, mode: str) -> float:
+        """Level in dBFS ("peak", "rms") or LUFS ("lufs"); -inf for silence."""
+        if mode == "peak":
+            return _to_db(self.peak, 20)
+        if mode == "rms":
+            return _to_db(self.mean_square, 10)
+        if mode == "lufs":
+            if self.block_powers is None:
+                raise ValueError("Integrated loudness was not measured")
+            return _integrated_loudness(self.block_powers)
+        raise ValueError(f"Unknown level mode: {mode}")
+
+
+@dataclass(frozen=True, slots=True)
+class FileEvent:
+    """
+    A file that finished processing: ``output`` is what it became, or None
+    when it failed with ``error``. ``elapsed`` is the time spent on it, in
+    seconds.
+    """
+
+    source: AudioFile
+    output: AudioFile | None = None
+    error: Exception | None = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _to_db(value: float, factor: int) -> float:
+    return factor * math.log10(value) if value > 0 else -math.inf
+
+
+def _block_loudness(power: float) -> float:
+    return -0.691 + _to_db(power, 10)
+
+
+def _integrated_loudness(block_powers: tuple[float, ...]) -> float:
+    # BS.1770 gating: absolute gate at -70 LUFS, then a relative gate
+    # 10 LU below the loudness of the blocks that passed it
+    gated = [p for p in block_powers if _block_loudness(p) >= -70.0]
+    if not gated:
+        return -math.inf
+
+    relative = _block_loudness(sum(gated) / len(gated)) - 10.0
+    gated = [p for p in gated if _block_loudness(p) >= relative]
+    return _block_loudness(sum(gated) / len(gated))
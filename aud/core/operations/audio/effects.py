@@ -1,15 +1,63 @@
 from __future__ import annotations
 
+import math
+import random
 from pathlib import Path
 
-from aud.core.models import AudioFile
+from aud.core.models import AudioFile, Measurement
 from aud.core.operations.audio.base import AudioOperation
 
 
 class Normalize(AudioOperation):
-    def __init__(self, target_db: float = 0.1, passes: int = 1):
-        self.target_db = target_db
+    """
+    Bring audio to a target level with a single measured gain.
+
+    ``mode`` selects what is measured:
+
+    - "peak": sample peak, ``target_db`` is the headroom below 0 dBFS
+    - "rms": RMS level in dBFS
+    - "lufs": integrated loudness (EBU R128 / ITU-R BS.1770) in LUFS
+
+    ``true_peak`` optionally caps the gain so the oversampled peak stays
+    below that many dBTP. ``gain_db`` skips the measurement and applies a
+    precomputed gain (album normalization). ``passes`` is kept for
+    compatibility; one pass always reaches the target.
+    """
+
+    DEFAULT_TARGETS = {"peak": 0.1, "rms": -20.0, "lufs": -23.0}
+
+    def __init__(
+        self,
+        target_db: float | None = None,
+        passes: int = 1,
+        mode: str = "peak",
+        true_peak: float | None = None,
+        gain_db: float | None = None,
+    ):
+        if mode not in self.DEFAULT_TARGETS:
+            raise ValueError(f"Unknown normalization mode: {mode}")
+        self.mode = mode
+        self.target_db = self.DEFAULT_TARGETS[mode] if target_db is None else target_db
         self.passes = passes
+        self.true_peak = true_peak
+        self.gain_db = gain_db
+
+    @property
+    def needs_loudness(self) -> bool:
+        return self.mode == "lufs"
+
+    def gain_for(self, measurement: Measurement) -> float | None:
+        """Gain (dB) that brings ``measurement`` to the target, or None for silence."""
+        level = measurement.level(self.mode)
+        if level == -math.inf:
+            return None
+
+        target = -self.target_db if self.mode == "peak" else self.target_db
+        gain = target - level
+
+        if self.true_peak is not None and measurement.true_peak:
+            gain = min(gain, self.true_peak - 20 * math.log10(measurement.true_peak))
+        return gain
 
     def apply(self, file: AudioFile) -> AudioFile:
         return file
@@ -78,14 +126,49 @@ class StripSilence(AudioOperation):
 
 
 class Watermark(AudioOperation):
-    def __init__(self, watermark_file: str | Path, frequency_min: float, frequency_max: float):
+    def __init__(
+        self,
+        watermark_file: str | Path,
+        frequency_min: float,
+        frequency_max: float,
+        gain_during_overlay: float = -2,
+        seed: int | None = None,
+    ):
         self.watermark_file = Path(watermark_file)
         self.frequency_min = frequency_min
         self.frequency_max = frequency_max
+        self.gain_during_overlay = gain_during_overlay
+        self.seed = seed
 
     def apply(self, file: AudioFile) -> AudioFile:
         return file
 
+    def inputs(self) -> list[Path]:
+        return [self.watermark_file]
+
+    def schedule(self, duration_ms: int, watermark_ms: int) -> list[int]:
+        """
+        Return the start positions (ms) of every watermark placement.
+
+        Gaps are drawn between ``frequency_min`` and ``frequency_max``
+        seconds. With a ``seed``, the schedule for a given duration is
+        always the same.
+        """
+        rng = random.Random(self.seed) if self.seed is not None else random
+        min_ms = int(self.frequency_min * 1000)
+        max_ms = int(self.frequency_max * 1000)
+
+        positions: list[int] = []
+        if duration_ms > watermark_ms + max_ms:
+            cur = 0
+            while True:
+                cur += rng.randrange(min_ms, max_ms) + watermark_ms
+                if (cur + max_ms + watermark_ms) < duration_ms:
+                    positions.append(cur)
+                else:
+                    break
+        return positions
+
 
 class AudioJoin(AudioOperation):
     def __init__(self, target_location: str | Path, file_format: str = "wav"):
@@ -105,6 +188,9 @@ class PrependAudio(AudioOperation):
     def apply(self, file: AudioFile) -> AudioFile:
         return file
 
+    def inputs(self) -> list[Path]:
+        return [self.audio_file]
+
 
 class AppendAudio(AudioOperation):
     def __init__(self, audio_file: str | Path):
@@ -112,3 +198,6 @@ class AppendAudio(AudioOperation):
 
     def apply(self, file: AudioFile) -> AudioFile:
         return file
+
+    def inputs(self) -> list[Path]:
+        return [self.audio_file]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from pathlib import Path
 
 from aud.core.models import AudioFile
 
@@ -16,3 +17,7 @@ class Operation(ABC):
     @abstractmethod
     def apply(self, file: AudioFile) -> AudioFile | list[AudioFile]:
         raise NotImplementedError
+
+    def inputs(self) -> list[Path]:
+        """Files, other than the one being processed, that the operation reads."""
+        return []
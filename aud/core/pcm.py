@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Any
+
+from pydub import AudioSegment
+
+from aud.core.headers import pcm_layout
+from aud.core.metrics import phase
+
+np: Any
+try:
+    import numpy as np
+except ImportError:  # float samples are left to ffmpeg without numpy
+    np = None
+
+# Containers read and written in-process (samples are stored as they are)
+PCM_FORMATS = frozenset({"wav", "wave", "aif", "aiff", "aifc"})
+
+# pydub keeps 8-bit audio signed; WAV stores it unsigned
+_BIAS_8BIT = bytes((i + 128) & 0xFF for i in range(256))
+_UNBIAS_8BIT = bytes((i - 128) & 0xFF for i in range(256))
+# sign byte pydub puts below 24-bit samples it widens to 32 bits
+_SIGN_PAD = bytes(0xFF if i > 0x7F else 0 for i in range(256))
+
+# converted / written this many frames at a time, to bound the extra memory
+_CHUNK_FRAMES = 1 << 16
+
+# RIFF sizes are 32-bit; larger data chunks are written as RF64
+_RIFF_LIMIT = 0xFFFFFFFF - 1024
+
+
+def read_pcm(path: str | Path) -> AudioSegment | None:
+    """
+    Decode a WAV (PCM / float, incl. WAVE_FORMAT_EXTENSIBLE and RF64) or
+    AIFF / AIFF-C file without starting ffmpeg; None for anything else
+    (compressed, or float without numpy), which is left to pydub.
+
+    The result is what ``AudioSegment.from_file`` returns for the file:
+    8-bit audio becomes signed, 24-bit audio is widened to 32 bits the way
+    pydub does it and float samples are converted to 32-bit integers.
+    """
+    with open(path, "rb") as file:
+        layout = pcm_layout(file)
+        if layout is None or (layout.float and np is None):
+            return None
+        if layout.block_align != layout.sample_width * layout.channels:
+            return None
+        file.seek(layout.offset)
+        data = file.read(layout.frames * layout.block_align)
+
+    # a truncated file ends with a partial frame
+    data = data[: len(data) - len(data) % layout.block_align]
+    width = layout.sample_width
+    if layout.float:
+        data, width = _float_to_int32(data, width, layout.big_endian), 4
+    elif layout.big_endian and width > 1:
+        data = _byteswap(data, width)
+    elif layout.unsigned:
+        data = data.translate(_UNBIAS_8BIT)
+    if width == 3:
+        data, width = _widen_24(data), 4
+
+    return AudioSegment(
+        data=data, sample_width=width, frame_rate=layout.frame_rate, channels=layout.channels
+    )
+
+
+def write_pcm(audio: AudioSegment, path: str | Path, format: str) -> bool:
+    """
+    Write ``audio`` as WAV or AIFF without starting ffmpeg; False (nothing
+    written) for other formats. WAV data larger than 4 GB is written as
+    RF64. The samples are written as pydub would write them.
+    """
+    if format not in PCM_FORMATS:
+        return False
+
+    width, channels, rate = audio.sample_width, audio.channels, audio.frame_rate
+    data = audio.raw_data
+    aiff = format.startswith("aif")
+
+    with open(path, "wb") as file:
+        if aiff:
+            file.write(_aiff_header(len(data), width, channels, rate))
+        else:
+            file.write(_wav_header(len(data), width, channels, rate))
+
+        step = _CHUNK_FRAMES * width * channels
+        for start in range(0, len(data), step):
+            chunk = data[start : start + step]
+            if aiff and width > 1:
+                chunk = _byteswap(chunk, width)
+            elif not aiff and width == 1:
+                chunk = chunk.translate(_BIAS_8BIT)
+            file.write(chunk)
+        if len(data) & 1:
+            file.write(b"\0")
+    return True
+
+
+def _wav_header(size: int, width: int, channels: int, rate: int) -> bytes:
+    block_align = width * channels
+    fmt = struct.pack("<HHIIHH", 1, channels, rate, rate * block_align, block_align, width * 8)
+    padded = size + (size & 1)
+    if size <= _RIFF_LIMIT:
+        riff = struct.pack("<4sI4s", b"RIFF", 4 + 8 + len(fmt) + 8 + padded, b"WAVE")
+        return (
+            riff + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", size)
+        )
+
+    frames = size // (width * channels)
+    ds64 = struct.pack("<QQQI", 4 + 36 + 8 + len(fmt) + 8 + padded, size, frames, 0)
+    return (
+        struct.pack("<4sI4s", b"RF64", 0xFFFFFFFF, b"WAVE")
+        + b"ds64"
+        + struct.pack("<I", len(ds64))
+        + ds64
+        + b"fmt "
+        + struct.pack("<I", len(fmt))
+        + fmt
+        + b"data"
+        + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def _aiff_header(size: int, width: int, channels: int, rate: int) -> bytes:
+    frames = size // (width * channels)
+    comm = struct.pack(">hIh", channels, frames, width * 8) + _extended(rate)
+    ssnd_size = 8 + size
+    form_size = 4 + 8 + len(comm) + 8 + ssnd_size + (size & 1)
+    return (
+        struct.pack(">4sI4s", b"FORM", form_size, b"AIFF")
+        + b"COMM"
+        + struct.pack(">I", len(comm))
+        + comm
+        + b"SSND"
+        + struct.pack(">III", ssnd_size, 0, 0)
+    )
+
+
+def _extended(value: int) -> bytes:
+    # IEEE 754 80-bit extended precision (the AIFF sample rate)
+    if value <= 0:
+        return bytes(10)
+    exponent = value.bit_length() - 1
+    mantissa = value << (63 - exponent)
+    return struct.pack(">HQ", exponent + 16383, mantissa)
+
+
+def _byteswap(data: bytes, width: int) -> bytes:
+    if width == 3:
+        swapped = bytearray(len(data))
+        swapped[0::3], swapped[1::3], swapped[2::3] = data[2::3], data[1::3], data[0::3]
+        return bytes(swapped)
+    samples = array({2: "h", 4: "i", 8: "q"}[width])
+    samples.frombytes(data)
+    samples.byteswap()
+    return samples.tobytes()
+
+
+def _widen_24(data: bytes) -> bytes:
+    # pydub's conversion: the 24-bit value shifted up, with a sign byte below
+    widened = bytearray(len(data) // 3 * 4)
+    widened[0::4] = data[2::3].translate(_SIGN_PAD)
+    widened[1::4], widened[2::4], widened[3::4] = data[0::3], data[1::3], data[2::3]
+    return bytes(widened)
+
+
+def _float_to_int32(data: bytes, width: int, big_endian: bool) -> bytes:
+    # as ffmpeg converts float samples to s32 (clipped, rounded to nearest)
+    dtype = np.dtype(f"{'>' if big_endian else '<'}f{width}")
+    samples = np.frombuffer(data, dtype=dtype).astype(np.float64)
+    samples = np.rint(samples * 2147483648.0)
+    return np.clip(samples, -2147483648, 2147483647).astype("<i4").tobytes()
+
+
+def read_audio(path: str | Path, format: str | None = None) -> AudioSegment:
+    """``AudioSegment.from_file``, with WAV / AIFF decoded in-process."""
+    with phase("decode"):
+        if format is None or format.lower() in PCM_FORMATS:
+            audio = read_pcm(path)
+            if audio is not None:
+                return audio
+        return AudioSegment.from_file(path, format)
+
+
+def write_audio(audio: AudioSegment, path: str | Path, format: str, **options) -> None:
+    """``audio.export``, with plain WAV / AIFF outputs written in-process."""
+    with phase("encode"):
+        if not any(value is not None for value in options.values()):
+            if write_pcm(audio, path, format.lower()):
+                return
+        audio.export(os.fspath(path), format=format, **options)
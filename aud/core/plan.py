@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 
 from aud.core.models import AudioFile
@@ -11,10 +12,12 @@ class Plan:
     """
     A Plan represents a sequence of operations to apply to a set of files.
 
-    Plans are inert until executed by an adapter.
+    Plans are inert until executed by an adapter. ``files`` may be a lazy
+    iterator (e.g. ``DirectoryScanner.iter_scan()``); it is then consumed
+    once, by the adapter that executes the plan.
     """
 
-    files: list[AudioFile]
+    files: Iterable[AudioFile]
     operations: list[Operation] = field(default_factory=list)
 
     def add(self, operation: Operation) -> Plan:
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+from functools import cache
+from pathlib import Path
+
+from pydub.utils import get_prober_name
+
+from aud.core.headers import header_info
+from aud.core.models import AudioInfo
+from aud.core.pcm import read_audio
+
+
+def probe(path: str | Path, peak: bool = False) -> AudioInfo | None:
+    """
+    Read the stream properties of ``path`` without decoding it.
+
+    WAV, AIFF, FLAC, MP3 and Ogg headers are parsed in-process (see
+    ``header_info``); other formats are probed with ffprobe. Returns None
+    for files neither can read. Files are only decoded when ``peak`` is
+    requested.
+    """
+    path = Path(path)
+    if peak:
+        return decode_info(path)
+
+    info = header_info(path)
+    return info if info is not None else ffprobe_info(path)
+
+
+@cache
+def _prober() -> str | None:
+    return shutil.which(get_prober_name())
+
+
+def ffprobe_info(path: Path) -> AudioInfo | None:
+    prober = _prober()
+    if prober is None:
+        return None
+
+    command = [
+        prober,
+        "-v",
+        "error",
+        "-select_streams",
+        "a:0",
+        "-show_entries",
+        "stream=sample_rate,channels,bits_per_raw_sample,bits_per_sample,duration"
+        ":format=duration",
+        "-of",
+        "json",
+        str(path),
+    ]
+    result = subprocess.run(command, capture_output=True, check=False)
+    if result.returncode != 0:
+        return None
+
+    data = json.loads(result.stdout or b"{}")
+    streams = data.get("streams") or []
+    if not streams:
+        return None
+
+    stream = streams[0]
+    duration = stream.get("duration") or data.get("format", {}).get("duration") or 0
+    bits = int(stream.get("bits_per_raw_sample") or 0) or int(stream.get("bits_per_sample") or 0)
+    return AudioInfo(
+        duration=float(duration),
+        frame_rate=int(stream["sample_rate"]),
+        channels=int(stream["channels"]),
+        bit_depth=bits or None,
+    )
+
+
+def decode_info(path: Path) -> AudioInfo:
+    audio = read_audio(path, path.suffix.lstrip(".").lower())
+    return AudioInfo(
+        duration=audio.frame_count() / audio.frame_rate,
+        frame_rate=audio.frame_rate,
+        channels=audio.channels,
+        bit_depth=audio.sample_width * 8,
+        peak_dbfs=audio.max_dBFS,
+    )
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from aud.core.models import AudioFile
+from aud.core.selection.composite import AnyPolicy, CompositePolicy
+from aud.core.selection.extensions import ExtensionPolicy
+from aud.core.selection.listing import AllowlistPolicy, DenylistPolicy
+from aud.core.selection.policy import SelectionPolicy
+
+_Predicate = Callable[[str], bool]
+# a name matcher that is only tested for truth (e.g. ``re.Pattern.match``)
+_Matcher = Callable[[str], object]
+
+
+@dataclass
+class _Clause:
+    """name has one of ``extensions`` AND is not rejected AND passes ``required``."""
+
+    extensions: frozenset[str] | None = None
+    reject_names: set[str] = field(default_factory=set)
+    reject_patterns: list[re.Pattern] = field(default_factory=list)
+    # checks on the full path: nested alternatives and policies that are
+    # not name based, which are called as they are
+    required: list[_Alternatives | SelectionPolicy] = field(default_factory=list)
+
+
+@dataclass
+class _Alternatives:
+    """name is accepted outright OR satisfies one of ``clauses``."""
+
+    accept_names: set[str] = field(default_factory=set)
+    accept_patterns: list[re.Pattern] = field(default_factory=list)
+    clauses: list[_Clause] = field(default_factory=list)
+
+    @property
+    def never(self) -> bool:
+        return not (self.accept_names or self.accept_patterns or self.clauses)
+
+    @property
+    def clause(self) -> _Clause | None:
+        """The single clause this is equivalent to, if any."""
+        if len(self.clauses) == 1 and not (self.accept_names or self.accept_patterns):
+            return self.clauses[0]
+        return None
+
+
+if os.altsep is None:
+
+    def _name(path: str) -> str:
+        return path.rpartition(os.sep)[2]
+
+else:
+
+    def _name(path: str) -> str:
+        return Path(path).name
+
+
+def _combine(patterns: list[re.Pattern]) -> _Matcher | None:
+    """One ``match`` for all patterns (as ``any(p.match(name) ...)``)."""
+    if not patterns:
+        return None
+    if len(patterns) == 1:
+        return patterns[0].match
+    # Alternation renumbers groups and rejects repeated names / inline flags,
+    # so patterns with either are matched one by one
+    if all(not p.groups and p.flags == patterns[0].flags for p in patterns):
+        try:
+            combined = re.compile("|".join(f"(?:{p.pattern})" for p in patterns), patterns[0].flags)
+            return combined.match
+        except re.error:
+            pass
+    return lambda name: any(p.match(name) for p in patterns)
+
+
+def _compile_tree(policy: SelectionPolicy) -> _Alternatives:
+    if isinstance(policy, CompiledPolicy):
+        return policy._tree
+    if isinstance(policy, ExtensionPolicy):
+        return _Alternatives(clauses=[_Clause(extensions=frozenset(policy.extensions))])
+    if isinstance(policy, AllowlistPolicy):
+        return _Alternatives(
+            accept_names=set(policy.names),
+            accept_patterns=[policy.regex] if policy.regex else [],
+        )
+    if isinstance(policy, DenylistPolicy):
+        return _Alternatives(
+            clauses=[
+                _Clause(
+                    reject_names=set(policy.names),
+                    reject_patterns=[policy.regex] if policy.regex else [],
+                )
+            ]
+        )
+    if isinstance(policy, AnyPolicy):
+        merged = _Alternatives()
+        for child in map(_compile_tree, policy.policies):
+            merged.accept_names |= child.accept_names
+            merged.accept_patterns += child.accept_patterns
+            merged.clauses += child.clauses
+        return merged
+    if isinstance(policy, CompositePolicy):
+        clause = _Clause()
+        for child in map(_compile_tree, policy.policies):
+            if child.never:
+                return _Alternatives()
+            single = child.clause
+            if single is None:
+                clause.required.append(child)
+                continue
+            if single.extensions is not None:
+                clause.extensions = (
+                    single.extensions
+                    if clause.extensions is None
+                    else clause.extensions & single.extensions
+                )
+            clause.reject_names |= single.reject_names
+            clause.reject_patterns += single.reject_patterns
+            clause.required += single.required
+        return _Alternatives(clauses=[clause])
+
+    return _Alternatives(clauses=[_Clause(required=[policy])])
+
+
+def _opaque(tree: _Alternatives) -> Iterator[SelectionPolicy]:
+    for clause in tree.clauses:
+        for required in clause.required:
+            if isinstance(required, _Alternatives):
+                yield from _opaque(required)
+            else:
+                yield required
+
+
+def _check(required: _Alternatives | SelectionPolicy, optimistic: bool) -> _Predicate | None:
+    if isinstance(required, _Alternatives):
+        return _predicate(required, optimistic)
+    if optimistic and required.batched:
+        return None
+
+    def include(path: str) -> bool:
+        return required.include(AudioFile(Path(path)))
+
+    return include
+
+
+def _clause_predicate(clause: _Clause, optimistic: bool) -> Callable[[str, str], bool]:
+    extensions = clause.extensions
+    reject_names = frozenset(clause.reject_names)
+    reject = _combine(clause.reject_patterns)
+    required = tuple(
+        check for check in (_check(r, optimistic) for r in clause.required) if check is not None
+    )
+
+    def match(path: str, name: str) -> bool:
+        if extensions is not None:
+            # AudioFile.extension (Path.suffix rules) without building a Path
+            dot = name.rfind(".")
+            if not 0 < dot < len(name) - 1 or name[dot + 1 :].lower() not in extensions:
+                return False
+        if name in reject_names:
+            return False
+        if reject is not None and reject(name):
+            return False
+        for check in required:
+            if not check(path):
+                return False
+        return True
+
+    return match
+
+
+def _predicate(tree: _Alternatives, optimistic: bool = False) -> _Predicate:
+    """
+    Build the predicate for ``tree``. With ``optimistic=True`` batched
+    policies are assumed to pass (see ``CompiledPolicy.prefilter``).
+    """
+    if tree.never:
+        return lambda path: False
+
+    accept_names = frozenset(tree.accept_names)
+    accept = _combine(tree.accept_patterns)
+    clauses = tuple(_clause_predicate(clause, optimistic) for clause in tree.clauses)
+
+    # The common shapes get a predicate without loops
+    if not accept_names and accept is None and len(clauses) == 1:
+        (clause,) = clauses
+        return lambda path: clause(path, _name(path))
+
+    def match(path: str) -> bool:
+        name = _name(path)
+        if name in accept_names:
+            return True
+        if accept is not None and accept(name):
+            return True
+        for clause in clauses:
+            if clause(path, name):
+                return True
+        return False
+
+    return match
+
+
+class CompiledPolicy(SelectionPolicy):
+    """
+    A policy tree flattened into one predicate on path strings.
+
+    Nested Composite / Any / Extension / Allowlist / Denylist policies are
+    merged into name sets, one combined regex per role and an extension
+    set, so a file is matched with a few set lookups instead of a chain of
+    ``include`` calls and ``AudioFile`` properties. Other policies are kept
+    and called as they are.
+
+    Batched policies (metadata) are evaluated in two steps: ``prefilter``
+    rejects what the name based rules already rule out, ``prepare`` loads
+    the data for the remaining files in bulk, then ``match`` decides.
+    ``include_many`` does all three.
+
+        compiled = compile_policy(policy)
+        compiled.match("take_01.wav")
+        compiled.include_many(names)  # -> [bool, ...]
+    """
+
+    def __init__(self, policy: SelectionPolicy):
+        self.policy = policy
+        self._tree = _compile_tree(policy)
+        self.match: _Predicate = _predicate(self._tree)
+        self.deferred = [p for p in _opaque(self._tree) if p.batched]
+        self.batched = bool(self.deferred)
+        self.prefilter: _Predicate = (
+            _predicate(self._tree, optimistic=True) if self.deferred else self.match
+        )
+
+    def include(self, file: AudioFile) -> bool:
+        return self.match(str(file.path))
+
+    def prepare(self, files: list[AudioFile]) -> None:
+        for policy in self.deferred:
+            policy.prepare(files)
+
+    def include_many(self, paths: Iterable[str]) -> list[bool]:
+        """Evaluate a batch of names or paths; returns one flag per entry."""
+        if not self.deferred:
+            return list(map(self.match, paths))
+
+        paths = list(paths)
+        candidates = list(map(self.prefilter, paths))
+        self.prepare([AudioFile(Path(p)) for p, ok in zip(paths, candidates, strict=True) if ok])
+        return [ok and self.match(p) for p, ok in zip(paths, candidates, strict=True)]
+
+
+def compile_policy(policy: SelectionPolicy) -> CompiledPolicy:
+    if isinstance(policy, CompiledPolicy):
+        return policy
+    return CompiledPolicy(policy)
@@ -10,3 +10,13 @@ class CompositePolicy(SelectionPolicy):
 
     def include(self, file: AudioFile) -> bool:
         return all(policy.include(file) for policy in self.policies)
+
+
+class AnyPolicy(SelectionPolicy):
+    """Includes a file when any of ``policies`` does (none: nothing)."""
+
+    def __init__(self, *policies: SelectionPolicy):
+        self.policies = list(policies)
+
+    def include(self, file: AudioFile) -> bool:
+        return any(policy.include(file) for policy in self.policies)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import math
+import threading
+from abc import abstractmethod
+from pathlib import Path
+
+from aud.core.index import MetadataIndex
+from aud.core.models import AudioFile, AudioInfo
+from aud.core.selection.policy import SelectionPolicy
+
+
+class MetadataPolicy(SelectionPolicy):
+    """
+    Selects files by their stream properties (``AudioInfo``).
+
+    Properties come from a ``MetadataIndex``: headers are probed in a
+    thread pool for a whole batch of files (``prepare``) and kept in the
+    index, so unchanged files are never probed twice. A ``Dir`` binds the
+    policy to its own index; standalone policies get a private in-memory
+    one. Files that cannot be probed are not included.
+    """
+
+    batched = True
+    # whether the peak level is needed (which decodes the file once)
+    peak = False
+
+    def __init__(self, index: MetadataIndex | None = None):
+        self.index = index
+        self._lock = threading.Lock()
+        self._infos: dict[Path, AudioInfo] = {}
+
+    def _index(self) -> MetadataIndex:
+        with self._lock:
+            if self.index is None:
+                self.index = MetadataIndex()
+            return self.index
+
+    def prepare(self, files: list[AudioFile]) -> None:
+        index = self._index()
+        index.refresh(files, peak=self.peak)
+        # only the latest batch is kept here; the index holds the rest
+        self._infos = index.lookup(files)
+
+    def include(self, file: AudioFile) -> bool:
+        info = self._infos.get(file.path)
+        if info is None:
+            index = self._index()
+            index.refresh([file], peak=self.peak)
+            info = index.get(file)
+        return info is not None and self.accepts(info)
+
+    @abstractmethod
+    def accepts(self, info: AudioInfo) -> bool:
+        raise NotImplementedError
+
+
+class DurationPolicy(MetadataPolicy):
+    """Files lasting between ``min`` and ``max`` seconds (inclusive, open when None)."""
+
+    def __init__(
+        self,
+        min: float | None = None,
+        max: float | None = None,
+        index: MetadataIndex | None = None,
+    ):
+        super().__init__(index)
+        self.min = min
+        self.max = max
+
+    def accepts(self, info: AudioInfo) -> bool:
+        if self.min is not None and info.duration < self.min:
+            return False
+        return self.max is None or info.duration <= self.max
+
+
+class SampleRatePolicy(MetadataPolicy):
+    """Files at one of ``rates`` (Hz)."""
+
+    def __init__(self, *rates: int, index: MetadataIndex | None = None):
+        super().__init__(index)
+        self.rates = set(rates)
+
+    def accepts(self, info: AudioInfo) -> bool:
+        return info.frame_rate in self.rates
+
+
+class ChannelsPolicy(MetadataPolicy):
+    """Files with one of ``channels`` channel counts."""
+
+    def __init__(self, *channels: int, index: MetadataIndex | None = None):
+        super().__init__(index)
+        self.channels = set(channels)
+
+    def accepts(self, info: AudioInfo) -> bool:
+        return info.channels in self.channels
+
+
+class BitDepthPolicy(MetadataPolicy):
+    """Files with one of ``depths`` bits per sample (None matches lossy files)."""
+
+    def __init__(self, *depths: int | None, index: MetadataIndex | None = None):
+        super().__init__(index)
+        self.depths = set(depths)
+
+    def accepts(self, info: AudioInfo) -> bool:
+        return info.bit_depth in self.depths
+
+
+class ClippedPolicy(MetadataPolicy):
+    """
+    Files whose peak reaches ``ceiling`` dBFS, within one sample step
+    (``clipped=False``: files that stay below it).
+
+    The peak is not in any header: each file is decoded once to measure it
+    and the result is kept in the index, so later scans only probe files
+    that changed.
+    """
+
+    peak = True
+
+    def __init__(
+        self, clipped: bool = True, ceiling: float = 0.0, index: MetadataIndex | None = None
+    ):
+        super().__init__(index)
+        self.clipped = clipped
+        self.ceiling = ceiling
+
+    def accepts(self, info: AudioInfo) -> bool:
+        if info.peak_dbfs is None:
+            return False
+        # the positive side tops out one step below full scale
+        full = 2 ** ((info.bit_depth or 16) - 1)
+        threshold = self.ceiling + 20 * math.log10((full - 1) / full)
+        return (info.peak_dbfs >= threshold) == self.clipped
@@ -8,8 +8,17 @@ from aud.core.models import AudioFile
 class SelectionPolicy(ABC):
     """
     Determines whether an AudioFile should be included.
+
+    Policies that need data beyond the name set ``batched = True`` and load
+    it for many files at once in ``prepare``, before ``include`` is called.
     """
 
+    batched = False
+
+    def prepare(self, files: list[AudioFile]) -> None:
+        """Load what ``include`` needs for ``files`` in bulk (optional)."""
+        return None
+
     @abstractmethod
     def include(self, file: AudioFile) -> bool:
         raise NotImplementedError
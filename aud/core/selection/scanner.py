@@ -1,26 +1,179 @@
 from __future__ import annotations
 
+import os
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from aud.core.models import AudioFile
+from aud.core.selection.compiled import CompiledPolicy, compile_policy
 from aud.core.selection.policy import SelectionPolicy
 
+# (name, is_dir, path, identity) — identity is (st_dev, st_ino) for
+# directories reached through symlinks, used to break cycles
+_Entry = tuple[str, bool, str, "tuple[int, int] | None"]
+
+# a directory's entries and its subdirectories' pending listings
+_Listing = tuple[list[_Entry], "dict[str, Callable[[], _Listing]]"]
+_Submit = Callable[[str, int], Callable[[], _Listing]]
+
+# files probed together when the policy needs metadata
+_BATCH = 256
+
 
 class DirectoryScanner:
-    def __init__(self, directory: Path, policy: SelectionPolicy):
+    """
+    Lists the files of ``directory`` accepted by ``policy``.
+
+    Entries are read with ``os.scandir`` so the file / directory type comes
+    from the directory listing instead of an extra ``stat`` per entry.
+
+    With ``recursive=True`` subdirectories are walked as well, down to
+    ``max_depth`` levels below ``directory`` (unlimited when None). Their
+    listings are read concurrently by ``workers`` threads, which matters
+    most on network storage. Symlinks to files are always listed;
+    symlinked directories are only entered with ``follow_symlinks=True``
+    (each real directory at most once).
+
+    Files come out in the same order as ``sorted()`` over their paths.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        policy: SelectionPolicy,
+        recursive: bool = False,
+        max_depth: int | None = None,
+        follow_symlinks: bool = False,
+        workers: int = 8,
+    ):
         self.directory = Path(directory)
         self.policy = policy
+        self.recursive = recursive
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+        self.workers = workers
 
     def scan(self) -> list[AudioFile]:
-        files: list[AudioFile] = []
+        return list(self.iter_scan())
+
+    def iter_scan(self) -> Iterator[AudioFile]:
+        """Yield accepted files as the listing proceeds (see ``scan``)."""
+        # names are matched as strings; AudioFile objects are only built
+        # for accepted entries
+        policy = compile_policy(self.policy)
+        if not policy.batched:
+            match = policy.match
+            for path in self.paths():
+                if match(path):
+                    yield AudioFile(Path(path))
+            return
+
+        # Metadata policies: files that pass the name rules are collected in
+        # batches whose headers are probed in parallel before matching
+        batch: list[AudioFile] = []
+        for path in self.paths():
+            if policy.prefilter(path):
+                batch.append(AudioFile(Path(path)))
+            if len(batch) >= _BATCH:
+                yield from self._settle(policy, batch)
+                batch = []
+        yield from self._settle(policy, batch)
+
+    @staticmethod
+    def _settle(policy: CompiledPolicy, batch: list[AudioFile]) -> Iterator[AudioFile]:
+        if batch:
+            policy.prepare(batch)
+            yield from filter(policy.include, batch)
+
+    def paths(self) -> Iterator[str]:
+        """Yield the path of every file below ``directory``, in sorted order."""
+        root = str(self.directory)
+        visited: set[tuple[int, int]] = set()
+        lock = threading.Lock()
+        if self.follow_symlinks:
+            stat = os.stat(root)
+            visited.add((stat.st_dev, stat.st_ino))
+
+        def first_visit(identity: tuple[int, int] | None) -> bool:
+            if identity is None:
+                return True
+            with lock:
+                if identity in visited:
+                    return False
+                visited.add(identity)
+                return True
+
+        def listing(directory: str, depth: int, submit: _Submit) -> _Listing:
+            entries = self._entries(directory)
+            children: dict[str, Callable[[], _Listing]] = {}
+            if self._descend(depth):
+                for _, is_dir, path, identity in entries:
+                    if is_dir and first_visit(identity):
+                        children[path] = submit(path, depth + 1)
+            return entries, children
+
+        if not self.recursive or self.workers <= 1:
+            # Read each directory lazily, when the walk reaches it
+            def lazy(path: str, depth: int) -> Callable[[], _Listing]:
+                return lambda: listing(path, depth, lazy)
+
+            yield from self._consume(lazy(root, 0))
+            return
+
+        # Every listing starts reading its subdirectories as soon as it is
+        # known, so the whole tree is read concurrently while the caller
+        # consumes it in order.
+        stop = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+
+        def prefetch(path: str, depth: int) -> Callable[[], _Listing]:
+            return pool.submit(
+                lambda: ([], {}) if stop.is_set() else listing(path, depth, prefetch)
+            ).result
+
+        try:
+            yield from self._consume(prefetch(root, 0))
+        finally:
+            stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _consume(self, result: Callable[[], _Listing]) -> Iterator[str]:
+        entries, children = result()
+        for _, is_dir, path, _ in entries:
+            if not is_dir:
+                yield path
+            elif path in children:
+                yield from self._consume(children[path])
 
-        for path in sorted(self.directory.iterdir()):
-            if not path.is_file():
-                continue
+    def _descend(self, depth: int) -> bool:
+        if not self.recursive:
+            return False
+        return self.max_depth is None or depth < self.max_depth
 
-            audio = AudioFile(path)
+    def _entries(self, directory: str) -> list[_Entry]:
+        entries: list[_Entry] = []
+        try:
+            iterator = os.scandir(directory)
+        except (PermissionError, FileNotFoundError):
+            if directory == str(self.directory):
+                raise
+            return entries
 
-            if self.policy.include(audio):
-                files.append(audio)
+        with iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_dir(follow_symlinks=self.follow_symlinks):
+                        identity = None
+                        if self.follow_symlinks:
+                            stat = entry.stat()
+                            identity = (stat.st_dev, stat.st_ino)
+                        entries.append((entry.name, True, entry.path, identity))
+                    elif entry.is_file():
+                        entries.append((entry.name, False, entry.path, None))
+                except OSError:
+                    continue
 
-        return files
+        entries.sort()
+        return entries
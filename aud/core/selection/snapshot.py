@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from aud.core.models import AudioFile
+
+# (inode, size, mtime_ns)
+Identity = tuple[int, int, int]
+
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+
+
+@dataclass(frozen=True, slots=True)
+class Change:
+    """A selected file that appeared, disappeared or changed on disk."""
+
+    kind: str
+    file: AudioFile
+
+
+def identity(path: str | Path) -> Identity | None:
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class Snapshot:
+    """
+    The (inode, size, mtime_ns) of every selected file at some point in time.
+
+    ``diff`` compares a fresh listing against the snapshot, ``check`` only
+    looks at specific paths (e.g. reported by a file system watcher); both
+    return the changes and move the snapshot forward.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, Identity] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, file: AudioFile) -> bool:
+        return str(file.path) in self._entries
+
+    def files(self) -> list[AudioFile]:
+        return [AudioFile(Path(path)) for path in sorted(self._entries, key=Path)]
+
+    def diff(self, files: Iterable[AudioFile]) -> list[Change]:
+        """Replace the snapshot with ``files``; return what changed."""
+        changes: list[Change] = []
+        previous, self._entries = self._entries, {}
+
+        for file in files:
+            key = str(file.path)
+            current = identity(key)
+            if current is None:
+                continue
+            self._entries[key] = current
+            known = previous.pop(key, None)
+            if known is None:
+                changes.append(Change(ADDED, file))
+            elif known != current:
+                changes.append(Change(MODIFIED, file))
+
+        changes.extend(Change(REMOVED, AudioFile(Path(key))) for key in sorted(previous))
+        return changes
+
+    def check(
+        self, paths: Iterable[str | Path], include: Callable[[AudioFile], bool]
+    ) -> list[Change]:
+        """Update the entries for ``paths`` only; return what changed."""
+        changes: list[Change] = []
+
+        for path in sorted({str(p) for p in paths}):
+            file = AudioFile(Path(path))
+            current = identity(path) if include(file) else None
+            known = self._entries.get(path)
+
+            if current is None:
+                if known is not None:
+                    del self._entries[path]
+                    changes.append(Change(REMOVED, file))
+            elif os.path.isfile(path):
+                self._entries[path] = current
+                if known is None:
+                    changes.append(Change(ADDED, file))
+                elif known != current:
+                    changes.append(Change(MODIFIED, file))
+
+        return changes
+
+    def refresh(self, files: Iterable[AudioFile], include: Callable[[AudioFile], bool]) -> None:
+        """Record the current state of ``files`` without reporting changes."""
+        self.check((file.path for file in files), include)
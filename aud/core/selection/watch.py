@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+# inotify(7) constants
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_ONLYDIR = 0x01000000
+
+# Files are reported once they are closed after writing, not on every write
+_MASK = (
+    _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_EVENT = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """
+    Portable watcher: reports nothing specific, so the caller rescans
+    the directory every ``interval`` seconds.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+
+    def wait(self, timeout: float | None = None) -> set[str] | None:
+        """Block for the next check; None means "rescan everything"."""
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux watcher built on inotify(7), loaded through ctypes.
+
+    ``wait`` returns the paths that were written, moved or deleted since
+    the last call, so only those need to be checked. Directory level
+    events (a subdirectory created, moved or removed, or a queue overflow)
+    return None, asking the caller for a full rescan.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        recursive: bool = False,
+        max_depth: int | None = None,
+        follow_symlinks: bool = False,
+    ):
+        self.directory = Path(directory)
+        self.recursive = recursive
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: dict[int, str] = {}
+        # (st_dev, st_ino) of watched directories, so symlink cycles end
+        self._seen: set[tuple[int, int]] = set()
+        try:
+            self._add_tree(str(self.directory), 0)
+        except OSError:
+            self.close()
+            raise
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith("linux")
+
+    def _add(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch failed: {os.strerror(errno)}", directory)
+        self._watches[wd] = directory
+
+    def _add_tree(self, directory: str, depth: int) -> None:
+        stat = os.stat(directory)
+        if (stat.st_dev, stat.st_ino) in self._seen:
+            return
+        self._seen.add((stat.st_dev, stat.st_ino))
+        self._add(directory)
+        if not self.recursive or (self.max_depth is not None and depth >= self.max_depth):
+            return
+        try:
+            entries = list(os.scandir(directory))
+        except (PermissionError, FileNotFoundError):
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=self.follow_symlinks):
+                    self._add_tree(entry.path, depth + 1)
+            except (FileNotFoundError, PermissionError):
+                continue
+
+    def _rewatch(self) -> None:
+        # The tree changed shape; watch it again from scratch
+        for wd in list(self._watches):
+            self._libc.inotify_rm_watch(self._fd, wd)
+        self._watches.clear()
+        self._seen.clear()
+        self._add_tree(str(self.directory), 0)
+
+    def wait(self, timeout: float | None = None) -> set[str] | None:
+        """Block until something changes (or ``timeout``); return the changed paths."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        paths: set[str] = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+
+                if mask & (_IN_Q_OVERFLOW | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                    rescan = True
+                elif mask & _IN_ISDIR:
+                    rescan = rescan or bool(mask & (_IN_CREATE | _IN_MOVED_TO | _IN_MOVED_FROM))
+                elif wd in self._watches and not mask & _IN_CREATE:
+                    # new files are picked up when they are closed after writing
+                    paths.add(os.path.join(self._watches[wd], name))
+
+        if rescan:
+            self._rewatch()
+            return None
+        return paths
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def watcher(
+    directory: Path,
+    recursive: bool = False,
+    max_depth: int | None = None,
+    follow_symlinks: bool = False,
+    interval: float = 1.0,
+    poll: bool | None = None,
+) -> InotifyWatcher | PollingWatcher:
+    """
+    Return an ``InotifyWatcher`` where available, otherwise (or with
+    ``poll=True``, or when inotify runs out of watches) a ``PollingWatcher``.
+    """
+    if not poll and InotifyWatcher.available():
+        try:
+            return InotifyWatcher(directory, recursive, max_depth, follow_symlinks)
+        except (OSError, AttributeError):
+            if poll is False:
+                raise
+    return PollingWatcher(interval)
@@ -26,3 +26,28 @@ class ConvertError(BaseError):
 
 class ExportError(BaseError):
     pass
+
+
+class PipelineError(BaseError):
+    pass
+
+
+class MetadataError(BaseError):
+    pass
+
+
+class BatchError(Exception):
+    """
+    Raised after a batch finished with one or more per-file failures.
+
+    ``failures`` holds ``(item, exception)`` pairs in input order and
+    ``results`` the outputs of every item, with None for failed items.
+    """
+
+    def __init__(self, failures, results):
+        self.failures = failures
+        self.results = results
+
+    def __str__(self):
+        details = "; ".join(f"{getattr(item, 'name', item)}: {exc}" for item, exc in self.failures)
+        return f"{len(self.failures)} of {len(self.results)} files failed: {details}"
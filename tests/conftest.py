@@ -1,7 +1,12 @@
 import shutil
+from collections.abc import Callable
 from pathlib import Path
 
 import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+import aud.core.pcm
 
 
 @pytest.fixture
@@ -27,3 +32,50 @@ def populated_dir(tmp_path: Path, mock_assets: Path) -> Path:
     shutil.copy(mock_assets / "song.wav", tmp_path / "song.wav")
 
     return tmp_path
+
+
+@pytest.fixture
+def decodes(monkeypatch) -> list:
+    """Paths decoded from then on, in-process (WAV / AIFF) or through pydub."""
+    calls = []
+    from_file = AudioSegment.from_file
+    read_pcm = aud.core.pcm.read_pcm
+
+    def counting(*args, **kwargs):
+        calls.append(args[0])
+        return from_file(*args, **kwargs)
+
+    def counting_pcm(path):
+        audio = read_pcm(path)
+        if audio is not None:
+            calls.append(path)
+        return audio
+
+    monkeypatch.setattr(AudioSegment, "from_file", counting)
+    monkeypatch.setattr(aud.core.pcm, "read_pcm", counting_pcm)
+    return calls
+
+
+@pytest.fixture
+def tone() -> Callable[..., AudioSegment]:
+    """
+    Builds a sine test tone: ``tone(ms, rate, channels, width, volume, frequency)``.
+
+    ``volume`` is the peak in dBFS; above 0 the tone saturates (clips) as
+    ``apply_gain`` does. Every channel carries the same signal.
+    """
+
+    def build(
+        ms: int = 500,
+        rate: int = 44100,
+        channels: int = 2,
+        width: int = 2,
+        volume: float = -6,
+        frequency: float = 440,
+    ) -> AudioSegment:
+        audio = Sine(frequency, sample_rate=rate).to_audio_segment(ms, volume=min(volume, 0))
+        if volume > 0:
+            audio = audio.apply_gain(volume)
+        return audio.set_channels(channels).set_sample_width(width)
+
+    return build
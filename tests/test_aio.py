@@ -0,0 +1,148 @@
+"""Tests for AsyncDir."""
+
+import asyncio
+import shutil
+import subprocess
+import threading
+import time
+
+import pytest
+from pydub.generators import Sine
+
+from aud import AsyncDir
+from aud.core.adapters.pipeline import PipelineAdapter
+from aud.core.operations.audio.effects import Gain
+from aud.core.plan import Plan
+from aud.exceptions import BatchError, PipelineError
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+
+
+@pytest.fixture
+def library(tmp_path):
+    tone = Sine(440, sample_rate=44100).to_audio_segment(200, volume=-6)
+    for n in range(6):
+        tone.export(tmp_path / f"{n}.wav", format="wav")
+    return tmp_path
+
+
+@pytest.fixture
+def slow_runs(monkeypatch):
+    # PipelineAdapter.run, taking a while and recording how many run at once
+    state = {"running": 0, "most": 0}
+    lock = threading.Lock()
+    run = PipelineAdapter.run
+
+    def slow(self, route):
+        with lock:
+            state["running"] += 1
+            state["most"] = max(state["most"], state["running"])
+        time.sleep(0.05)
+        try:
+            return run(self, route)
+        finally:
+            with lock:
+                state["running"] -= 1
+
+    monkeypatch.setattr(PipelineAdapter, "run", slow)
+    return state
+
+
+def test_events_stream_with_bounded_concurrency(library, slow_runs):
+    d = AsyncDir(library, extensions=["wav"], concurrency=2)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        clock = asyncio.create_task(ticker())
+        events = [event async for event in d.events(Plan(d.iter_files(), [Gain(-3)]))]
+        clock.cancel()
+        return events, ticks
+
+    events, ticks = asyncio.run(main())
+
+    assert sorted(e.source.name for e in events) == [f"{n}.wav" for n in range(6)]
+    assert all(e.ok and e.output == e.source and e.elapsed > 0 for e in events)
+    assert slow_runs["most"] == 2
+    assert ticks > 5  # the loop kept running while files were processed
+
+
+@needs_ffmpeg
+def test_ffmpeg_runs_as_asyncio_subprocess(library, monkeypatch):
+    def blocking(*args, **kwargs):
+        raise AssertionError("blocking subprocess")
+
+    started = []
+    create = asyncio.create_subprocess_exec
+
+    async def spawned(*command, **kwargs):
+        started.append(command)
+        return await create(*command, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", blocking)
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", spawned)
+    d = AsyncDir(library, extensions=["wav"], concurrency=3)
+
+    async def main():
+        async with d.apipeline():
+            d.name_prepend("new_")
+            d.convert_format("flac", sample_rate=48000)
+
+    asyncio.run(main())
+
+    assert len(started) == 6
+    assert sorted(d.get_all()) == [f"new_{n}.flac" for n in range(6)]
+    # the renamed sources are kept, as by Dir.pipeline
+    assert sorted(p.name for p in library.glob("*.wav")) == [f"new_{n}.wav" for n in range(6)]
+
+
+def test_failures_are_events_then_raised(library):
+    (library / "3.wav").write_bytes(b"RIFF broken")
+    d = AsyncDir(library, extensions=["wav"])
+    plan = Plan(list(d), [Gain(-3)])
+
+    async def collect():
+        return [event async for event in d.events(plan)]
+
+    failed = [e for e in asyncio.run(collect()) if not e.ok]
+    assert [e.source.name for e in failed] == ["3.wav"]
+    assert failed[0].output is None
+
+    with pytest.raises(PipelineError) as info:
+        asyncio.run(d.arun(Plan(list(d), [Gain(-3)])))
+    assert isinstance(info.value.exc, BatchError)
+    assert [f.name for f, _ in info.value.exc.failures] == ["3.wav"]
+
+
+def test_manifest_is_refused(library):
+    with pytest.raises(ValueError):
+        AsyncDir(library, manifest=True)
+
+
+@needs_ffmpeg
+def test_metrics_are_recorded(library):
+    (library / "3.wav").write_bytes(b"RIFF broken")
+    d = AsyncDir(library, extensions=["wav"], metrics=True)
+
+    with pytest.raises(PipelineError):
+        asyncio.run(d.arun(Plan(list(d), [Gain(-3)])))
+    totals = d.metrics.summary()["pipeline"]
+    assert (totals["files"], totals["failures"]) == (5, 1)
+    assert totals["decode"] > 0 and totals["encode"] > 0
+
+    (library / "3.wav").unlink()
+    d.update()
+
+    async def main():
+        async with d.apipeline():
+            d.convert_format("flac")
+
+    asyncio.run(main())
+    records = list(d.metrics.records)[-5:]
+    assert all(r.ffmpeg > 0 and r.bytes_written > 0 for r in records)
@@ -0,0 +1,111 @@
+"""Tests for the benchmark suite."""
+
+import json
+
+import pytest
+
+from aud.bench import (
+    CASES,
+    Case,
+    CorpusSpec,
+    compare,
+    expand,
+    generate_corpus,
+    run_suite,
+    runner,
+    select,
+)
+from aud.core.headers import header_info
+
+
+def test_corpora_are_deterministic(tmp_path):
+    spec = CorpusSpec(3, 0.75, rate=22050, channels=1, bit_depth=32, seed=7)
+    first = generate_corpus(spec, tmp_path / "a")
+    second = generate_corpus(spec, tmp_path / "b")
+
+    files = sorted(first.glob("*.wav"))
+    assert [f.name for f in files] == ["take_00000.wav", "take_00001.wav", "take_00002.wav"]
+    for file in files:
+        assert file.read_bytes() == (second / file.name).read_bytes()
+        info = header_info(file)
+        assert info.duration == pytest.approx(0.75, abs=1e-4)
+        assert (info.frame_rate, info.channels, info.bit_depth) == (22050, 1, 32)
+    # files differ from each other, and from another seed
+    assert files[0].read_bytes() != files[1].read_bytes()
+    other = generate_corpus(CorpusSpec(1, 0.75, 22050, 1, bit_depth=32, seed=8), tmp_path / "a")
+    assert (other / files[0].name).read_bytes() != files[0].read_bytes()
+
+    with pytest.raises(ValueError):
+        CorpusSpec(1, 1.0, bit_depth=24)
+
+    # complete corpora are reused as they are
+    mtime = files[0].stat().st_mtime_ns
+    assert generate_corpus(spec, tmp_path / "a") == first
+    assert files[0].stat().st_mtime_ns == mtime
+
+
+def test_scaling_axes():
+    specs = expand([1, 10], [1.0, 5.0], channels=[1, 2])
+    assert len(specs) == 8
+    assert len({spec.name for spec in specs}) == 8
+
+
+def test_run_suite(tmp_path):
+    cases = select(["names/upper", "effects/gain", "select/duration", "scan/scanner"])
+    assert len(cases) == 6  # gain_memory_map and scanner_recursive too
+    spec = CorpusSpec(2, 0.5)
+    seen = []
+    results = run_suite([spec], tmp_path, cases, repeat=2, progress=seen.append)
+
+    assert results["results"] == seen
+    assert [r["case"] for r in seen] == [case.name for case in cases]
+    for r in seen:
+        assert r["corpus"] == spec.name and r["files"] == 2
+        assert len(r["times"]) == 2 and 0 < r["min"] <= r["median"]
+    # every repetition works on a copy
+    corpus = tmp_path / "corpora" / spec.name
+    assert sorted(p.name for p in corpus.glob("*.wav")) == ["take_00000.wav", "take_00001.wav"]
+    json.dumps(results)
+
+
+def test_every_dir_operation_is_covered():
+    names = {case.name for case in CASES}
+    assert len(names) == len(CASES)
+    for group in ("names", "files", "effects", "convert", "metadata", "pipeline", "scan", "select"):
+        assert any(name.startswith(group + "/") for name in names)
+
+
+def test_missing_requirements_and_failures(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, "ffmpeg", lambda: None)
+
+    def broken(context):
+        return lambda: 1 / 0
+
+    cases = [*select(["convert/mp3"]), Case("broken", broken)]
+    results = run_suite([CorpusSpec(1, 0.2)], tmp_path, cases, repeat=1)["results"]
+    assert results[0]["skipped"] == "needs ffmpeg"
+    assert results[1]["error"] == "ZeroDivisionError: division by zero"
+
+
+def test_compare():
+    def document(*medians):
+        return {
+            "schema": runner.SCHEMA,
+            "results": [
+                {"case": f"case{n}", "corpus": "c", "median": median}
+                for n, median in enumerate(medians)
+            ],
+        }
+
+    baseline = document(1.0, 1.0, 0.001, 1.0)
+    current = document(1.05, 1.5, 0.002, 0.5)
+    current["results"].append({"case": "new", "corpus": "c", "median": 1.0})
+
+    comparisons = compare(current, baseline, threshold=0.1)
+    assert [c.case for c in comparisons] == ["case0", "case1", "case2", "case3"]
+    # within the threshold, slower, below the absolute floor, faster
+    assert [c.regressed for c in comparisons] == [False, True, False, False]
+    assert comparisons[1].ratio == pytest.approx(1.5)
+
+    with pytest.raises(ValueError):
+        compare(current, {"schema": 0, "results": []})
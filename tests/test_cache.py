@@ -0,0 +1,140 @@
+"""Tests for the decoded-audio cache."""
+
+import os
+import pickle
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from aud.aud import Dir
+from aud.core.adapters.audio import AudioAdapter
+from aud.core.cache import ASSETS, AudioCache
+from aud.core.models import AudioFile
+from aud.core.operations.audio.effects import AppendAudio, Gain, PrependAudio
+
+
+def test_hits_misses_and_identity(tmp_path, tone):
+    path = tmp_path / "a.wav"
+    tone().export(path, format="wav")
+    cache = AudioCache()
+
+    first = cache.load(path, "wav")
+    assert cache.load(path, "wav") is first
+
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.bytes == len(first.raw_data)
+
+
+def test_changed_file_is_a_miss(tmp_path, tone):
+    path = tmp_path / "a.wav"
+    tone().export(path, format="wav")
+    cache = AudioCache()
+    cache.load(path, "wav")
+
+    tone(800).export(path, format="wav")
+    os.utime(path, ns=(0, 0))
+    assert len(cache.load(path, "wav")) == 800
+    assert cache.stats.misses == 2
+    assert len(cache) == 1
+
+
+def test_byte_budget_evicts_least_recently_used(tmp_path, tone):
+    paths = [tmp_path / f"{i}.wav" for i in range(3)]
+    for path in paths:
+        tone().export(path, format="wav")
+    size = len(AudioCache().load(paths[0], "wav").raw_data)
+    cache = AudioCache(max_bytes=2 * size)
+
+    cache.load(paths[0], "wav")
+    cache.load(paths[1], "wav")
+    cache.load(paths[0], "wav")
+    cache.load(paths[2], "wav")
+
+    assert cache.stats.evictions == 1
+    cache.load(paths[0], "wav")
+    assert cache.stats.hits == 2
+
+    assert AudioCache(max_bytes=size - 1).load(paths[0], "wav") is not None
+    assert len(AudioCache(max_bytes=size - 1)) == 0
+
+
+def test_adapter_stores_written_files(tmp_path, tone):
+    file = AudioFile(tmp_path / "a.wav")
+    tone().export(file.path, format="wav")
+    cache = AudioCache()
+    adapter = AudioAdapter(cache=cache)
+
+    adapter.execute(Gain(-3), [file])
+    assert cache.stats.invalidations == 1
+    assert cache.load(file.path, "wav").raw_data == AudioSegment.from_file(file.path).raw_data
+    assert (cache.stats.misses, cache.stats.hits) == (1, 1)
+
+    # a pickled adapter (worker process) carries no cached audio
+    assert pickle.loads(pickle.dumps(adapter)).cache is None
+    assert pickle.loads(pickle.dumps(cache)).stats.entries == 0
+
+
+def test_dir_album_normalize_decodes_once(tmp_path, tone):
+    for name in ("a.wav", "b.wav"):
+        tone().export(tmp_path / name, format="wav")
+
+    d = Dir(tmp_path, extensions=["wav"], cache_bytes=64 * 1024 * 1024)
+    d.afx_normalize(mode="rms", album=True)
+
+    stats = d.cache.stats
+    assert (stats.misses, stats.hits) == (2, 2)
+    assert stats.entries == 2
+
+
+def test_dir_chained_effects_decode_once(tmp_path, tone):
+    for name in ("a.wav", "b.wav"):
+        tone().export(tmp_path / name, format="wav")
+
+    d = Dir(tmp_path, extensions=["wav"], cache_bytes=64 * 1024 * 1024)
+    d.afx_gain(-3)
+    d.afx_fade(0.1, 0.1)
+    d.afx_invert_phase()
+
+    stats = d.cache.stats
+    assert (stats.misses, stats.hits) == (2, 4)
+    for file in d:
+        assert d.cache.load(file.path, "wav").raw_data == (
+            AudioSegment.from_file(file.path).raw_data
+        )
+
+
+def test_conformed_variants_are_cached(tmp_path):
+    path = tmp_path / "mark.wav"
+    Sine(880, sample_rate=22050).to_audio_segment(300).export(path, format="wav")
+    cache = AudioCache()
+
+    variant = cache.conformed(path, "wav", frame_rate=44100, channels=2)
+    assert (variant.frame_rate, variant.channels) == (44100, 2)
+    assert cache.conformed(path, "wav", frame_rate=44100, channels=2) is variant
+    assert cache.conformed(path, "wav") is cache.load(path, "wav")
+    assert (cache.stats.misses, cache.stats.entries) == (2, 2)
+
+    cache.invalidate(path)
+    assert len(cache) == 0
+
+
+def test_prepend_and_append_reuse_one_conformed_asset(tmp_path):
+    intro = tmp_path / "intro.wav"
+    Sine(880, sample_rate=22050).to_audio_segment(300).export(intro, format="wav")
+    audio = Sine(440).to_audio_segment(1000).set_channels(2)
+
+    ASSETS.invalidate(intro)
+    misses = ASSETS.stats.misses
+    adapter = AudioAdapter()
+
+    expected = AudioSegment.from_file(intro) + audio
+    for _ in range(3):
+        assert adapter.apply(PrependAudio(intro), audio).raw_data == expected.raw_data
+    assert (
+        AudioAdapter().apply(AppendAudio(intro), audio).raw_data
+        == (audio + AudioSegment.from_file(intro)).raw_data
+    )
+
+    # one decode plus one conversion to the shared 44.1 kHz stereo format
+    assert ASSETS.stats.misses - misses == 2
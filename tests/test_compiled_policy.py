@@ -0,0 +1,99 @@
+"""Tests for flattening selection policy trees into one predicate."""
+
+import itertools
+from pathlib import Path
+
+import pytest
+
+from aud.aud import Dir
+from aud.core.models import AudioFile
+from aud.core.selection.compiled import CompiledPolicy, compile_policy
+from aud.core.selection.composite import AnyPolicy, CompositePolicy
+from aud.core.selection.extensions import ExtensionPolicy
+from aud.core.selection.listing import AllowlistPolicy, DenylistPolicy
+from aud.core.selection.policy import SelectionPolicy
+
+NAMES = [
+    "a.wav",
+    "A.WAV",
+    ".wav",
+    "a.",
+    "a..wav",
+    "..wav",
+    "take.tar.mp3",
+    "noext",
+    "keep.txt",
+    "skip.wav",
+    "tmp_1.wav",
+    "tmp_x.flac",
+    "demo_9.mp3",
+    "deep/dir/a.flac",
+    "deep/dir/skip.wav",
+]
+
+
+class LongName(SelectionPolicy):
+    def include(self, file: AudioFile) -> bool:
+        return len(file.name) > 6
+
+
+POLICIES = [
+    ExtensionPolicy(["wav", ".MP3"]),
+    AnyPolicy(),
+    CompositePolicy(ExtensionPolicy(["wav", "flac"]), DenylistPolicy(["skip.wav"], r"tmp_\d")),
+    AnyPolicy(
+        AllowlistPolicy(["keep.txt"], regex=r"demo_"),
+        CompositePolicy(ExtensionPolicy(["wav"]), DenylistPolicy(["skip.wav"])),
+    ),
+    CompositePolicy(AnyPolicy(), DenylistPolicy(["skip.wav"])),
+    CompositePolicy(
+        ExtensionPolicy(["wav", "flac"]),
+        AnyPolicy(AllowlistPolicy(regex=r"(t)mp_"), AllowlistPolicy(regex=r"(?i)A\.")),
+        DenylistPolicy(regex=r"x"),
+    ),
+    CompositePolicy(ExtensionPolicy(["wav", "flac", "mp3"]), LongName()),
+    AnyPolicy(DenylistPolicy(regex="tmp"), ExtensionPolicy(["txt"])),
+]
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_compiled_policy_matches_tree(policy):
+    compiled = compile_policy(policy)
+    expected = [policy.include(AudioFile(Path(name))) for name in NAMES]
+
+    assert [compiled.include(AudioFile(Path(name))) for name in NAMES] == expected
+    assert [compiled.match(name) for name in NAMES] == expected
+    assert compiled.include_many(NAMES) == expected
+
+
+def test_compile_policy_is_idempotent():
+    compiled = compile_policy(ExtensionPolicy(["wav"]))
+    assert compile_policy(compiled) is compiled
+
+    nested = CompiledPolicy(AnyPolicy(compiled, AllowlistPolicy(["keep.txt"])))
+    assert nested.include_many(["a.wav", "keep.txt", "b.mp3"]) == [True, True, False]
+
+
+def test_regexes_are_combined_unless_groups_clash():
+    patterns = [r"^a", r"(?P<x>b)", r"(?P<x>c)", r"(d)\1"]
+    policy = AnyPolicy(*(AllowlistPolicy(regex=p) for p in patterns))
+    names = ["a.wav", "b.wav", "c.wav", "dd.wav", "d.wav", "e.wav"]
+
+    expected = [policy.include(AudioFile(Path(n))) for n in names]
+    assert compile_policy(policy).include_many(names) == expected
+    assert expected == [True, True, True, True, False, False]
+
+
+def test_dir_selection_uses_compiled_policy(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"], allowlist=["test.txt"])
+    assert isinstance(d._build_policy(), CompiledPolicy)
+    assert d.get_all() == ["bloop.wav", "song.wav", "test.txt"]
+
+
+def test_random_names_match_tree():
+    policy = POLICIES[3]
+    compiled = compile_policy(policy)
+    parts = ["a", "demo_", "keep", "skip", ".", "wav", "txt", "WAV"]
+    names = ["".join(p) for p in itertools.product(parts, repeat=3)]
+
+    assert compiled.include_many(names) == [policy.include(AudioFile(Path(n))) for n in names]
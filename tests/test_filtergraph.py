@@ -0,0 +1,101 @@
+"""Tests for running pipelines as ffmpeg filter chains (native mode)."""
+
+import shutil
+
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from aud.aud import Dir
+from aud.core.adapters.convert import ConversionAdapter
+from aud.core.filtergraph import Stream, audio_filters
+from aud.core.models import AudioFile
+from aud.core.operations.audio.convert import ConvertToMono
+from aud.core.operations.audio.effects import Fade, InvertPhase, LowPassFilter, Pad
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+
+
+@pytest.fixture
+def library(tmp_path):
+    left = Sine(440, sample_rate=44100).to_audio_segment(1000, volume=-6)
+    right = Sine(660, sample_rate=44100).to_audio_segment(1000, volume=-10)
+    audio = AudioSegment.from_mono_audiosegments(left, right)
+    for name in ("python", "native"):
+        (tmp_path / name).mkdir()
+        audio.export(tmp_path / name / "a.wav", format="wav")
+    return tmp_path
+
+
+def _process(directory, native, build):
+    d = Dir(directory, extensions=["wav"], native=native)
+    with d.pipeline():
+        build(d)
+    return AudioSegment.from_file(directory / "a.wav")
+
+
+def _max_difference(a: AudioSegment, b: AudioSegment) -> int:
+    return max(
+        abs(x - y) for x, y in zip(a.get_array_of_samples(), b.get_array_of_samples(), strict=True)
+    )
+
+
+def test_native_pipeline_matches_python(library, decodes):
+    def build(d):
+        d.afx_gain(-3)
+        d.afx_fade(0.2, 0.3)
+        d.afx_low_pass(3000)
+        d.afx_high_pass(100)
+        d.afx_invert_phase("right")
+        d.convert_mono()
+
+    native = _process(library / "native", True, build)
+    assert decodes == [library / "native" / "a.wav"]  # only the read-back above
+
+    python = _process(library / "python", False, build)
+    assert (native.channels, native.frame_rate, len(native)) == (1, 44100, 1000)
+    assert len(python) == len(native)
+    # pydub fades in 1 ms steps; everything else is equal up to rounding
+    assert _max_difference(native, python) < 100
+
+
+def test_unsupported_operations_fall_back_to_python(library, decodes):
+    d = Dir(library / "native", extensions=["wav"], native=True)
+    with d.pipeline():
+        d.afx_gain(-3)
+        d.afx_strip_silence(silence_length=500, silence_threshold=-50, padding=100)
+
+    assert decodes  # StripSilence has no exact filter equivalent
+    assert len(AudioSegment.from_file(library / "native" / "a.wav")) == 1000
+
+
+def test_filters_depend_on_what_is_known():
+    unknown = Stream()
+    reversed_fade = ["areverse", "afade=t=in:d=0.500", "areverse"]
+    assert audio_filters(Fade(fade_out=0.5), unknown) == reversed_fade
+    assert audio_filters(InvertPhase("left"), unknown) is None
+    assert audio_filters(LowPassFilter(1000), unknown) is None
+    assert audio_filters(ConvertToMono(), unknown) is None
+
+    stream = Stream(channels=2, sample_rate=48000, duration=2.0)
+    pad = audio_filters(Pad(0.5, 0.25), stream)
+    assert pad == ["adelay=delays=500:all=1", "apad=pad_dur=0.250"]
+    assert audio_filters(Fade(fade_out=0.5), stream) == ["afade=t=out:st=2.250000:d=0.500"]
+    assert audio_filters(ConvertToMono(), stream) == ["pan=mono|c0=0.5*c0+0.5*c1"]
+    assert stream.channels == 1
+
+
+def test_lossy_sources_fade_out_in_reverse(library):
+    mp3 = library / "a.mp3"
+    AudioSegment.from_file(library / "native" / "a.wav").export(mp3, format="mp3")
+
+    convert = ConversionAdapter(native=True)
+    # the MP3 header only estimates the length, so the fade cannot start at a set time
+    mp3_settings = convert.lower([Fade(fade_out=0.5)], AudioFile(mp3), AudioFile(mp3))
+    assert mp3_settings is not None
+    assert mp3_settings["filters"] == ["areverse", "afade=t=in:d=0.500", "areverse"]
+
+    wav = AudioFile(library / "native" / "a.wav")
+    wav_settings = convert.lower([Fade(fade_out=0.5)], wav, wav)
+    assert wav_settings is not None
+    assert wav_settings["filters"] == ["afade=t=out:st=0.500000:d=0.500"]
@@ -0,0 +1,99 @@
+"""Tests for the in-process container header parsers."""
+
+import math
+import shutil
+import struct
+import subprocess
+import wave
+
+import pytest
+
+import aud.core.probe
+from aud.core.headers import header_info
+from aud.core.probe import probe
+
+ffmpeg = shutil.which("ffmpeg")
+
+
+def riff(form: bytes, chunks: list[tuple[bytes, bytes]], magic: bytes = b"RIFF") -> bytes:
+    body = b"".join(
+        cid + struct.pack("<I", len(data)) + data + b"\0" * (len(data) & 1) for cid, data in chunks
+    )
+    return magic + struct.pack("<I", 4 + len(body)) + form + body
+
+
+def extended(value: float) -> bytes:
+    exponent = math.frexp(value)[1] - 1
+    mantissa = int(value * 2 ** (63 - exponent))
+    return struct.pack(">HQ", exponent + 16383, mantissa)
+
+
+def test_wav_variants(tmp_path):
+    with wave.open(str(tmp_path / "pcm.wav"), "wb") as file:
+        file.setnchannels(2)
+        file.setsampwidth(2)
+        file.setframerate(44100)
+        file.writeframes(b"\0" * 4 * 22050)
+
+    # WAVE_FORMAT_EXTENSIBLE, 32-bit float, 6 channels, with a LIST chunk first
+    fmt = struct.pack("<HHIIHHHHI", 0xFFFE, 6, 48000, 48000 * 24, 24, 32, 22, 32, 0x3F)
+    fmt += struct.pack("<H14s", 3, b"\0" * 14)
+    (tmp_path / "float.wav").write_bytes(
+        riff(b"WAVE", [(b"LIST", b"INFOx"), (b"fmt ", fmt), (b"data", b"\0" * 24 * 4800)])
+    )
+
+    # RF64: the data size lives in the ds64 chunk
+    ds64 = struct.pack("<QQQI", 0, 96000 * 3, 48000, 0)
+    pcm = struct.pack("<HHIIHH", 1, 1, 48000, 48000 * 3, 3, 24)
+    data = b"data" + struct.pack("<I", 0xFFFFFFFF) + b"\0" * 96000 * 3
+    rf64 = riff(b"WAVE", [(b"ds64", ds64), (b"fmt ", pcm)], magic=b"RF64") + data
+    (tmp_path / "long.wav").write_bytes(rf64)
+
+    info = header_info(tmp_path / "pcm.wav")
+    assert (info.duration, info.frame_rate, info.channels, info.bit_depth) == (0.5, 44100, 2, 16)
+    info = header_info(tmp_path / "float.wav")
+    assert (info.duration, info.frame_rate, info.channels, info.bit_depth) == (0.1, 48000, 6, 32)
+    info = header_info(tmp_path / "long.wav")
+    assert (info.duration, info.channels, info.bit_depth) == (2.0, 1, 24)
+
+
+def test_aiff(tmp_path):
+    comm = struct.pack(">HIH", 2, 88200, 16) + extended(44100)
+    body = b"COMM" + struct.pack(">I", len(comm)) + comm
+    body += b"SSND" + struct.pack(">I", 8 + 88200 * 4) + b"\0" * (8 + 88200 * 4)
+    (tmp_path / "a.aiff").write_bytes(b"FORM" + struct.pack(">I", 4 + len(body)) + b"AIFF" + body)
+
+    info = header_info(tmp_path / "a.aiff")
+    assert (info.duration, info.frame_rate, info.channels, info.bit_depth) == (2.0, 44100, 2, 16)
+
+
+def test_unknown_contents(tmp_path):
+    (tmp_path / "notes.mp3").write_bytes(b"not audio at all" * 100)
+    (tmp_path / "empty.wav").write_bytes(b"")
+    assert header_info(tmp_path / "notes.mp3") is None
+    assert header_info(tmp_path / "empty.wav") is None
+    assert header_info(tmp_path / "missing.flac") is None
+
+
+@pytest.mark.skipif(ffmpeg is None, reason="needs ffmpeg to encode fixtures")
+@pytest.mark.parametrize(
+    "name, args, expected",
+    [
+        ("cbr.mp3", ["-ac", "2", "-b:a", "128k"], (44100, 2, None)),
+        ("vbr.mp3", ["-ac", "1", "-q:a", "4", "-ar", "22050"], (22050, 1, None)),
+        ("s24.flac", ["-ac", "2", "-sample_fmt", "s32", "-ar", "48000"], (48000, 2, 24)),
+        ("vorbis.ogg", ["-ac", "2", "-c:a", "libvorbis"], (44100, 2, None)),
+        ("voice.opus", ["-ac", "1", "-c:a", "libopus"], (48000, 1, None)),
+    ],
+)
+def test_encoded_formats_without_ffprobe(tmp_path, monkeypatch, name, args, expected):
+    path = tmp_path / name
+    source = ["-f", "lavfi", "-i", "sine=f=440:r=44100:d=2.5"]
+    command = [ffmpeg, "-v", "error", "-y", *source, *args, str(path)]
+    if subprocess.run(command, capture_output=True).returncode != 0:
+        pytest.skip(f"ffmpeg cannot encode {name}")
+
+    monkeypatch.setattr(aud.core.probe, "ffprobe_info", pytest.fail)
+    info = probe(path)
+    assert (info.frame_rate, info.channels, info.bit_depth) == expected
+    assert info.duration == pytest.approx(2.5, abs=0.05)
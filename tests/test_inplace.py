@@ -0,0 +1,103 @@
+"""Tests for the memory-mapped, in-place effects."""
+
+import pytest
+
+import aud.core.inplace
+from aud.aud import Dir
+from aud.core.adapters.audio import AudioAdapter
+from aud.core.inplace import MappedPcm, apply_in_place
+from aud.core.operations.audio.effects import Fade, Gain, InvertPhase, Pad
+from aud.core.pcm import read_pcm, write_pcm
+
+
+@pytest.fixture
+def stereo(tone):
+    # 1013 ms: the length is not a whole number of milliseconds
+    return tone(1013, volume=-1)
+
+
+@pytest.mark.parametrize("format", ["wav", "aiff"])
+@pytest.mark.parametrize("width", [1, 2, 4])
+@pytest.mark.parametrize(
+    "operations",
+    [
+        [Gain(4)],  # clips
+        [Fade(0.25, 0.3)],  # one step per millisecond
+        [Fade(0.05, 0.08)],  # one step per frame
+        [InvertPhase("left")],
+        [Gain(-3), InvertPhase(), Fade(0.5, 0.6)],
+    ],
+)
+def test_matches_pydub(tmp_path, stereo, format, width, operations):
+    audio = stereo.set_sample_width(width)
+    path = tmp_path / f"a.{format}"
+    write_pcm(audio, path, format)
+    size = path.stat().st_size
+
+    expected = audio
+    for op in operations:
+        expected = AudioAdapter().apply(op, expected)
+
+    assert apply_in_place(path, operations)
+    assert path.stat().st_size == size
+    assert read_pcm(path).raw_data == expected.raw_data
+
+
+def test_fades_only_touch_their_frames(tmp_path, stereo):
+    write_pcm(stereo, tmp_path / "a.wav", "wav")
+    before = (tmp_path / "a.wav").read_bytes()
+
+    assert apply_in_place(tmp_path / "a.wav", [Fade(0.1, 0.2)])
+
+    after = (tmp_path / "a.wav").read_bytes()
+    middle = slice(44 + 4410 * 4, len(before) - 8820 * 4 - 2 * 4)
+    assert after[middle] == before[middle]
+    assert after[:44] == before[:44]
+    assert after != before
+
+
+def test_unsupported_work_is_left_alone(tmp_path, stereo):
+    write_pcm(stereo.set_channels(1), tmp_path / "mono.wav", "wav")
+    stereo.export(tmp_path / "a.raw", format="raw")
+    before = (tmp_path / "mono.wav").read_bytes()
+
+    assert not apply_in_place(tmp_path / "mono.wav", [InvertPhase("left")])
+    assert not apply_in_place(tmp_path / "mono.wav", [Gain(-3), Pad(0.5)])
+    assert not apply_in_place(tmp_path / "mono.wav", [Fade(fade_in=2)])
+    assert not apply_in_place(tmp_path / "a.raw", [Gain(-3)])
+    assert (tmp_path / "mono.wav").read_bytes() == before
+
+
+def test_without_numpy_files_are_left_alone(tmp_path, stereo, monkeypatch):
+    write_pcm(stereo, tmp_path / "a.wav", "wav")
+    before = (tmp_path / "a.wav").read_bytes()
+
+    monkeypatch.setattr(aud.core.inplace, "np", None)
+    assert not apply_in_place(tmp_path / "a.wav", [Gain(-3)])
+    assert (tmp_path / "a.wav").read_bytes() == before
+
+
+def test_samples_are_a_writable_view(tmp_path, stereo):
+    write_pcm(stereo, tmp_path / "a.wav", "wav")
+
+    with MappedPcm(tmp_path / "a.wav") as pcm:
+        samples = pcm.samples()
+        assert samples.shape == (len(stereo.raw_data) // 4, 2)
+        samples[:, 1] = 0
+        del samples
+
+    assert read_pcm(tmp_path / "a.wav").split_to_mono()[1].max == 0
+
+
+def test_dir_memory_map(tmp_path, stereo, decodes):
+    write_pcm(stereo, tmp_path / "a.wav", "wav")
+    expected = stereo.apply_gain(-6).fade_in(100).invert_phase()
+
+    d = Dir(tmp_path, extensions=["wav"], memory_map=True)
+    d.afx_gain(-6)
+    with d.pipeline():
+        d.afx_fade(0.1)
+        d.afx_invert_phase()
+
+    assert decodes == []
+    assert read_pcm(tmp_path / "a.wav").raw_data == expected.raw_data
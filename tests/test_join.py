@@ -0,0 +1,42 @@
+"""Tests for streaming AudioJoin."""
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from aud.aud import Dir
+from aud.core.adapters.stream import PcmSink
+
+
+def test_join_length_is_sum_of_inputs(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"])
+    inputs = [AudioSegment.from_file(populated_dir / name) for name in d.get_all()]
+
+    target = populated_dir / "joined.wav"
+    assert d.afx_join(target, format="wav")
+
+    joined = AudioSegment.from_file(target)
+    assert joined.frame_count() == sum(a.frame_count() for a in inputs)
+    assert joined.raw_data == b"".join(a.raw_data for a in inputs)
+    assert d.get_all() == ["joined.wav"]
+
+
+def test_join_widens_to_every_input(tmp_path):
+    a = Sine(440, sample_rate=22050).to_audio_segment(500).set_channels(2).set_sample_width(1)
+    a.export(tmp_path / "a.wav", format="wav")
+    Sine(220).to_audio_segment(500).export(tmp_path / "b.wav", format="wav")
+
+    d = Dir(tmp_path, extensions=["wav"])
+    assert d.afx_join(tmp_path / "out" / "joined.wav")
+
+    joined = AudioSegment.from_file(tmp_path / "out" / "joined.wav")
+    assert (joined.frame_rate, joined.channels, joined.sample_width) == (44100, 2, 2)
+    assert abs(len(joined) - 1000) <= 1
+
+
+def test_pcm_sink_8bit_wav(tmp_path):
+    segment = Sine(440).to_audio_segment(100).set_sample_width(1)
+
+    with PcmSink(tmp_path / "out.wav", "wav", segment.frame_rate, 1, 1) as sink:
+        sink.write(segment.raw_data)
+
+    assert AudioSegment.from_file(tmp_path / "out.wav").raw_data == segment.raw_data
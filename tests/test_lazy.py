@@ -0,0 +1,90 @@
+"""Tests for lazy Dir construction and streaming scans."""
+
+import types
+
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from aud.aud import Dir
+from aud.core.adapters.audio import AudioAdapter
+from aud.core.selection.extensions import ExtensionPolicy
+from aud.core.selection.scanner import DirectoryScanner
+
+
+@pytest.fixture
+def events(monkeypatch):
+    log = []
+    paths, load = DirectoryScanner.paths, AudioAdapter.load
+
+    def listing(self):
+        log.append(("scan", None))
+        for path in paths(self):
+            log.append(("list", path.rsplit("/", 1)[-1]))
+            yield path
+
+    def loading(self, file):
+        log.append(("load", file.name))
+        return load(self, file)
+
+    monkeypatch.setattr(DirectoryScanner, "paths", listing)
+    monkeypatch.setattr(AudioAdapter, "load", loading)
+    return log
+
+
+def scans(log):
+    return sum(1 for kind, _ in log if kind == "scan")
+
+
+def test_construction_and_config_do_not_scan(populated_dir, events):
+    d = Dir(populated_dir, extensions=["txt"])
+    d.config_set_extensions(["wav"])
+    d.config_set_allowlist(["test.txt"])
+    d.config_set_denylist(["bloop.wav"])
+    assert scans(events) == 0
+
+    assert d.get_all() == ["song.wav", "test.txt"]
+    assert len(d) == 2
+    assert scans(events) == 1
+
+    d.config_set_recursive(max_depth=2)
+    assert d.get_all() == ["song.wav", "test.txt"]
+    assert scans(events) == 2
+
+
+def test_iter_scan_is_lazy(populated_dir):
+    files = DirectoryScanner(populated_dir, ExtensionPolicy(["wav"])).iter_scan()
+    assert isinstance(files, types.GeneratorType)
+    assert next(files).name == "bloop.wav"
+
+
+def test_pipeline_processes_while_listing(populated_dir, events):
+    d = Dir(populated_dir, extensions=["wav"])
+
+    with d.pipeline():
+        d.afx_gain(-1)
+
+    order = [(kind, name) for kind, name in events if kind != "scan"]
+    assert order.index(("load", "bloop.wav")) < order.index(("list", "song.wav"))
+    assert d.get_all() == ["bloop.wav", "song.wav"]
+    assert scans(events) == 1
+
+
+def test_pipeline_outputs_are_not_listed_as_inputs(tmp_path, monkeypatch):
+    # folders are read when the walk reaches them, after earlier files were written
+    monkeypatch.setattr(DirectoryScanner.__init__, "__defaults__", (False, None, False, 1))
+    tone = Sine(440).to_audio_segment(300, volume=-6)
+    for name in ("a", "b"):
+        tone.export(tmp_path / f"{name}.wav", format="wav")
+    (tmp_path / "zz").mkdir()
+
+    d = Dir(tmp_path, extensions=["wav"], recursive=True)
+    with d.pipeline():
+        d.copy(tmp_path / "zz")
+        d.afx_gain(-6)
+
+    assert [f.path.relative_to(tmp_path).as_posix() for f in d] == ["zz/a.wav", "zz/b.wav"]
+    for name in ("a", "b"):
+        assert AudioSegment.from_file(tmp_path / "zz" / f"{name}.wav").max_dBFS == pytest.approx(
+            -12, abs=0.01
+        )
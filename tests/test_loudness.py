@@ -0,0 +1,137 @@
+"""Tests for single-pass peak / RMS / loudness normalization."""
+
+import math
+
+import pytest
+from pydub import AudioSegment
+from pydub.effects import normalize
+
+from aud.aud import Dir
+from aud.core.adapters.audio import AudioAdapter
+from aud.core.models import AudioFile, Measurement
+from aud.core.operations.audio.effects import Normalize
+
+
+def test_peak_is_one_pass_and_matches_pydub(tone):
+    audio = tone(volume=-12)
+    adapter = AudioAdapter()
+
+    once = adapter.apply(Normalize(0.5), audio)
+    assert once.raw_data == normalize(audio, headroom=0.5).raw_data
+    assert adapter.apply(Normalize(0.5, passes=3), audio).raw_data == once.raw_data
+
+
+def test_rms_target(tone):
+    result = AudioAdapter().apply(Normalize(-18, mode="rms"), tone(volume=-6))
+    assert result.dBFS == pytest.approx(-18, abs=0.05)
+
+
+def test_silence_is_left_alone():
+    silence = AudioSegment.silent(1000)
+    assert AudioAdapter().apply(Normalize(mode="rms"), silence).raw_data == silence.raw_data
+
+
+def test_album_measurement_pools_levels():
+    loud = Measurement(peak=0.5, mean_square=0.1, frames=100)
+    quiet = Measurement(peak=0.25, mean_square=0.01, frames=300)
+    album = Measurement.combine([loud, quiet])
+
+    assert album.peak == 0.5
+    assert album.mean_square == pytest.approx(0.0325)
+    assert album.level("peak") == pytest.approx(20 * math.log10(0.5))
+
+
+def test_album_mode_in_pipeline_measures_its_files(tmp_path, tone):
+    tone(volume=-10).export(tmp_path / "loud.wav", format="wav")
+    tone(volume=-25).export(tmp_path / "quiet.wav", format="wav")
+
+    d = Dir(tmp_path, extensions=["wav"])
+    with d.pipeline(files=[AudioFile(tmp_path / "quiet.wav")]):
+        d.afx_normalize(-20, mode="rms", album=True)
+
+    # only the quiet file is measured, so it alone reaches the target
+    quiet = AudioSegment.from_file(tmp_path / "quiet.wav")
+    assert quiet.dBFS == pytest.approx(-20, abs=0.05)
+    assert AudioSegment.from_file(tmp_path / "loud.wav").dBFS == pytest.approx(
+        tone(volume=-10).dBFS, abs=0.05
+    )
+
+
+class TestLoudness:
+    @pytest.fixture(autouse=True)
+    def _numpy(self):
+        pytest.importorskip("numpy")
+
+    def test_k_weighting_matches_bs1770_at_48k(self):
+        from aud.core.dsp.loudness import k_weighting
+
+        (shelf_b, shelf_a), (hp_b, hp_a) = k_weighting(48000)
+        assert shelf_b == pytest.approx([1.53512485958697, -2.69169618940638, 1.19839281085285])
+        assert shelf_a == pytest.approx([1.0, -1.69065929318241, 0.73248077421585])
+        assert hp_b == [1.0, -2.0, 1.0]
+        assert hp_a == pytest.approx([1.0, -1.99004745483398, 0.99007225036621])
+
+    @pytest.mark.parametrize("rate", [44100, 48000])
+    def test_reference_tone_loudness(self, tone, rate):
+        # a 997 Hz tone at -20 dBFS peak measures -23 LUFS per channel, -20 in stereo
+        adapter = AudioAdapter()
+        reference = tone(3000, rate, volume=-20, frequency=997)
+        measurement = adapter.measure(Normalize(mode="lufs"), reference)
+        assert measurement.level("lufs") == pytest.approx(-20.0, abs=0.05)
+
+        mono = adapter.measure(Normalize(mode="lufs"), reference.set_channels(1))
+        assert mono.level("lufs") == pytest.approx(-23.0, abs=0.05)
+
+    @pytest.mark.parametrize("backend", ["pydub", "numpy"])
+    def test_lufs_target(self, tone, backend):
+        adapter = AudioAdapter(backend=backend)
+        op = Normalize(-16, mode="lufs")
+
+        result = adapter.backend.to_segment(adapter.apply(op, tone(3000, 48000, volume=-30)))
+        assert adapter.measure(op, result).level("lufs") == pytest.approx(-16, abs=0.05)
+
+    def test_true_peak_ceiling(self, tone):
+        adapter = AudioAdapter()
+        op = Normalize(-3, mode="lufs", true_peak=-6.0)
+
+        result = adapter.apply(op, tone(3000, 48000, volume=-30))
+        assert 20 * math.log10(adapter.measure(op, result).true_peak) <= -5.95
+
+    def test_album_mode_applies_one_gain(self, tmp_path, tone):
+        tone(3000, 48000, volume=-10).export(tmp_path / "loud.wav", format="wav")
+        tone(3000, 48000, volume=-25).export(tmp_path / "quiet.wav", format="wav")
+
+        d = Dir(tmp_path, extensions=["wav"], workers=2)
+        assert d.afx_normalize(-20, mode="lufs", album=True)
+
+        loud = AudioSegment.from_file(tmp_path / "loud.wav")
+        quiet = AudioSegment.from_file(tmp_path / "quiet.wav")
+        assert loud.dBFS - quiet.dBFS == pytest.approx(15, abs=0.05)
+
+        # the quiet file falls below the relative gate, so the loud one sets the level
+        measurement = AudioAdapter().measure(Normalize(mode="lufs"), loud)
+        assert measurement.level("lufs") == pytest.approx(-20, abs=0.05)
+
+    @pytest.mark.parametrize("chunk", [997, 4800, 1 << 16])
+    def test_measured_in_chunks(self, tone, monkeypatch, chunk):
+        # filter states, gating blocks and the oversampling FIR carry across chunks
+        import numpy as np
+
+        from aud.core.dsp import loudness
+        from aud.core.dsp.frames import Frames
+
+        audio = tone(2500, 48000, volume=-12) + tone(1700, 48000, volume=-30)
+        whole = loudness.measure(Frames.from_segment(audio), loudness=True, oversample=True)
+
+        monkeypatch.setattr(loudness, "_CHUNK", chunk)
+        frames = Frames.from_segment(audio)
+        for measured in (
+            loudness.measure(frames, loudness=True, oversample=True),
+            loudness.measure_segment(audio, loudness=True, oversample=True),
+        ):
+            assert measured.frames == whole.frames
+            assert measured.peak == whole.peak
+            assert measured.mean_square == pytest.approx(whole.mean_square)
+            assert measured.true_peak == pytest.approx(whole.true_peak)
+            np.testing.assert_allclose(measured.block_powers, whole.block_powers, rtol=1e-9)
+        assert len(whole.block_powers) == 39  # 4.2 s: 400 ms blocks every 100 ms
@@ -0,0 +1,103 @@
+"""Tests for manifest-based incremental pipeline runs."""
+
+import pytest
+from pydub.generators import Sine
+
+from aud.aud import Dir
+from aud.core.manifest import MANIFEST_NAME, Manifest
+from aud.core.operations.audio.effects import Gain, Watermark
+
+
+@pytest.fixture
+def library(tmp_path):
+    for name, freq in (("a.wav", 440), ("b.wav", 660)):
+        Sine(freq).to_audio_segment(300).export(tmp_path / name, format="wav")
+    return tmp_path
+
+
+def names(files):
+    return sorted(f.name for f in files)
+
+
+def gain_pipeline(d, amount=-3):
+    with d.pipeline():
+        d.afx_gain(amount)
+
+
+def test_unchanged_files_are_skipped(library):
+    d = Dir(library, extensions=["wav"], manifest=True)
+    gain_pipeline(d)
+    assert names(d.manifest.processed) == ["a.wav", "b.wav"]
+    processed = (library / "a.wav").read_bytes()
+
+    d = Dir(library, extensions=["wav"], manifest=True)
+    gain_pipeline(d)
+    assert d.manifest.processed == []
+    assert names(d.manifest.skipped) == ["a.wav", "b.wav"]
+    assert (library / "a.wav").read_bytes() == processed
+    assert (library / MANIFEST_NAME).exists()
+
+
+def test_new_or_modified_files_are_processed(library):
+    d = Dir(library, extensions=["wav"], manifest=True)
+    gain_pipeline(d)
+
+    Sine(880).to_audio_segment(300).export(library / "b.wav", format="wav")
+    Sine(990).to_audio_segment(300).export(library / "c.wav", format="wav")
+
+    d.update()
+    gain_pipeline(d)
+    assert names(d.manifest.processed) == ["b.wav", "c.wav"]
+    assert names(d.manifest.skipped) == ["a.wav"]
+
+
+def test_plan_changes_invalidate(library):
+    d = Dir(library, extensions=["wav"], manifest=True)
+    gain_pipeline(d, -3)
+    gain_pipeline(d, -4)
+    assert names(d.manifest.processed) == ["a.wav", "b.wav"]
+
+
+def test_branching_outputs_must_be_intact(library):
+    out = library / "out"
+    d = Dir(library, extensions=["wav"], manifest=True)
+
+    def run():
+        d.update()
+        with d.pipeline():
+            d.copy(out)
+            d.afx_gain(-3)
+
+    run()
+    assert names(d) == ["a.wav", "b.wav"]
+    assert d.manifest.processed and (out / "a.wav").exists()
+
+    (out / "a.wav").unlink()
+    run()
+    assert names(d.manifest.processed) == ["a.wav"]
+    assert names(d.manifest.skipped) == ["b.wav"]
+    assert (out / "a.wav").exists()
+
+
+def test_renamed_outputs_are_not_renamed_again(library):
+    d = Dir(library, extensions=["wav"], manifest=True)
+    for _ in range(2):
+        with d.pipeline():
+            d.name_prepend("x_")
+        d.update()
+
+    assert sorted(d.get_all()) == ["x_a.wav", "x_b.wav"]
+    assert names(d.manifest.skipped) == ["x_a.wav", "x_b.wav"]
+
+
+def test_fingerprint_covers_parameters_and_assets(tmp_path):
+    mark = tmp_path / "mark.wav"
+    Sine(1000).to_audio_segment(100).export(mark, format="wav")
+    manifest = Manifest(tmp_path / MANIFEST_NAME)
+
+    assert manifest.fingerprint([Gain(-3)]) == manifest.fingerprint([Gain(-3)])
+    assert manifest.fingerprint([Gain(-3)]) != manifest.fingerprint([Gain(-4)])
+
+    before = manifest.fingerprint([Watermark(mark, 1, 2, seed=1)])
+    Sine(500).to_audio_segment(100).export(mark, format="wav")
+    assert manifest.fingerprint([Watermark(mark, 1, 2, seed=1)]) != before
@@ -0,0 +1,85 @@
+"""Tests for header probing and the persistent metadata index."""
+
+import os
+
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+import aud.core.probe
+from aud.aud import Dir
+from aud.core.index import INDEX_NAME, MetadataIndex
+from aud.core.models import AudioFile
+from aud.core.probe import probe
+
+
+@pytest.fixture
+def library(tmp_path):
+    Sine(440, sample_rate=22050).to_audio_segment(1500, volume=-6).export(
+        tmp_path / "mono.wav", format="wav"
+    )
+    stereo = Sine(440).to_audio_segment(500).set_channels(2).set_sample_width(1)
+    stereo.export(tmp_path / "stereo.wav", format="wav")
+    (tmp_path / "broken.wav").write_bytes(b"not audio")
+    return tmp_path
+
+
+def test_probe_reads_wav_headers(library):
+    info = probe(library / "mono.wav")
+    assert (info.frame_rate, info.channels, info.bit_depth) == (22050, 1, 16)
+    assert info.duration == pytest.approx(1.5)
+    assert info.frames == 33075
+    assert info.peak_dbfs is None
+
+    assert probe(library / "mono.wav", peak=True).peak_dbfs == pytest.approx(-6, abs=0.1)
+
+
+def test_probe_does_not_decode_unreadable_files(library, monkeypatch):
+    monkeypatch.setattr(aud.core.probe, "read_audio", pytest.fail)
+    assert probe(library / "broken.wav") is None
+
+
+def test_index_only_probes_changed_files(library):
+    files = [AudioFile(p) for p in sorted(library.glob("*.wav"))]
+    index = MetadataIndex(library / INDEX_NAME)
+
+    assert index.refresh(files) == 3
+    assert index.refresh(files) == 0
+    assert list(index.errors()) == [library / "broken.wav"]
+
+    AudioSegment.silent(250).export(library / "stereo.wav", format="wav")
+    os.utime(library / "stereo.wav", ns=(1, 1))
+    assert index.refresh(files) == 1
+    assert index.get(AudioFile(library / "stereo.wav")).channels == 1
+
+    long = index.query("duration > ?", (1,))
+    assert list(long) == [library / "mono.wav"]
+
+    assert index.prune(files[1:]) == 1
+    index.close()
+
+    with MetadataIndex(library / INDEX_NAME) as reopened:
+        assert reopened.refresh(files[1:]) == 0
+
+
+def test_dir_metadata(library):
+    d = Dir(library, extensions=["wav"], index=True)
+    info = d.metadata()
+
+    assert sorted(info) == ["mono.wav", "stereo.wav"]
+    assert info["stereo.wav"].bit_depth == 8
+    assert info["stereo.wav"].channels == 2
+    assert (library / INDEX_NAME).exists()
+
+    assert d.metadata(peak=True)["mono.wav"].peak_dbfs == pytest.approx(-6, abs=0.1)
+
+
+def test_dir_index_is_opened_on_first_use(library):
+    d = Dir(library, extensions=["wav"])
+    d.name_append("_x")
+    assert d._index is None
+
+    # files indexed by another selection are not reported
+    d.index.refresh([AudioFile(library / "mono_x.wav"), AudioFile(library / "stereo_x.wav")])
+    d.name_replace("_x", "")
+    assert sorted(d.metadata()) == ["mono.wav", "stereo.wav"]
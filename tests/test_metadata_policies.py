@@ -0,0 +1,93 @@
+"""Tests for selecting files by header metadata."""
+
+import array
+
+import pytest
+from pydub import AudioSegment
+
+import aud.core.index
+from aud.aud import Dir
+from aud.core.models import AudioFile
+from aud.core.selection.compiled import compile_policy
+from aud.core.selection.composite import CompositePolicy
+from aud.core.selection.extensions import ExtensionPolicy
+from aud.core.selection.metadata import (
+    BitDepthPolicy,
+    ChannelsPolicy,
+    ClippedPolicy,
+    DurationPolicy,
+    SampleRatePolicy,
+)
+
+
+@pytest.fixture
+def library(tmp_path, tone):
+    tone(2500, 48000).export(tmp_path / "long_48k_stereo.wav", format="wav")
+    tone(1000, 48000).export(tmp_path / "short_48k_stereo.wav", format="wav")
+    tone(2500, 44100).export(tmp_path / "long_44k_stereo.wav", format="wav")
+    tone(2500, 48000, channels=1, width=1).export(tmp_path / "long_48k_mono.wav", format="wav")
+    tone(500, 48000, volume=3).export(tmp_path / "hot.wav", format="wav")
+    (tmp_path / "notes.txt").write_text("not audio")
+    return tmp_path
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    calls = []
+    probe = aud.core.index.probe
+
+    def counting(path, peak=False):
+        calls.append(str(path).rsplit("/", 1)[-1])
+        return probe(path, peak=peak)
+
+    monkeypatch.setattr(aud.core.index, "probe", counting)
+    return calls
+
+
+def test_dir_selects_by_metadata(library, probes):
+    d = Dir(library, extensions=["wav"], workers=4)
+    d.config_set_policies(SampleRatePolicy(48000), ChannelsPolicy(2), DurationPolicy(min=2))
+
+    assert d.get_all() == ["long_48k_stereo.wav"]
+    # only files passing the name rules are probed, once each
+    assert sorted(probes) == sorted(p.name for p in library.glob("*.wav"))
+
+    d.update()
+    assert d.get_all() == ["long_48k_stereo.wav"]
+    assert len(probes) == 5
+
+    d.config_set_allowlist(["notes.txt"])
+    assert d.get_all() == ["long_48k_stereo.wav", "notes.txt"]
+
+
+def test_policies_accept_header_values(library):
+    files = [AudioFile(p) for p in sorted(library.glob("*.wav"))]
+
+    def selected(policy):
+        flags = compile_policy(policy).include_many(str(f.path) for f in files)
+        return [f.name for f, ok in zip(files, flags, strict=True) if ok]
+
+    assert selected(DurationPolicy(max=1)) == ["hot.wav", "short_48k_stereo.wav"]
+    assert selected(BitDepthPolicy(8)) == ["long_48k_mono.wav"]
+    assert selected(SampleRatePolicy(44100, 22050)) == ["long_44k_stereo.wav"]
+    assert selected(CompositePolicy(ExtensionPolicy(["mp3"]), ChannelsPolicy(1))) == []
+    assert ChannelsPolicy(1).include(AudioFile(library / "long_48k_mono.wav"))
+
+
+def test_clipped_policy_measures_peaks_once(library, probes):
+    d = Dir(library, extensions=["wav"], policies=[ClippedPolicy()])
+    assert d.get_all() == ["hot.wav"]
+
+    d.config_set_policies(ClippedPolicy(clipped=False), DurationPolicy(max=1))
+    assert d.get_all() == ["short_48k_stereo.wav"]
+    assert len(probes) == 5
+
+
+def test_clipped_policy_counts_positive_full_scale(tmp_path):
+    samples = array.array("h", [0, 32767, 0, -100] * 1000)
+    AudioSegment(data=samples.tobytes(), sample_width=2, frame_rate=44100, channels=1).export(
+        tmp_path / "positive.wav", format="wav"
+    )
+
+    d = Dir(tmp_path, extensions=["wav"], policies=[ClippedPolicy()])
+    assert d.get_all() == ["positive.wav"]
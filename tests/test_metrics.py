@@ -0,0 +1,96 @@
+"""Tests for per-file metrics."""
+
+import io
+import json
+import shutil
+
+import pytest
+from pydub.generators import Sine
+
+from aud.aud import Dir
+from aud.core.metrics import Metrics
+from aud.exceptions import AudioFXError
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+
+
+@pytest.fixture
+def library(tmp_path):
+    tone = Sine(440, sample_rate=44100).to_audio_segment(1500, volume=-6)
+    for name in ("a", "b", "c"):
+        tone.export(tmp_path / f"{name}.wav", format="wav")
+    return tmp_path
+
+
+def test_effects_are_measured_per_file(library):
+    seen = []
+    d = Dir(library, extensions=["wav"], metrics=Metrics(hooks=[seen.append]))
+    d.afx_gain(-3)
+    d.afx_fade(0.1, 0.1)
+
+    records = list(d.metrics.records)
+    assert seen == records
+    assert [m.operation for m in records] == ["Gain"] * 3 + ["Fade"] * 3
+    for m in records:
+        assert m.path.endswith(".wav")
+        assert m.audio_seconds == pytest.approx(1.5)
+        assert m.bytes_read == m.bytes_written == (library / "a.wav").stat().st_size
+        assert m.decode > 0 and m.encode > 0 and m.ffmpeg == 0
+        assert m.wall == pytest.approx(m.decode + m.process + m.encode)
+        assert m.realtime_factor > 1
+        assert m.peak_rss > 0
+
+    gain = d.metrics.summary()["Gain"]
+    assert gain["files"] == 3
+    assert gain["audio_seconds"] == pytest.approx(4.5)
+
+
+@needs_ffmpeg
+def test_ffmpeg_time_and_outputs(library):
+    d = Dir(library, extensions=["wav"], metrics=True)
+    d.convert_format("flac")
+
+    for m in d.metrics.records:
+        assert m.operation == "ConvertFormat"
+        assert m.ffmpeg > 0 and m.decode == m.encode == 0
+        assert 0 < m.bytes_written < m.bytes_read  # the FLAC output
+
+
+def test_pipelines_and_workers(library):
+    d = Dir(library, extensions=["wav"], workers=2, metrics=True)
+    with d.pipeline():
+        d.afx_gain(-3)
+        d.convert_mono()
+
+    # measured in the worker processes, reported with the results
+    records = list(d.metrics.records)
+    assert sorted(m.operation for m in records) == ["pipeline"] * 3
+    assert all(m.decode > 0 and m.encode > 0 for m in records)
+
+
+def test_failures_are_counted(library):
+    (library / "b.wav").write_bytes(b"RIFF broken")
+    d = Dir(library, extensions=["wav"], metrics=True)
+    with pytest.raises(AudioFXError):
+        d.afx_gain(-3)
+
+    totals = d.metrics.summary()["Gain"]
+    assert (totals["files"], totals["failures"]) == (2, 1)
+
+
+def test_exports(library):
+    d = Dir(library, extensions=["wav"], metrics=True)
+    d.afx_gain(-3)
+
+    lines = io.StringIO()
+    d.metrics.write_jsonl(lines)
+    rows = [json.loads(line) for line in lines.getvalue().splitlines()]
+    assert len(rows) == 3
+    assert {"operation", "wall", "decode", "realtime_factor", "peak_rss"} <= rows[0].keys()
+
+    text = d.metrics.prometheus()
+    assert "# TYPE aud_files_total counter" in text
+    assert 'aud_files_total{operation="Gain"} 3' in text
+    assert 'aud_phase_seconds_total{operation="Gain",phase="decode"} ' in text
+    assert 'aud_audio_seconds_total{operation="Gain"} 4.5' in text
+    assert "\naud_peak_rss_bytes " in text
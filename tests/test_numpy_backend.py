@@ -0,0 +1,121 @@
+"""Tests for the NumPy DSP backend."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pydub import AudioSegment  # noqa: E402
+from pydub.effects import high_pass_filter, low_pass_filter, normalize  # noqa: E402
+
+from aud.aud import Dir  # noqa: E402
+from aud.core.adapters.audio import AudioAdapter  # noqa: E402
+from aud.core.dsp import filters  # noqa: E402
+from aud.core.dsp.filters import lfilter  # noqa: E402
+from aud.core.dsp.frames import Frames  # noqa: E402
+from aud.core.operations.audio.convert import ConvertToMono, ConvertToStereo  # noqa: E402
+from aud.core.operations.audio.effects import (  # noqa: E402
+    Fade,
+    Gain,
+    HighPassFilter,
+    InvertPhase,
+    LowPassFilter,
+    Normalize,
+    Pad,
+)
+
+
+@pytest.fixture
+def segment():
+    rng = np.random.default_rng(1)
+    t = np.arange(44100) / 44100
+    tone = 0.4 * np.sin(2 * np.pi * 220 * t)[:, None] + 0.05 * rng.standard_normal((44100, 2))
+    data = np.floor(tone * 32768).astype(np.int16).tobytes()
+    return AudioSegment(data=data, sample_width=2, frame_rate=44100, channels=2)
+
+
+def samples(audio):
+    if isinstance(audio, Frames):
+        audio = audio.to_segment()
+    return np.array(audio.get_array_of_samples(), dtype=np.int64)
+
+
+def test_frames_round_trip(segment):
+    assert Frames.from_segment(segment).to_segment().raw_data == segment.raw_data
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 300, 1 << 15])
+def test_lfilter_matches_direct_recurrence(monkeypatch, chunk):
+    # the filter state is carried across chunk boundaries
+    monkeypatch.setattr(filters, "_CHUNK", chunk)
+    rng = np.random.default_rng(2)
+    x = rng.standard_normal((1000, 2))
+    x_prev, y_prev = rng.standard_normal((2, 2)), rng.standard_normal((2, 2))
+    b, a = [0.2, 0.3, 0.1], [1.0, -1.2, 0.5]
+
+    expected = np.concatenate([y_prev[::-1], np.zeros((1000, 2))])
+    padded = np.concatenate([x_prev[::-1], x])
+    for n in range(1000):
+        expected[n + 2] = (
+            b[0] * padded[n + 2]
+            + b[1] * padded[n + 1]
+            + b[2] * padded[n]
+            - a[1] * expected[n + 1]
+            - a[2] * expected[n]
+        )
+
+    np.testing.assert_allclose(lfilter(b, a, x, x_prev, y_prev), expected[2:], atol=1e-9)
+
+
+@pytest.mark.parametrize(
+    "operation, reference",
+    [
+        (Gain(-4), lambda seg: seg + -4),
+        (Normalize(0.5), lambda seg: normalize(seg, headroom=0.5)),
+        (InvertPhase("left"), lambda seg: seg.invert_phase((1, 0))),
+        (LowPassFilter(2000), lambda seg: low_pass_filter(seg, 2000)),
+        (HighPassFilter(300), lambda seg: high_pass_filter(seg, 300)),
+        (ConvertToMono(), lambda seg: seg.set_channels(1)),
+    ],
+)
+def test_numpy_backend_matches_pydub(segment, operation, reference):
+    result = AudioAdapter(backend="numpy").apply(operation, segment)
+
+    # pydub truncates to integers at every step, numpy only once
+    np.testing.assert_allclose(samples(result), samples(reference(segment)), atol=2)
+
+
+def test_numpy_backend_shape_changes(segment):
+    adapter = AudioAdapter(backend="numpy")
+
+    padded = adapter.apply(Pad(pad_in=0.5, pad_out=0.25), segment)
+    assert padded.frame_count == segment.frame_count() + 22050 + 11025
+    assert not padded.samples[:22050].any()
+
+    faded = adapter.apply(Fade(fade_in=0.1, fade_out=0.1), segment)
+    assert abs(faded.samples[0]).max() < 1e-3
+    np.testing.assert_array_equal(faded.samples[5000], Frames.from_segment(segment).samples[5000])
+
+    mono = AudioAdapter(backend="numpy").apply(ConvertToMono(), segment)
+    assert AudioAdapter(backend="numpy").apply(ConvertToStereo(), mono).channels == 2
+
+
+def test_dir_numpy_backend(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"], backend="numpy")
+
+    assert d.afx_gain(-3)
+    assert d.afx_low_pass(8000)
+    assert d.afx_strip_silence()
+
+    with d.pipeline():
+        d.afx_normalize()
+        d.afx_fade(0.1, 0.1)
+        d.convert_mono()
+        d.convert_format("wav", sample_rate=22050, bit_depth=16)
+
+    audio = AudioSegment.from_file(populated_dir / "song.wav")
+    assert (audio.channels, audio.frame_rate) == (1, 22050)
+
+
+def test_unknown_backend(populated_dir):
+    with pytest.raises(ValueError):
+        Dir(populated_dir, backend="nope")
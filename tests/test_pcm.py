@@ -0,0 +1,110 @@
+"""Tests for the in-process WAV / AIFF reader and writer."""
+
+import shutil
+import struct
+import subprocess
+
+import pytest
+from pydub import AudioSegment
+
+from aud.aud import Dir
+from aud.core.headers import header_info
+from aud.core.pcm import read_pcm, write_pcm
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+
+
+@pytest.fixture
+def stereo(tone):
+    return tone(300, volume=-3)
+
+
+@pytest.fixture
+def no_subprocess(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError(f"started a process: {args[0]}")
+
+    monkeypatch.setattr(subprocess, "Popen", fail)
+    monkeypatch.setattr(subprocess, "run", fail)
+
+
+@pytest.mark.parametrize("width", [1, 2, 4])
+def test_wav_is_written_like_pydub(tmp_path, stereo, width):
+    audio = stereo.set_sample_width(width)
+    audio.export(tmp_path / "pydub.wav", format="wav")
+    assert write_pcm(audio, tmp_path / "aud.wav", "wav")
+
+    assert (tmp_path / "aud.wav").read_bytes() == (tmp_path / "pydub.wav").read_bytes()
+    assert read_pcm(tmp_path / "aud.wav").raw_data == audio.raw_data
+
+
+@pytest.mark.parametrize("width", [1, 2, 4])
+def test_aiff_round_trip(tmp_path, stereo, width):
+    audio = stereo.set_sample_width(width)
+    assert write_pcm(audio, tmp_path / "a.aiff", "aiff")
+
+    info = header_info(tmp_path / "a.aiff")
+    assert (info.frame_rate, info.channels, info.bit_depth) == (44100, 2, width * 8)
+    assert read_pcm(tmp_path / "a.aiff").raw_data == audio.raw_data
+
+
+def test_large_wav_is_written_as_rf64(tmp_path, stereo, monkeypatch):
+    monkeypatch.setattr("aud.core.pcm._RIFF_LIMIT", 1000)
+    write_pcm(stereo, tmp_path / "big.wav", "wav")
+
+    data = (tmp_path / "big.wav").read_bytes()
+    assert data[:4] == b"RF64"
+    # the ds64 chunk holds the real RIFF size: everything after the first 8 bytes
+    assert data[12:16] == b"ds64"
+    assert struct.unpack("<Q", data[20:28])[0] == len(data) - 8
+    assert read_pcm(tmp_path / "big.wav").raw_data == stereo.raw_data
+
+
+def test_other_formats_are_left_to_pydub(tmp_path, stereo):
+    assert not write_pcm(stereo, tmp_path / "a.mp3", "mp3")
+    (tmp_path / "a.mp3").write_bytes(b"ID3not really")
+    assert read_pcm(tmp_path / "a.mp3") is None
+
+
+@needs_ffmpeg
+@pytest.mark.parametrize(
+    "codec, format",
+    [
+        ("pcm_u8", "wav"),
+        ("pcm_s24le", "wav"),
+        ("pcm_f32le", "wav"),
+        ("pcm_s8", "aiff"),
+        ("pcm_s24be", "aiff"),
+        ("pcm_s16le", "aiff"),  # AIFF-C "sowt"
+        ("pcm_f32be", "aiff"),
+    ],
+)
+def test_decodes_like_ffmpeg(tmp_path, stereo, codec, format):
+    stereo.export(tmp_path / "source.wav", format="wav")
+    target = tmp_path / f"a.{format}"
+    ffmpeg = ["ffmpeg", "-v", "error", "-y"]
+    subprocess.run([*ffmpeg, "-i", tmp_path / "source.wav", "-c:a", codec, target], check=True)
+
+    # what AudioSegment.from_file decodes it to
+    bits = header_info(target).bit_depth
+    decoder = "pcm_u8" if bits == 8 else f"pcm_s{bits}le"
+    command = [*ffmpeg, "-i", target, "-acodec", decoder, "-vn", "-f", "wav", "-"]
+    expected = AudioSegment(data=subprocess.run(command, capture_output=True, check=True).stdout)
+
+    audio = read_pcm(target)
+    assert audio.sample_width == expected.sample_width
+    assert audio.raw_data == expected.raw_data
+
+
+def test_wav_and_aiff_effects_run_in_process(tmp_path, stereo, no_subprocess):
+    write_pcm(stereo, tmp_path / "a.wav", "wav")
+    write_pcm(stereo.set_sample_width(4), tmp_path / "b.aiff", "aiff")
+
+    d = Dir(tmp_path, extensions=["wav", "aiff"])
+    assert d.afx_gain(-3)
+    with d.pipeline():
+        d.afx_fade(0.05, 0.05)
+        d.convert_mono()
+
+    assert read_pcm(tmp_path / "a.wav").channels == 1
+    assert header_info(tmp_path / "b.aiff").bit_depth == 32
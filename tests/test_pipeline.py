@@ -0,0 +1,139 @@
+"""Tests for fused pipeline execution."""
+
+import zipfile
+
+import pytest
+
+from aud.aud import Dir
+from aud.core.adapters.audio import AudioAdapter
+from aud.exceptions import PipelineError
+
+
+@pytest.fixture
+def load_counter(monkeypatch):
+    calls = []
+    original = AudioAdapter.load
+
+    def counting_load(self, file):
+        calls.append(file.name)
+        return original(self, file)
+
+    monkeypatch.setattr(AudioAdapter, "load", counting_load)
+    return calls
+
+
+def test_pipeline_decodes_each_file_once(populated_dir, load_counter):
+    d = Dir(populated_dir, extensions=["wav"])
+
+    with d.pipeline():
+        d.afx_normalize()
+        d.afx_fade(0.1, 0.1)
+        d.afx_high_pass(80)
+        d.convert_format("wav", sample_rate=22050)
+
+    assert sorted(load_counter) == ["bloop.wav", "song.wav"]
+    assert sorted(d.get_all()) == ["bloop.wav", "song.wav"]
+
+
+def test_pipeline_resolves_destinations_up_front(populated_dir, load_counter):
+    d = Dir(populated_dir, extensions=["wav"])
+    out = populated_dir / "out"
+
+    with d.pipeline():
+        d.copy(out)
+        d.name_upper()
+        d.afx_gain(-3)
+
+    assert sorted(load_counter) == ["bloop.wav", "song.wav"]
+    assert sorted(p.name for p in out.iterdir()) == ["BLOOP.wav", "SONG.wav"]
+    # The originals are left untouched by the copy
+    assert (populated_dir / "bloop.wav").exists()
+    assert (populated_dir / "song.wav").exists()
+    assert sorted(d.get_all()) == ["BLOOP.wav", "SONG.wav"]
+
+
+def test_pipeline_writes_every_copy(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"])
+
+    with d.pipeline():
+        d.copy(populated_dir / "x")
+        d.copy(populated_dir / "y")
+
+    assert sorted(p.name for p in (populated_dir / "x").iterdir()) == ["bloop.wav", "song.wav"]
+    assert sorted(p.name for p in (populated_dir / "y").iterdir()) == ["bloop.wav", "song.wav"]
+    assert (populated_dir / "bloop.wav").exists()
+
+
+def test_pipeline_keeps_backup_before_convert(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"])
+    backup = populated_dir / "backup"
+    original = (populated_dir / "bloop.wav").read_bytes()
+
+    with d.pipeline():
+        d.backup(backup)
+        d.convert_format("flac")
+
+    assert sorted(p.name for p in backup.iterdir()) == [
+        "bloop.flac",
+        "bloop.wav",
+        "song.flac",
+        "song.wav",
+    ]
+    assert (backup / "bloop.wav").read_bytes() == original
+    assert sorted(d.get_all()) == ["bloop.flac", "song.flac"]
+
+
+def test_pipeline_rename_replaces_source(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"])
+
+    with d.pipeline():
+        d.name_prepend("x_")
+        d.afx_gain(1)
+
+    assert sorted(d.get_all()) == ["x_bloop.wav", "x_song.wav"]
+    assert not (populated_dir / "bloop.wav").exists()
+
+
+def test_pipeline_filesystem_only_does_not_decode(populated_dir, load_counter):
+    d = Dir(populated_dir, extensions=["txt"])
+
+    with d.pipeline():
+        d.name_upper()
+        d.name_iterate(zerofill=2)
+
+    assert load_counter == []
+    assert sorted(d.get_all()) == ["01_ABC.txt", "02_TEST.txt"]
+
+
+def test_pipeline_aggregate_operations_split_stages(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"])
+    zip_path = populated_dir / "bundle.zip"
+
+    with d.pipeline():
+        d.afx_gain(-1)
+        d.archive_zip(zip_path)
+
+    with zipfile.ZipFile(zip_path) as z:
+        assert sorted(z.namelist()) == ["bloop.wav", "song.wav"]
+    assert d.get_all() == ["bundle.zip"]
+
+
+def test_pipeline_discards_operations_on_error(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"])
+
+    with pytest.raises(RuntimeError):
+        with d.pipeline():
+            d.name_upper()
+            raise RuntimeError("abort")
+
+    assert sorted(d.get_all()) == ["bloop.wav", "song.wav"]
+    assert d.name_lower()
+
+
+def test_run_wraps_errors(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"])
+    plan = d._plan()
+    plan.add(object())
+
+    with pytest.raises(PipelineError):
+        d.run(plan)
@@ -0,0 +1,77 @@
+"""Tests for os.scandir based (recursive) directory scanning."""
+
+import os
+
+import pytest
+
+from aud.aud import Dir
+from aud.core.selection.extensions import ExtensionPolicy
+from aud.core.selection.scanner import DirectoryScanner
+
+LAYOUT = ["a.wav", "b/c.wav", "b/d/e.wav", "a-b/x.wav", "b/z.txt", "c/f.wav", "c/g/h/i.wav"]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for name in LAYOUT:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    return tmp_path
+
+
+def relative(root, files):
+    return [f.path.relative_to(root).as_posix() for f in files]
+
+
+def expected(root, depth=None):
+    paths = sorted(root.rglob("*.wav"))
+    return [
+        p.relative_to(root).as_posix()
+        for p in paths
+        if depth is None or len(p.relative_to(root).parts) <= depth + 1
+    ]
+
+
+def test_non_recursive_matches_legacy(tree):
+    files = DirectoryScanner(tree, ExtensionPolicy(["wav"])).scan()
+    assert relative(tree, files) == ["a.wav"]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_recursive_order_matches_sorted_paths(tree, workers):
+    scanner = DirectoryScanner(tree, ExtensionPolicy(["wav"]), recursive=True, workers=workers)
+    assert relative(tree, scanner.scan()) == expected(tree)
+
+
+@pytest.mark.parametrize("depth", [0, 1, 2])
+def test_depth_limit(tree, depth):
+    scanner = DirectoryScanner(tree, ExtensionPolicy(["wav"]), recursive=True, max_depth=depth)
+    assert relative(tree, scanner.scan()) == expected(tree, depth)
+
+
+def test_symlink_policy(tree):
+    os.symlink(tree / "b", tree / "c" / "link")
+    os.symlink(tree, tree / "c" / "g" / "loop")
+    os.symlink(tree / "a.wav", tree / "alias.wav")
+    policy = ExtensionPolicy(["wav"])
+
+    plain = relative(tree, DirectoryScanner(tree, policy, recursive=True).scan())
+    assert "alias.wav" in plain
+    assert not any(p.startswith("c/link") for p in plain)
+
+    # followed links are entered once per real directory, cycles are cut
+    followed = DirectoryScanner(tree, policy, recursive=True, follow_symlinks=True).scan()
+    assert relative(tree, followed) == plain
+
+
+def test_stopping_early_is_clean(tree):
+    scanner = DirectoryScanner(tree, ExtensionPolicy(["wav"]), recursive=True, workers=4)
+    paths = scanner.paths()
+    assert next(paths).endswith("a-b/x.wav")
+    paths.close()
+
+
+def test_dir_recursive(tree):
+    d = Dir(tree, extensions=["wav"], recursive=True, max_depth=1)
+    assert d.get_all() == ["x.wav", "a.wav", "c.wav", "f.wav"]
@@ -0,0 +1,53 @@
+"""Tests for vectorized silence detection."""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from pydub import AudioSegment, silence  # noqa: E402
+from pydub.effects import strip_silence  # noqa: E402
+from pydub.generators import Sine, WhiteNoise  # noqa: E402
+
+from aud.aud import Dir  # noqa: E402
+from aud.core.adapters.audio import AudioAdapter  # noqa: E402
+from aud.core.dsp.silence import detect_nonsilent, detect_silence  # noqa: E402
+from aud.core.operations.audio.effects import StripSilence  # noqa: E402
+
+
+@pytest.fixture
+def bursts():
+    tone = Sine(330).to_audio_segment(700, volume=-3)
+    noise = WhiteNoise().to_audio_segment(400, volume=-40)
+    quiet = AudioSegment.silent(1300, frame_rate=44100)
+    audio = quiet + tone + noise + tone[:250] + quiet + tone + AudioSegment.silent(333, 44100)
+    return audio.set_channels(2)
+
+
+@pytest.mark.parametrize("length, threshold, step", [(1000, -16, 1), (300, -30, 1), (250, -20, 7)])
+def test_matches_pydub_detection(bursts, length, threshold, step):
+    assert detect_silence(bursts, length, threshold, step) == silence.detect_silence(
+        bursts, length, threshold, step
+    )
+    assert detect_nonsilent(bursts, length, threshold, step) == silence.detect_nonsilent(
+        bursts, length, threshold, step
+    )
+
+
+def test_strip_silence_matches_pydub(bursts):
+    op = StripSilence(silence_length=500, silence_threshold=-30, padding=100)
+    result = AudioAdapter().apply(op, bursts)
+    assert result.raw_data == strip_silence(bursts, 500, -30, 100).raw_data
+
+
+def test_all_silent_and_too_short():
+    quiet = AudioSegment.silent(2000)
+    assert detect_nonsilent(quiet) == []
+    assert detect_silence(quiet[:500]) == []
+
+
+def test_dir_nonsilent_ranges(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"])
+    ranges = d.afx_nonsilent_ranges(silence_length=500, silence_threshold=-30)
+
+    assert sorted(ranges) == ["bloop.wav", "song.wav"]
+    assert all(start < end for start, end in ranges["song.wav"])
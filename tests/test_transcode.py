@@ -0,0 +1,151 @@
+"""Tests for the direct (single ffmpeg process) conversion path."""
+
+import shutil
+import subprocess
+
+import pytest
+from pydub.generators import Sine
+
+import aud.core.ffmpeg
+from aud.aud import Dir
+from aud.core.adapters.convert import ConversionAdapter
+from aud.core.adapters.pipeline import PipelineAdapter
+from aud.core.headers import header_info
+from aud.core.models import AudioFile
+from aud.core.operations.audio.convert import ConvertFormat, ConvertToMono, ConvertToStereo
+from aud.core.operations.audio.effects import Gain
+from aud.exceptions import ConvertError
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+
+
+@pytest.fixture
+def library(tmp_path):
+    audio = Sine(440, sample_rate=48000).to_audio_segment(1000, volume=-6).set_channels(2)
+    audio.export(tmp_path / "a.wav", format="wav")
+    audio.set_sample_width(1).export(tmp_path / "b.wav", format="wav")
+    return tmp_path
+
+
+def test_convert_format_runs_one_ffmpeg(library, decodes):
+    d = Dir(library, extensions=["wav"])
+    assert d.convert_format("flac", sample_rate=44100, bit_depth=24)
+    assert decodes == []
+
+    info = header_info(library / "a.flac")
+    assert (info.frame_rate, info.channels, info.bit_depth) == (44100, 2, 24)
+    assert info.duration == pytest.approx(1.0, abs=0.01)
+    assert (library / "a.wav").exists()
+
+
+def test_in_place_conversions_keep_bit_depth(library, decodes):
+    d = Dir(library, extensions=["wav"])
+    assert d.convert_mono()
+    assert decodes == []
+
+    assert header_info(library / "a.wav").channels == 1
+    assert header_info(library / "b.wav").bit_depth == 8
+    assert not list(library.glob(".*partial*"))
+
+
+def test_tags_are_written(library):
+    d = Dir(library, extensions=["wav"])
+    d.convert_format("mp3", tags={"title": "Take 1", "artist": "aud"})
+
+    command = ["ffmpeg", "-v", "error", "-i", str(library / "a.mp3"), "-f", "ffmetadata", "-"]
+    metadata = subprocess.run(command, capture_output=True, text=True).stdout
+    assert "title=Take 1" in metadata
+    assert "artist=aud" in metadata
+
+
+def test_pipeline_uses_direct_path_only_without_dsp(library, decodes):
+    d = Dir(library, extensions=["wav"])
+    with d.pipeline():
+        d.convert_stereo()
+        d.convert_to_flac(sample_rate=22050)
+    assert decodes == []
+    assert header_info(library / "a.flac").frame_rate == 22050
+
+    d = Dir(library, extensions=["wav"])
+    with d.pipeline():
+        d.afx_gain(-3)
+        d.convert_to_mp3()
+    assert len(decodes) == 2
+
+
+def test_operations_that_need_python_are_not_lowered(library):
+    adapter = ConversionAdapter()
+    file = AudioFile(library / "a.wav")
+
+    assert not adapter.transcode([Gain(-3)], file, file)
+    assert not adapter.transcode([ConvertToMono(), ConvertToStereo()], file, file)
+    assert not ConversionAdapter(direct=False).transcode([ConvertToMono()], file, file)
+    with pytest.raises(ValueError):
+        adapter.transcode([ConvertFormat("wav", bit_depth=12)], file, file)
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    calls = []
+    run = subprocess.run
+
+    def counting(command, *args, **kwargs):
+        calls.append(command)
+        return run(command, *args, **kwargs)
+
+    monkeypatch.setattr(aud.core.ffmpeg.subprocess, "run", counting)
+    return calls
+
+
+def test_batches_share_one_ffmpeg(library, processes):
+    for n in range(5):
+        shutil.copy(library / "a.wav", library / f"c{n}.wav")
+
+    d = Dir(library, extensions=["wav"], batch_size=4)
+    assert d.convert_format("flac", sample_rate=22050)
+    assert len(processes) == 2
+    assert d.get_all() == ["a.flac", "b.flac", *(f"c{n}.flac" for n in range(5))]
+    assert all(header_info(library / f"c{n}.flac").frame_rate == 22050 for n in range(5))
+
+    processes.clear()
+    d = Dir(library, extensions=["flac"], native=True, batch_size=8)
+    with d.pipeline():
+        d.afx_gain(-3)
+        d.convert_to_wav()
+    assert len(processes) == 1
+    assert len(list(library.glob("*.wav"))) == 7
+
+
+def test_failed_batch_is_retried_per_file(library, processes):
+    (library / "broken.wav").write_bytes(b"RIFF....WAVEnot really")
+
+    d = Dir(library, extensions=["wav"], batch_size=8)
+    with pytest.raises(ConvertError) as info:
+        d.convert_format("mp3")
+
+    # one batch, then one process per file
+    assert len(processes) == 4
+    assert [f.name for f, _ in info.value.exc.failures] == ["broken.wav"]
+    assert (library / "a.mp3").exists() and (library / "b.mp3").exists()
+    assert not list(library.glob(".*partial*"))
+
+
+def test_failed_settle_only_retries_its_route(library, processes, monkeypatch):
+    settle = PipelineAdapter._settle
+    failed = []
+
+    def flaky(self, route):
+        if route.name == "b.wav" and not failed:
+            failed.append(route.name)
+            raise OSError("busy")
+        return settle(self, route)
+
+    monkeypatch.setattr(PipelineAdapter, "_settle", flaky)
+    d = Dir(library, extensions=["wav"], batch_size=8)
+    with d.pipeline():
+        d.convert_format("flac")
+
+    # the batch, then b.wav on its own
+    assert len(processes) == 2
+    assert failed == ["b.wav"]
+    assert d.get_all() == ["a.flac", "b.flac"]
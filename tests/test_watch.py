@@ -0,0 +1,98 @@
+"""Tests for incremental updates and watching a directory for changes."""
+
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from aud.aud import Dir
+from aud.core.selection.snapshot import Snapshot
+from aud.core.selection.watch import InotifyWatcher
+
+
+def kinds(changes):
+    return sorted((c.kind, c.file.name) for c in changes)
+
+
+def later(action, delay=0.2):
+    thread = threading.Timer(delay, action)
+    thread.start()
+    return thread
+
+
+def test_incremental_update_reports_changes(populated_dir, mock_assets):
+    d = Dir(populated_dir, extensions=["wav"])
+    assert d.update() == []
+
+    assert kinds(d.update(incremental=True)) == [("added", "bloop.wav"), ("added", "song.wav")]
+    assert d.update(incremental=True) == []
+
+    shutil.copy(mock_assets / "bloop.wav", populated_dir / "new.wav")
+    (populated_dir / "song.wav").unlink()
+    stat = os.stat(populated_dir / "bloop.wav")
+    os.utime(populated_dir / "bloop.wav", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    changes = d.update(incremental=True)
+    assert kinds(changes) == [
+        ("added", "new.wav"),
+        ("modified", "bloop.wav"),
+        ("removed", "song.wav"),
+    ]
+    assert d.get_all() == ["bloop.wav", "new.wav"]
+
+
+def test_snapshot_check_only_looks_at_given_paths(populated_dir):
+    snapshot = Snapshot()
+    accept = lambda file: file.path.suffix == ".wav"  # noqa: E731
+    snapshot.check([populated_dir / "bloop.wav", populated_dir / "test.txt"], accept)
+    assert [f.name for f in snapshot.files()] == ["bloop.wav"]
+
+    (populated_dir / "bloop.wav").unlink()
+    changes = snapshot.check([populated_dir / "bloop.wav"], accept)
+    assert kinds(changes) == [("removed", "bloop.wav")]
+    assert len(snapshot) == 0
+
+
+@pytest.mark.parametrize(
+    "poll",
+    [
+        True,
+        pytest.param(
+            False,
+            marks=pytest.mark.skipif(not InotifyWatcher.available(), reason="needs inotify"),
+        ),
+    ],
+)
+def test_watch_yields_new_files(populated_dir, mock_assets, poll):
+    d = Dir(populated_dir, extensions=["wav"])
+    target = populated_dir / "incoming.wav"
+    writer = later(lambda: shutil.copy(mock_assets / "bloop.wav", target))
+
+    seen = []
+    for changes in d.watch(interval=0.05, timeout=3, poll=poll):
+        seen.extend(changes)
+        if any(c.file.path == target for c in changes):
+            break
+    writer.join()
+
+    assert [(c.kind, c.file.name) for c in seen] == [("added", "incoming.wav")]
+    assert "incoming.wav" in d.get_all()
+
+
+def test_processing_changes_is_not_reported_back(populated_dir, mock_assets):
+    d = Dir(populated_dir, extensions=["wav"])
+    d.update(incremental=True)
+    shutil.copy(mock_assets / "bloop.wav", populated_dir / "incoming.wav")
+
+    changes = d.update(incremental=True)
+    with d.pipeline([c.file for c in changes]):
+        d.afx_gain(-3)
+
+    assert d.get_all() == ["bloop.wav", "incoming.wav", "song.wav"]
+    assert d.update(incremental=True) == []
+
+    started = time.monotonic()
+    assert list(d.watch(interval=0.05, timeout=0.3)) == []
+    assert time.monotonic() - started < 2
@@ -0,0 +1,86 @@
+"""Tests for single-pass watermark mixing."""
+
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from aud.aud import Dir
+from aud.core.adapters.audio import AudioAdapter
+from aud.core.operations.audio.effects import Watermark
+
+
+@pytest.fixture
+def mark_file(tmp_path):
+    path = tmp_path / "mark.wav"
+    Sine(1000).to_audio_segment(200, volume=-12).set_channels(2).export(path, format="wav")
+    return path
+
+
+@pytest.fixture
+def base():
+    return Sine(220).to_audio_segment(20_000, volume=-6).set_channels(2)
+
+
+def reference(audio, mark, positions, gain):
+    # The legacy behaviour: one full-length overlay per placement
+    for position in positions:
+        audio = audio.overlay(mark, position, gain_during_overlay=gain)
+    return audio
+
+
+def test_schedule_is_reproducible_with_seed(mark_file):
+    op = Watermark(mark_file, 1.0, 3.0, seed=7)
+    positions = op.schedule(60_000, 200)
+
+    assert positions == Watermark(mark_file, 1.0, 3.0, seed=7).schedule(60_000, 200)
+    assert positions and positions == sorted(positions)
+    gaps = [b - a for a, b in zip(positions, positions[1:], strict=False)]
+    assert all(1200 <= gap < 3200 for gap in gaps)
+
+
+def test_single_pass_matches_overlay_loop(mark_file, base):
+    op = Watermark(mark_file, 1.0, 3.0, gain_during_overlay=-4, seed=3)
+    mark = AudioSegment.from_file(mark_file)
+
+    result = AudioAdapter().apply(op, base)
+    expected = reference(base, mark, op.schedule(len(base), len(mark)), -4)
+
+    assert result.raw_data == expected.raw_data
+
+
+def test_numpy_watermark_matches_pydub(mark_file, base):
+    np = pytest.importorskip("numpy")
+    op = Watermark(mark_file, 1.0, 3.0, seed=3)
+
+    fast = AudioAdapter(backend="numpy").apply(op, base).to_segment()
+    slow = AudioAdapter().apply(op, base)
+
+    diff = np.abs(
+        np.array(fast.get_array_of_samples(), dtype=np.int64)
+        - np.array(slow.get_array_of_samples(), dtype=np.int64)
+    )
+    assert diff.max() <= 2
+
+
+def test_backends_schedule_for_the_same_length(mark_file, monkeypatch):
+    pytest.importorskip("numpy")
+    durations = []
+    schedule = Watermark.schedule
+
+    def recording(self, duration_ms, watermark_ms):
+        durations.append(duration_ms)
+        return schedule(self, duration_ms, watermark_ms)
+
+    monkeypatch.setattr(Watermark, "schedule", recording)
+    # 441027 frames at 44.1 kHz are 10000.61 ms, which len() rounds up
+    audio = AudioSegment(data=b"\0" * 4 * 441_027, sample_width=2, frame_rate=44100, channels=2)
+    op = Watermark(mark_file, 1.0, 3.0, seed=3)
+    AudioAdapter().apply(op, audio)
+    AudioAdapter(backend="numpy").apply(op, audio)
+
+    assert durations == [len(audio), len(audio)] == [10_001, 10_001]
+
+
+def test_dir_watermark_seed(populated_dir, mark_file):
+    d = Dir(populated_dir, extensions=["wav"], allowlist=["song.wav"])
+    assert d.afx_watermark(mark_file, 1.0, 2.0, gain_during_overlay=-3, seed=1)
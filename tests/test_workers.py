@@ -0,0 +1,75 @@
+"""Tests for process-pool execution."""
+
+import pytest
+
+from aud.aud import Dir
+from aud.core.executor import map_batches, map_files
+from aud.exceptions import AudioFXError, BatchError
+
+
+def square(value):
+    return value * value
+
+
+def fail_on_three(value):
+    if value == 3:
+        raise ValueError("three")
+    return value
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_map_files_keeps_input_order(workers):
+    assert map_files(square, iter(range(20)), workers=workers) == [i * i for i in range(20)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_map_files_reports_each_failure(workers):
+    with pytest.raises(BatchError) as info:
+        map_files(fail_on_three, range(6), workers=workers)
+
+    assert [item for item, _ in info.value.failures] == [3]
+    assert info.value.results == [0, 1, 2, None, 4, 5]
+    assert "1 of 6 files failed" in str(info.value)
+
+
+def square_evens(values):
+    # handles even numbers only and fails for batches containing 3
+    if 3 in values:
+        raise ValueError("three")
+    return [v * v if v % 2 == 0 else None for v in values]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_map_batches_falls_back_per_item(workers):
+    assert map_batches(square_evens, square, range(10), size=4, workers=workers) == [
+        i * i for i in range(10)
+    ]
+
+    with pytest.raises(BatchError) as info:
+        map_batches(square_evens, fail_on_three, range(6), size=4, workers=workers)
+    assert [item for item, _ in info.value.failures] == [3]
+    assert info.value.results == [0, 1, 2, None, 16, 5]
+
+
+def test_dir_workers(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"], workers=2)
+
+    assert d.afx_gain(-3)
+    assert d.convert_mono()
+    assert d.convert_format("wav", sample_rate=22050)
+
+    with d.pipeline():
+        d.afx_fade(0.1, 0.1)
+        d.name_upper()
+
+    assert sorted(d.get_all()) == ["BLOOP.wav", "SONG.wav"]
+
+
+def test_dir_workers_per_file_errors(populated_dir):
+    d = Dir(populated_dir, extensions=["wav"], allowlist=["test.txt"], workers=2)
+
+    with pytest.raises(AudioFXError) as info:
+        d.afx_gain(1)
+
+    assert isinstance(info.value.exc, BatchError)
+    assert [f.name for f, _ in info.value.exc.failures] == ["test.txt"]